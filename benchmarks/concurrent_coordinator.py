@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark: N concurrent CoordinatorAgent.process calls.
+
+Replaces the provider with a stand-in that takes a fixed amount of time per
+completion and compares two transports:
+
+- async: the stand-in awaits (how AsyncOpenAI behaves), so workflows overlap
+- blocking: the stand-in sleeps synchronously (how the old OpenAI client
+  behaved inside an async method), so workflows queue behind each other
+
+Usage:
+    python benchmarks/concurrent_coordinator.py --users 8 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.agents.coordinator_agent import CoordinatorAgent
+from src.core.config import Config
+
+
+def _completion(text: str) -> SimpleNamespace:
+    """Build an object shaped like a chat completion response."""
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+
+def install_transport(coordinator: CoordinatorAgent, latency: float, blocking: bool):
+    """Point every agent of the coordinator at a fixed-latency stand-in."""
+
+    async def async_create(**kwargs):
+        await asyncio.sleep(latency)
+        return _completion("Stand-in response for benchmarking.")
+
+    async def blocking_create(**kwargs):
+        time.sleep(latency)
+        return _completion("Stand-in response for benchmarking.")
+
+    create = blocking_create if blocking else async_create
+    for agent in [coordinator, *coordinator.agents.values()]:
+        agent.client.chat.completions.create = create
+
+
+async def run(users: int, latency: float, blocking: bool) -> float:
+    """Run `users` concurrent workflows and return the wall-clock time."""
+
+    # Generous limits so the shared rate/concurrency limiters don't mask the transport
+    config = Config(
+        openai_api_key="benchmark_key",
+        enable_file_logging=False,
+        rate_limit_requests=100000,
+        concurrency_initial_limit=64
+    )
+    logger = logging.getLogger("benchmark")
+    logger.setLevel(logging.WARNING)
+
+    coordinator = CoordinatorAgent(config, logger)
+    install_transport(coordinator, latency, blocking)
+
+    tasks = [
+        coordinator.process({"task": f"Explain topic number {i} in detail"})
+        for i in range(users)
+    ]
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    failures = [r for r in results if not r.get("success")]
+    if failures:
+        raise RuntimeError(f"{len(failures)} workflows failed: {failures[0]}")
+
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=8, help="Concurrent coordinator workflows")
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per stand-in completion")
+    args = parser.parse_args()
+
+    async_time = asyncio.run(run(args.users, args.latency, blocking=False))
+    blocking_time = asyncio.run(run(args.users, args.latency, blocking=True))
+
+    print(f"Concurrent workflows:  {args.users}")
+    print(f"Completion latency:    {args.latency:.3f}s")
+    print(f"Async transport:       {async_time:.3f}s")
+    print(f"Blocking transport:    {blocking_time:.3f}s")
+    print(f"Speedup:               {blocking_time / async_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark: HTTP transport settings against a local stand-in LLM server.
+
+Each variant sends a burst of concurrent chat completions, stays idle for
+longer than the keep-alive expiry, then sends a second burst. The server
+adds a handshake delay to every new connection, standing in for the TCP and
+TLS round trips to a remote endpoint. Variants:
+
+- http1: HTTP/1.1, connections opened on demand
+- http1+prewarm: HTTP/1.1 with connections prewarmed at startup and
+  re-warmed in the background before they expire
+- http2: HTTP/2 (h2c), concurrent requests multiplexed on one connection
+- http2+prewarm: both
+
+Reports the average request latency of each burst and the connections
+the server had to accept.
+
+Usage:
+    python benchmarks/http_transport.py --concurrency 20 --handshake 0.05 --latency 0.1 --idle 2
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.core.config import Config
+from src.core.llm_client import SharedClientPool, transport_options, HTTP2_AVAILABLE
+from tests.stub_server import StubLLMServer
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+
+async def burst(pool: SharedClientPool, concurrency: int) -> float:
+    """Send `concurrency` requests at once; return their average latency."""
+
+    async def request() -> float:
+        start = time.perf_counter()
+        await pool.get_client().chat.completions.create(model="stub", messages=MESSAGES)
+        return time.perf_counter() - start
+
+    return statistics.mean(await asyncio.gather(*(request() for _ in range(concurrency))))
+
+
+async def run_variant(name: str, args, http2: bool, prewarm: bool) -> None:
+    """Run one transport variant on a fresh server and print its results."""
+
+    async with StubLLMServer(latency=args.latency, handshake_latency=args.handshake, name=name) as server:
+        config = Config(
+            openai_api_key="benchmark",
+            openai_base_url=server.base_url,
+            http2=http2,
+            http_keepalive_expiry=args.keepalive,
+            http_max_connections=args.concurrency,
+            http_max_keepalive_connections=args.concurrency,
+            http_prewarm_connections=args.concurrency if prewarm else 0,
+            http_prewarm_interval=args.keepalive / 2 if prewarm else 0,
+            enable_file_logging=False
+        )
+        pool = SharedClientPool("benchmark", server.base_url, **transport_options(config))
+
+        # Application startup: the background prewarm (if any) runs while no traffic arrives
+        pool.get_client()
+        await asyncio.sleep(args.startup)
+
+        connections_before = server.stats["connections"]
+        first = await burst(pool, args.concurrency)
+        await asyncio.sleep(args.idle)
+        after_idle = await burst(pool, args.concurrency)
+
+        pool.stop_prewarming()
+        await pool.get_client().close()
+
+        print(f"{name:>14}: first burst {first * 1000:7.1f}ms, after idle {after_idle * 1000:7.1f}ms, "
+              f"connections accepted during traffic {server.stats['connections'] - connections_before}, "
+              f"total {server.stats['connections']}")
+
+
+async def run(args) -> None:
+    print(f"{args.concurrency} concurrent requests per burst, {args.latency * 1000:.0f}ms server latency, "
+          f"{args.handshake * 1000:.0f}ms handshake, {args.idle}s idle (keep-alive expiry {args.keepalive}s)")
+
+    variants = [("http1", False, False), ("http1+prewarm", False, True)]
+    if HTTP2_AVAILABLE:
+        variants += [("http2", True, False), ("http2+prewarm", True, True)]
+    else:
+        print("h2 is not installed; skipping the HTTP/2 variants (pip install \"httpx[http2]\")")
+
+    for name, http2, prewarm in variants:
+        await run_variant(name, args, http2, prewarm)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=20, help="Requests per burst")
+    parser.add_argument("--latency", type=float, default=0.1, help="Server time per request (s)")
+    parser.add_argument("--handshake", type=float, default=0.05, help="Server delay per new connection (s)")
+    parser.add_argument("--keepalive", type=float, default=1.0, help="Keep-alive expiry of idle connections (s)")
+    parser.add_argument("--idle", type=float, default=2.0, help="Idle time between the bursts (s)")
+    parser.add_argument("--startup", type=float, default=0.5, help="Time between startup and the first burst (s)")
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark: pipelined vs sequential research-to-content workflows.
+
+Runs the same tasks through CoordinatorAgent in "sequential" mode (research
+completes, then its findings are drafted in one call) and "pipelined" mode
+(research sections stream through a queue to ContentAgent, which drafts each
+one while research is still generating). Both use the deterministic local
+backend and the same total completion budget for drafting.
+
+Reports time to first output (the first drafted part) and total workflow
+latency for each mode.
+
+Usage:
+    python benchmarks/pipelined_workflow.py --workflows 10 --latency 0.2 --tokens-per-second 100
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.agents.coordinator_agent import CoordinatorAgent
+from src.core.config import Config
+
+
+async def run_mode(coordinator: CoordinatorAgent, mode: str, workflows: int) -> None:
+    """Run the workflows one at a time in one mode and print their latencies."""
+
+    first_outputs, totals, sections = [], [], []
+    for i in range(workflows):
+        start = time.perf_counter()
+        result = await coordinator.process({"task": f"Explain topic number {i} in detail", "mode": mode})
+        totals.append(time.perf_counter() - start)
+        timing = result["result"]["timing"]
+        first_outputs.append(timing["time_to_first_output"])
+        sections.append(timing["sections"])
+
+    print(f"{mode:>10}: time to first output {statistics.mean(first_outputs):6.2f}s, "
+          f"workflow latency {statistics.mean(totals):6.2f}s (p50 {statistics.median(totals):.2f}s), "
+          f"{statistics.mean(sections):.1f} research sections")
+
+
+async def run(args) -> None:
+    config = Config(
+        llm_backend="local",
+        local_backend_latency=args.latency,
+        local_backend_tokens_per_second=args.tokens_per_second,
+        pipeline_section_max_chars=args.section_chars,
+        enable_file_logging=False,
+        rate_limit_requests=1000000,
+        concurrency_initial_limit=64
+    )
+    logger = logging.getLogger("benchmark")
+    logger.setLevel(logging.WARNING)
+
+    coordinator = CoordinatorAgent(config, logger)
+    print(f"{args.workflows} workflows per mode, {args.latency * 1000:.0f}ms first-token latency, "
+          f"{args.tokens_per_second:.0f} tokens/s")
+
+    for mode in ("sequential", "pipelined"):
+        await run_mode(coordinator, mode, args.workflows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workflows", type=int, default=10, help="Workflows per mode")
+    parser.add_argument("--latency", type=float, default=0.2, help="Local backend first-token latency (s)")
+    parser.add_argument("--tokens-per-second", type=float, default=100.0, help="Local backend generation speed")
+    parser.add_argument("--section-chars", type=int, default=800, help="Longest research section (characters)")
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark: prompt prefix reuse of the legacy and the template prompt layouts.
+
+Builds ContentAgent prompts for N requests with mixed types, styles and
+lengths, in two layouts:
+
+- legacy: style and length guidance interpolated into the middle of the
+  system prompt, rebuilt with an f-string on every call
+- template: precompiled templates with the instructions first, guidance in a
+  second system message and only the request in the user message
+
+For each layout it reports the share of prompt tokens that repeat a prefix
+already sent (what a provider prefix cache can serve) and the time to build
+the messages. Providers apply a minimum prompt size before caching (1024
+tokens for OpenAI); this benchmark measures the reusable share regardless.
+
+Usage:
+    python benchmarks/prompt_prefix_cache.py --requests 2000
+"""
+
+import argparse
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.agents.content_agent import ContentAgent
+from src.core.config import Config
+from src.core.tokens import TokenCounter, load_encoding
+
+
+def legacy_messages(agent: ContentAgent, content_type: str, request: str, style: str, length: str):
+    """Build messages the way agents did before templates: guidance interpolated into the system prompt."""
+
+    system, user_format, uses_style = agent.prompt_specs[content_type]
+    intro, _, body = system.partition("\n")
+    guidance = f"Length: {agent._get_length_guidance(length)}"
+    if uses_style:
+        guidance = f"Style: {agent._get_style_guidance(style)}\n                {guidance}"
+
+    return [
+        {"role": "system", "content": f"{intro}\n                \n                {guidance}\n{body}"},
+        {"role": "user", "content": user_format.format(request=request)}
+    ]
+
+
+def template_messages(agent: ContentAgent, content_type: str, request: str, style: str, length: str):
+    """Build messages from the precompiled templates."""
+    return agent._build_messages(content_type, request, style, length)
+
+
+def measure(builder, agent: ContentAgent, requests, counter: TokenCounter):
+    """Build all prompts; return (prompt tokens, tokens in an already-seen prefix, build seconds)."""
+
+    start = time.perf_counter()
+    prompts = [builder(agent, *request) for request in requests]
+    build_time = time.perf_counter() - start
+
+    # Token-level prefix cache: the longest already-sent token prefix of each prompt
+    seen = set()
+    total_tokens = 0
+    cached_tokens = 0
+    for messages in prompts:
+        tokens = []
+        for message in messages:
+            tokens.extend(counter.encode(f"<|{message['role']}|>{message['content']}"))
+        total_tokens += len(tokens)
+
+        matched = 0
+        while matched < len(tokens) and tuple(tokens[:matched + 1]) in seen:
+            matched += 1
+        cached_tokens += matched
+        seen.update(tuple(tokens[:end]) for end in range(matched + 1, len(tokens) + 1))
+
+    return total_tokens, cached_tokens, build_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="Prompts to build per layout")
+    parser.add_argument("--seed", type=int, default=7, help="Seed for the request mix")
+    args = parser.parse_args()
+
+    agent = ContentAgent(Config(llm_backend="local", enable_file_logging=False), logging.getLogger("benchmark"))
+    counter = TokenCounter(load_encoding(agent.config.openai_model), cache_size=0)
+
+    rng = random.Random(args.seed)
+    requests = [
+        (
+            rng.choice(list(agent.prompt_specs)),
+            f"topic number {i} and its trade-offs",
+            rng.choice(list(agent.style_guidance)),
+            rng.choice(list(agent.length_guidance))
+        )
+        for i in range(args.requests)
+    ]
+
+    for name, builder in [("legacy", legacy_messages), ("template", template_messages)]:
+        total_tokens, cached_tokens, build_time = measure(builder, agent, requests, counter)
+        print(f"{name:>8}: {total_tokens} prompt tokens, {cached_tokens} in a reusable prefix "
+              f"({cached_tokens / total_tokens * 100:.1f}%), build {build_time / len(requests) * 1e6:.1f}us/prompt")
+
+
+if __name__ == "__main__":
+    main()
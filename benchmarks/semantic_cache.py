@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark: semantic research cache accuracy, lookup latency and memory.
+
+Scores a labeled sample of research-question pairs (paraphrases and
+near-miss questions that need a different answer) at several similarity
+thresholds, then fills an index with N entries and times lookups.
+
+Usage:
+    python benchmarks/semantic_cache.py --entries 1000 --lookups 500
+"""
+
+import argparse
+import random
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.core.semantic_cache import SemanticCache
+
+# (question, other question, whether one cached answer serves both)
+LABELED_PAIRS = [
+    ("What are the benefits of renewable energy?", "what are the benefits of renewable energy", True),
+    ("What are the benefits of renewable energy?", "What are the advantages of renewable energy?", True),
+    ("Explain how photosynthesis works", "Explain how photosynthesis works in plants", True),
+    ("How does machine learning work?", "How does machine learning work", True),
+    ("What is the capital of France?", "What's the capital of France?", True),
+    ("Compare Python and Java for web development", "Compare Python vs Java for web development", True),
+    ("What are the health effects of coffee?", "What are the health effects of drinking coffee?", True),
+    ("History of the Roman Empire", "The history of the Roman Empire", True),
+    ("Causes of the French Revolution", "What were the causes of the French Revolution?", True),
+    ("How do vaccines train the immune system?", "How do vaccines train the immune system", True),
+    ("What are the benefits of renewable energy?", "What are the drawbacks of renewable energy?", False),
+    ("What are the benefits of renewable energy?", "What are the benefits of nuclear energy?", False),
+    ("What is the capital of France?", "What is the capital of Germany?", False),
+    ("Compare Python and Java for web development", "Compare Python and Go for web development", False),
+    ("How does machine learning work?", "How does deep learning work?", False),
+    ("What are the health effects of coffee?", "What are the health effects of tea?", False),
+    ("Explain how photosynthesis works", "Explain how respiration works", False),
+    ("History of the Roman Empire", "History of the Ottoman Empire", False),
+    ("Causes of the French Revolution", "Causes of the American Revolution", False),
+    ("How do vaccines train the immune system?", "How do antibiotics affect the immune system?", False),
+]
+
+TOPICS = [
+    "renewable energy", "machine learning", "climate change", "quantum computing", "the immune system",
+    "supply chains", "urban planning", "ocean currents", "the Roman Empire", "cryptography",
+    "battery chemistry", "protein folding", "monetary policy", "plate tectonics", "neural networks"
+]
+TEMPLATES = [
+    "What are the benefits of {}?", "Explain the history of {}", "How does {} work?",
+    "What are the main challenges in {}?", "Summarize recent research on {}", "Compare approaches to {}"
+]
+
+
+def evaluate(thresholds):
+    """Print the false-hit rate and recall of the labeled sample at each threshold."""
+    
+    cache = SemanticCache()
+    # Fit IDF statistics on the sample as the cache would over time
+    for first, second, _ in LABELED_PAIRS:
+        cache.add(first, None)
+        cache.add(second, None)
+    
+    print(f"Labeled sample: {len(LABELED_PAIRS)} pairs")
+    print(f"{'threshold':>10} {'false hit rate':>15} {'recall':>8}")
+    for threshold in thresholds:
+        cache.threshold = threshold
+        result = cache.evaluate(LABELED_PAIRS)
+        print(f"{threshold:>10.2f} {result['false_hit_rate']:>15.3f} {result['recall']:>8.3f}")
+
+
+def measure_lookups(entries: int, lookups: int):
+    """Fill an index with `entries` prompts and time `lookups` searches."""
+    
+    rng = random.Random(0)
+    cache = SemanticCache(max_entries=entries)
+    for i in range(entries):
+        prompt = rng.choice(TEMPLATES).format(rng.choice(TOPICS)) + f" (case {i})"
+        cache.add(prompt, {"findings": prompt})
+    
+    for _ in range(lookups):
+        cache.lookup(rng.choice(TEMPLATES).format(rng.choice(TOPICS)))
+    
+    stats = cache.get_stats()
+    print(f"\nIndex: {stats['entries']} entries, {stats['index_bytes'] / 1024 / 1024:.2f} MiB")
+    print(f"Lookups: {stats['lookups']}, average {stats['average_lookup_ms']:.3f} ms, "
+          f"max {stats['max_lookup_ms']:.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=1000, help="Prompts stored in the index")
+    parser.add_argument("--lookups", type=int, default=500, help="Lookups to time")
+    args = parser.parse_args()
+    
+    evaluate([0.8, 0.85, 0.9, 0.95])
+    measure_lookups(args.entries, args.lookups)
+
+
+if __name__ == "__main__":
+    main()
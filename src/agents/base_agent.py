@@ -1,62 +1,364 @@
 """
 Base agent class with common functionality for all agents.
 Includes retry logic, error handling, and monitoring.
+
+Retries are handled by ``src.core.retry``: only transient errors are retried,
+with full-jitter backoff, Retry-After support and a process-wide budget.
+
+LLM calls go through a backend (see ``src.core.llm_backend``): the OpenAI
+API via ``AsyncOpenAI``, so that concurrent agents never block the event loop
+while waiting on the provider, or a deterministic local stand-in selected
+with ``llm_backend="local"``. Agents with the same client settings share one
+pooled client (see ``src.core.llm_client``), one
+rate limiter (see ``src.core.rate_limiter``) and one adaptive in-flight
+limit (see ``src.core.concurrency``). A per-endpoint circuit breaker (see
+``src.core.circuit_breaker``) fails calls fast while the provider is down.
+With ``llm_backend="pool"`` the account-wide rate limiter and breaker are
+skipped: each pool member has its own (see ``src.core.endpoint_pool``).
+Identical concurrent requests from one agent are coalesced into a single
+provider call, and agents listed in ``hedge_agents`` can hedge slow calls.
+Deterministic requests can be answered from a persistent response cache
+shared by all worker processes (see ``src.core.response_cache``). Under a
+``src.core.batch.BatchRunner``, requests are queued for a Batch API job instead.
+Prompt sections are fitted to a per-call token budget with ``_fit_prompt``
+(see ``src.core.tokens``). ``_stream_llm_request`` yields filtered deltas as they arrive
+for callers that render incrementally. Every call's token usage and estimated
+cost is added to the agent's meter and to the enclosing usage scopes (see
+``src.core.usage``).
 """
 
 import time
 import asyncio
+import hashlib
+import json
+from collections import deque
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, List
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
-from openai import OpenAI
+from contextlib import nullcontext
+from typing import Dict, Any, Optional, List, AsyncIterator
+from openai import AsyncOpenAI
 import logging
 
+from ..core.llm_backend import get_llm_backend
+from ..core.rate_limiter import get_rate_limiter
+from ..core.concurrency import get_concurrency_limiter, is_overload_error
+from ..core.retry import get_retry_engine
+from ..core.circuit_breaker import get_circuit_breaker
+from ..core.response_cache import get_response_cache
+from ..core.batch import current_batch
+from ..core.tokens import get_token_counter, fit_sections
+from ..core.usage import UsageMeter, model_prices, estimate_cost, record_usage
+
 class BaseAgent(ABC):
     """Base class for all agents with common functionality."""
     
+    # Potential sensitive patterns removed by filter_output (basic implementation)
+    sensitive_patterns = [
+        "api_key",
+        "password",
+        "secret",
+        "token"
+    ]
+    
+    # Hedging: recent attempt latencies kept per agent, and how many are needed for a p95
+    hedge_latency_window = 200
+    hedge_min_samples = 20
+    
     def __init__(self, name: str, config, logger: logging.Logger):
         self.name = name
         self.config = config
         self.logger = logger
-        self.client = OpenAI(api_key=config.openai_api_key)
+        self.backend = get_llm_backend(config)
+        self.client_pool = self.backend.client_pool
+        # A pool limits, adapts and ejects each member itself; one account's limits would cap the whole pool
+        per_endpoint_limits = self.backend.per_endpoint_limits
+        self.rate_limiter = None if per_endpoint_limits else get_rate_limiter(config)
+        self.concurrency_limiter = None if per_endpoint_limits else get_concurrency_limiter(config)
+        self.retry_engine = get_retry_engine(config)
+        self.circuit_breaker = None if per_endpoint_limits else get_circuit_breaker(config)
+        self.response_cache = get_response_cache(config)
+        self.token_counter = get_token_counter(config)
+        self.model_prices = model_prices(config)
+        self.usage = UsageMeter()
         self.metrics = {
             "requests": 0,
             "successes": 0,
             "failures": 0,
-            "total_time": 0.0
+            "total_time": 0.0,
+            "queue_wait_time": 0.0,
+            "coalesced": 0,
+            "cache_hits": 0,
+            "batched": 0,
+            "retries": 0,
+            "retry_wait_time": 0.0,
+            "streams": 0,
+            "stream_first_token_time": 0.0,
+            "stream_tokens": 0,
+            "stream_generation_time": 0.0,
+            "hedges": 0,
+            "hedge_wins": 0,
+            "hedge_losses": 0,
+            "hedges_rate_capped": 0,
+            "prompts_fitted": 0,
+            "prompts_truncated": 0,
+            "prompt_tokens_saved": 0,
+            "prompt_tokens": 0,
+            "cached_prompt_tokens": 0,
+            "prefix_cache_hits": 0,
+            "prefix_cache_hit_time": 0.0,
+            "prefix_cache_misses": 0,
+            "prefix_cache_miss_time": 0.0
         }
+        self.hedging_enabled = config.enable_request_hedging and name in [
+            agent.strip() for agent in config.hedge_agents.split(",")
+        ]
+        self._latencies = deque(maxlen=self.hedge_latency_window)
+        # Single-flight: request key -> [shared future, number of waiting callers]
+        self._inflight_requests: Dict[str, List[Any]] = {}
+        self.last_prompt_budget: Optional[Dict[str, Any]] = None
+    
+    @property
+    def client(self) -> Optional[AsyncOpenAI]:
+        """Shared pooled client for the current event loop (None for backends without one)."""
+        return self.client_pool.get_client() if self.client_pool is not None else None
+    
+    @property
+    def circuit_open(self) -> bool:
+        """Whether a call made now would be rejected: the endpoint's circuit, or every pool member's, is open."""
+        
+        if self.circuit_breaker is not None:
+            return self.circuit_breaker.is_open
+        return all(member.circuit_breaker.is_open for member in self.backend.members)
+    
+    @property
+    def circuit_state(self) -> str:
+        """State of the endpoint's circuit; for a pool, "open" only while every member is ejected."""
+        
+        if self.circuit_breaker is not None:
+            return self.circuit_breaker.state
+        return "open" if self.circuit_open else "closed"
     
     @abstractmethod
     async def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Process input and return result. Must be implemented by subclasses."""
         pass
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-        retry=retry_if_exception_type(Exception)
-    )
-    async def _make_llm_request(self, messages: List[Dict[str, str]], **kwargs) -> str:
-        """Make LLM request with retry logic and error handling."""
+    async def _make_llm_request(self, messages: List[Dict[str, str]], use_cache: bool = True, **kwargs) -> str:
+        """Make LLM request, sharing one provider call among identical concurrent callers.
+        
+        With the response cache enabled, repeated deterministic requests are
+        answered from disk; pass ``use_cache=False`` to always reach the provider.
+        Pass ``model`` to override ``config.openai_model`` for one request.
+        """
+        
+        key = self._request_key(messages, kwargs)
+        loop = asyncio.get_running_loop()
+        
+        cacheable = use_cache and self.response_cache is not None and self._is_cacheable(kwargs)
+        if cacheable:
+            cached = await self.response_cache.get(key)
+            if cached is not None:
+                self.metrics["cache_hits"] += 1
+                self.logger.info(f"{self.name}: Using cached LLM response")
+                return cached
+        
+        batch = current_batch()
+        if batch is not None:
+            # Batch mode: queue the request for the BatchRunner instead of sending it
+            self.metrics["batched"] += 1
+            body = {"model": self.config.openai_model, "messages": messages, **kwargs}
+            future, queued = batch.request(key, body)
+            completion = await future
+            if queued:
+                # Identical requests share one batch line, so only its first caller records the usage
+                self._record_usage(body["model"], completion["prompt_tokens"], completion["cached_tokens"],
+                                   completion["completion_tokens"], completion["latency"])
+            response = completion["content"]
+            if cacheable and response is not None:
+                await self.response_cache.set(key, response)
+            return response
+        
+        entry = self._inflight_requests.get(key)
+        if entry is not None and entry[0].get_loop() is loop:
+            self.metrics["coalesced"] += 1
+            self.logger.info(f"{self.name}: Coalesced identical in-flight LLM request")
+        else:
+            entry = [asyncio.ensure_future(self._fetch_llm_response(key, cacheable, messages, **kwargs)), 0]
+            self._inflight_requests[key] = entry
+            entry[0].add_done_callback(lambda _: self._forget_inflight(key, entry))
+        
+        future = entry[0]
+        entry[1] += 1
+        try:
+            # Shield so one caller giving up does not cancel the call for the others
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if entry[1] == 1 and not future.done():
+                future.cancel()
+            raise
+        finally:
+            entry[1] -= 1
+    
+    async def _fetch_llm_response(self, key: str, cacheable: bool, messages: List[Dict[str, str]], **kwargs) -> str:
+        """Send an LLM request and store the response in the cache when allowed."""
+        
+        response = await self._send_llm_request(messages, **kwargs)
+        if cacheable and response is not None:
+            await self.response_cache.set(key, response)
+        return response
+    
+    def _is_cacheable(self, kwargs: Dict[str, Any]) -> bool:
+        """Whether a response may be reused: temperature 0 or a pinned seed, and a single choice.
+        
+        A missing temperature means the provider's default of 1.0, i.e. sampled output.
+        """
+        deterministic = kwargs.get("temperature") == 0 or kwargs.get("seed") is not None
+        return deterministic and kwargs.get("n", 1) == 1
+    
+    def _forget_inflight(self, key: str, entry: List[Any]):
+        """Drop a finished single-flight entry unless a newer one replaced it."""
+        if self._inflight_requests.get(key) is entry:
+            del self._inflight_requests[key]
+    
+    def _request_key(self, messages: List[Dict[str, str]], kwargs: Dict[str, Any]) -> str:
+        """Stable hash of (model, messages, kwargs) identifying an LLM request."""
+        
+        payload = {
+            "model": kwargs.get("model", self.config.openai_model),
+            "messages": messages,
+            "kwargs": kwargs
+        }
+        encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+    
+    async def _send_llm_request(self, messages: List[Dict[str, str]], **kwargs) -> str:
+        """Send an LLM request to the provider, retrying transient failures."""
+        
+        attempt = self._hedged_attempt if self.hedging_enabled else self._attempt_llm_request
+        return await self.retry_engine.run(
+            lambda: attempt(messages, **kwargs),
+            on_retry=self._on_retry
+        )
+    
+    async def _hedged_attempt(self, messages: List[Dict[str, str]], **kwargs) -> str:
+        """Make an attempt, duplicating it if no response arrives by the agent's p95 latency.
+        
+        Whichever copy succeeds first wins and the other is cancelled. If both
+        fail, the primary's error is raised.
+        """
+        
+        tasks = [asyncio.ensure_future(self._attempt_llm_request(messages, **kwargs))]
+        try:
+            hedge_delay = self._hedge_delay()
+            if hedge_delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+                if not done and self._may_hedge():
+                    self.metrics["hedges"] += 1
+                    self.logger.info(f"{self.name}: No response after {hedge_delay:.2f}s, sending hedged request")
+                    tasks.append(asyncio.ensure_future(self._attempt_llm_request(messages, **kwargs)))
+            
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = next((task for task in tasks if task in done and task.exception() is None), None)
+                if winner is not None:
+                    if len(tasks) > 1:
+                        self.metrics["hedge_wins" if winner is tasks[1] else "hedge_losses"] += 1
+                    return winner.result()
+            
+            if len(tasks) > 1:
+                self.metrics["hedge_losses"] += 1
+            return tasks[0].result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    def _hedge_delay(self) -> Optional[float]:
+        """Observed p95 attempt latency, or None until enough samples are recorded."""
+        
+        if len(self._latencies) < self.hedge_min_samples:
+            return None
+        latencies = sorted(self._latencies)
+        return latencies[int(0.95 * (len(latencies) - 1))]
+    
+    def _may_hedge(self) -> bool:
+        """Whether a hedge stays within the hedge-rate cap and adds no load to a queued endpoint."""
+        
+        if self.metrics["hedges"] >= self.config.hedge_max_rate * self.metrics["requests"]:
+            self.metrics["hedges_rate_capped"] += 1
+            return False
+        # Duplicating requests while the concurrency limit is saturated would only deepen the queue
+        if self.concurrency_limiter is not None:
+            return self.concurrency_limiter.get_stats()["queued"] == 0
+        return any(member.concurrency_limiter.get_stats()["queued"] == 0 for member in self.backend.members)
+    
+    def _on_retry(self, error: Exception, attempt: int, delay: float):
+        """Record a retry scheduled by the retry engine."""
+        
+        self.metrics["retries"] += 1
+        self.metrics["retry_wait_time"] += delay
+        self.logger.warning(f"{self.name}: Retry {attempt} in {delay:.2f}s after transient error: {str(error)}")
+    
+    async def _attempt_llm_request(self, messages: List[Dict[str, str]], **kwargs) -> str:
+        """Make a single LLM request attempt with error handling and metrics."""
         
         start_time = time.time()
         self.metrics["requests"] += 1
+        model = kwargs.pop("model", self.config.openai_model)
         
         try:
             self.logger.info(f"{self.name}: Making LLM request")
             
-            response = self.client.chat.completions.create(
-                model=self.config.openai_model,
-                messages=messages,
-                timeout=self.config.timeout_seconds,
-                **kwargs
-            )
-            
-            result = response.choices[0].message.content
-            
+            # Fail fast while the endpoint's circuit is open; the outcome feeds the breaker
+            with self.circuit_breaker.call() if self.circuit_breaker is not None else nullcontext():
+                # Wait for a slot under the shared requests/tokens budget
+                estimated_tokens = self._estimate_tokens(messages, kwargs)
+                if self.rate_limiter is not None:
+                    self.metrics["queue_wait_time"] += await self.rate_limiter.acquire(estimated_tokens)
+                
+                # Wait for an in-flight slot under the adaptive (AIMD) limit
+                limiter = self.concurrency_limiter
+                if limiter is not None:
+                    await limiter.acquire(timeout=self.config.timeout_seconds)
+                call_start = time.monotonic()
+                try:
+                    # Cooperative deadline: cancels the in-flight request instead of
+                    # leaving it running after the caller has given up
+                    completion = await asyncio.wait_for(
+                        self.backend.complete(model, messages, timeout=self.config.timeout_seconds, **kwargs),
+                        timeout=self.config.timeout_seconds
+                    )
+                except Exception as e:
+                    # An overload's latency sets its cooldown; other errors carry no latency signal
+                    overloaded = is_overload_error(e)
+                    if limiter is not None:
+                        limiter.release(
+                            latency=time.monotonic() - call_start if overloaded else None,
+                            overloaded=overloaded,
+                            size_class=kwargs.get("max_tokens")
+                        )
+                    raise
+                except BaseException:
+                    # Cancelled (e.g. a losing hedge): free the slot without a signal
+                    if limiter is not None:
+                        limiter.release()
+                    raise
+                call_latency = time.monotonic() - call_start
+                if limiter is not None:
+                    limiter.release(latency=call_latency, size_class=kwargs.get("max_tokens"))
+                
+                result = completion["content"]
+                self._record_prompt_cache(completion, call_latency)
+                self._record_usage(model, completion.get("prompt_tokens") or 0, completion.get("cached_tokens") or 0,
+                                   completion.get("completion_tokens") or 0, call_latency)
+                if self.rate_limiter is not None:
+                    self.rate_limiter.record_usage(estimated_tokens, completion["total_tokens"])
+                
             # Update metrics
+            elapsed = time.time() - start_time
             self.metrics["successes"] += 1
-            self.metrics["total_time"] += time.time() - start_time
+            self.metrics["total_time"] += elapsed
+            self._latencies.append(elapsed)
             
             self.logger.info(f"{self.name}: LLM request successful")
             return result
@@ -66,6 +368,176 @@ class BaseAgent(ABC):
             self.logger.error(f"{self.name}: LLM request failed: {str(e)}")
             raise
     
+    def _record_prompt_cache(self, completion: Dict[str, Any], call_latency: float):
+        """Record how much of a call's prompt the provider served from its prefix cache."""
+        
+        prompt_tokens = completion.get("prompt_tokens")
+        if prompt_tokens is None:
+            return
+        
+        cached_tokens = completion.get("cached_tokens") or 0
+        self.metrics["prompt_tokens"] += prompt_tokens
+        self.metrics["cached_prompt_tokens"] += cached_tokens
+        if cached_tokens:
+            self.metrics["prefix_cache_hits"] += 1
+            self.metrics["prefix_cache_hit_time"] += call_latency
+        else:
+            self.metrics["prefix_cache_misses"] += 1
+            self.metrics["prefix_cache_miss_time"] += call_latency
+    
+    def _record_usage(self, model: str, prompt_tokens: int, cached_tokens: int, completion_tokens: int, latency: float):
+        """Add one call's tokens and estimated cost to the agent and the active usage scopes."""
+        
+        cost = estimate_cost(self.model_prices, model, prompt_tokens, cached_tokens, completion_tokens)
+        self.usage.add(model, prompt_tokens, cached_tokens, completion_tokens, latency, cost)
+        record_usage(model, prompt_tokens, cached_tokens, completion_tokens, latency, cost)
+    
+    async def _stream_llm_request(self, messages: List[Dict[str, str]], **kwargs) -> AsyncIterator[str]:
+        """Stream an LLM completion, yielding filtered text deltas as they arrive.
+        
+        Output filtering is applied incrementally: text that could still turn
+        into a sensitive pattern is held back until the next delta. Streams are
+        not retried, since a partial answer may already have reached the caller.
+        """
+        
+        start_time = time.time()
+        self.metrics["requests"] += 1
+        self.metrics["streams"] += 1
+        model = kwargs.pop("model", self.config.openai_model)
+        
+        # Fail fast while the endpoint's circuit is open
+        breaker = self.circuit_breaker
+        limiter = self.concurrency_limiter
+        probe = breaker.before_call() if breaker is not None else False
+        try:
+            estimated_tokens = self._estimate_tokens(messages, kwargs)
+            if self.rate_limiter is not None:
+                self.metrics["queue_wait_time"] += await self.rate_limiter.acquire(estimated_tokens)
+            if limiter is not None:
+                await limiter.acquire(timeout=self.config.timeout_seconds)
+        except BaseException:
+            if breaker is not None:
+                breaker.release(probe)
+            raise
+        
+        call_start = time.monotonic()
+        first_token_at = None
+        tokens = 0
+        pending = ""
+        
+        try:
+            self.logger.info(f"{self.name}: Making streaming LLM request")
+            
+            deltas = self.backend.stream(model, messages, timeout=self.config.timeout_seconds, **kwargs)
+            try:
+                while True:
+                    # Cooperative timeout for the first delta and between deltas
+                    try:
+                        delta = await asyncio.wait_for(deltas.__anext__(), timeout=self.config.timeout_seconds)
+                    except StopAsyncIteration:
+                        break
+                    
+                    if first_token_at is None:
+                        first_token_at = time.monotonic()
+                    tokens += 1
+                    
+                    pending += delta
+                    cut = self._safe_filter_cut(pending)
+                    if cut > 0:
+                        yield self.filter_output(pending[:cut])
+                        pending = pending[cut:]
+            finally:
+                await deltas.aclose()
+            
+            if pending:
+                yield self.filter_output(pending)
+            
+        except Exception as e:
+            overloaded = is_overload_error(e)
+            if limiter is not None:
+                limiter.release(
+                    latency=time.monotonic() - call_start if overloaded else None,
+                    overloaded=overloaded,
+                    size_class="stream_first_token"
+                )
+            if breaker is not None:
+                breaker.record_error(e, probe)
+            self.metrics["failures"] += 1
+            self.logger.error(f"{self.name}: Streaming LLM request failed: {str(e)}")
+            raise
+        except BaseException:
+            # Consumer stopped early (aclose/cancellation): free the slot without a signal
+            if limiter is not None:
+                limiter.release()
+            if breaker is not None:
+                breaker.release(probe)
+            raise
+        
+        end = time.monotonic()
+        ttft = (first_token_at or end) - call_start
+        if limiter is not None:
+            limiter.release(latency=ttft, size_class="stream_first_token")
+        if breaker is not None:
+            breaker.record_success(probe)
+        
+        self.metrics["successes"] += 1
+        self.metrics["total_time"] += time.time() - start_time
+        self.metrics["stream_first_token_time"] += ttft
+        self.metrics["stream_tokens"] += tokens
+        self.metrics["stream_generation_time"] += end - (first_token_at or end)
+        # Streams carry no usage report: count the prompt locally and one token per delta
+        self._record_usage(model, self.token_counter.count_messages(messages), 0, tokens, end - call_start)
+        
+        self.logger.info(f"{self.name}: Streaming LLM request complete ({tokens} tokens, TTFT {ttft:.2f}s)")
+    
+    def _safe_filter_cut(self, text: str) -> int:
+        """Length of the prefix of `text` that can be filtered and emitted now.
+        
+        Holds back enough trailing characters that no sensitive pattern can
+        straddle the cut, so filtering deltas matches filtering the whole text.
+        """
+        
+        if not self.config.enable_output_filtering:
+            return len(text)
+        
+        longest = max(len(pattern) for pattern in self.sensitive_patterns)
+        cut = max(0, len(text) - (longest - 1))
+        lowered = text.lower()
+        
+        # Any match starting just before the cut is fully visible; cut in front of it
+        for i in range(max(0, cut - longest + 1), cut):
+            if any(lowered.startswith(pattern, i) for pattern in self.sensitive_patterns):
+                return i
+        
+        return cut
+    
+    def _estimate_tokens(self, messages: List[Dict[str, str]], kwargs: Dict[str, Any]) -> int:
+        """Estimate prompt plus completion tokens for the tokens-per-minute budget."""
+        return self.token_counter.count_messages(messages) + kwargs.get("max_tokens", 256)
+    
+    def _fit_prompt(self, sections: Dict[str, str], fixed: str = "", budget: Optional[int] = None) -> Dict[str, str]:
+        """Fit variable prompt sections into the per-call token budget.
+        
+        `fixed` is the prompt text that is always sent (system prompt and
+        instructions); its tokens are taken off the budget first. The budget
+        report is kept in ``last_prompt_budget``.
+        """
+        
+        budget = self.config.prompt_token_budget if budget is None else budget
+        fitted, report = fit_sections(self.token_counter, sections, budget - self.token_counter.count(fixed))
+        
+        self.metrics["prompts_fitted"] += 1
+        self.metrics["prompt_tokens_saved"] += report["tokens_saved"]
+        if report["truncated_sections"]:
+            self.metrics["prompts_truncated"] += 1
+            self.logger.warning(
+                f"{self.name}: Truncated prompt sections {report['truncated_sections']} to fit "
+                f"{budget} tokens ({report['tokens_saved']} tokens cut)"
+            )
+        
+        self.last_prompt_budget = report
+        return fitted
+    
     def validate_input(self, input_data: Dict[str, Any]) -> bool:
         """Validate input data. Override in subclasses for specific validation."""
         
@@ -79,6 +551,11 @@ class BaseAgent(ABC):
             if len(text) > self.config.max_input_length:
                 self.logger.error(f"{self.name}: Input text too long ({len(text)} > {self.config.max_input_length})")
                 return False
+            
+            tokens = self.token_counter.count(text)
+            if tokens > self.config.max_input_tokens:
+                self.logger.error(f"{self.name}: Input text too long ({tokens} tokens > {self.config.max_input_tokens})")
+                return False
         
         return True
     
@@ -92,14 +569,7 @@ class BaseAgent(ABC):
         filtered_output = output
         
         # Remove potential sensitive patterns (basic implementation)
-        sensitive_patterns = [
-            "api_key",
-            "password",
-            "secret",
-            "token"
-        ]
-        
-        for pattern in sensitive_patterns:
+        for pattern in self.sensitive_patterns:
             if pattern.lower() in filtered_output.lower():
                 self.logger.warning(f"{self.name}: Potential sensitive content detected and filtered")
                 filtered_output = filtered_output.replace(pattern, "[FILTERED]")
@@ -118,7 +588,90 @@ class BaseAgent(ABC):
             "successes": self.metrics["successes"],
             "failures": self.metrics["failures"],
             "success_rate": round(success_rate, 2),
-            "average_time": round(avg_time, 2)
+            "average_time": round(avg_time, 2),
+            "queue_wait_time": round(self.metrics["queue_wait_time"], 3),
+            "coalesced": self.metrics["coalesced"],
+            "cache_hits": self.metrics["cache_hits"],
+            "batched": self.metrics["batched"],
+            "response_cache": self.response_cache.get_stats() if self.response_cache is not None else None,
+            "retries": self.metrics["retries"],
+            "retry_wait_time": round(self.metrics["retry_wait_time"], 3),
+            "retry_engine": self.retry_engine.get_stats(),
+            "streaming": self._get_streaming_metrics(),
+            "hedging": self._get_hedging_metrics(),
+            "prompt_budget": self._get_prompt_budget_metrics(),
+            "prompt_cache": self._get_prompt_cache_metrics(),
+            "usage": self.usage.to_dict(),
+            "backend": self.backend.get_stats(),
+            "connection_pool": self.client_pool.get_stats() if self.client_pool is not None else None,
+            "rate_limiter": self.rate_limiter.get_stats() if self.rate_limiter is not None else None,
+            "concurrency": self.concurrency_limiter.get_stats() if self.concurrency_limiter is not None else None,
+            "circuit_breaker": self.circuit_breaker.get_stats() if self.circuit_breaker is not None else None
+        }
+    
+    def _get_streaming_metrics(self) -> Dict[str, Any]:
+        """Get time-to-first-token and throughput metrics for streamed requests."""
+        
+        streams = self.metrics["streams"]
+        generation_time = self.metrics["stream_generation_time"]
+        
+        return {
+            "streams": streams,
+            "average_time_to_first_token": round(self.metrics["stream_first_token_time"] / streams, 3) if streams else 0,
+            "tokens": self.metrics["stream_tokens"],
+            "tokens_per_second": round(self.metrics["stream_tokens"] / generation_time, 2) if generation_time > 0 else 0
+        }
+    
+    def _get_prompt_budget_metrics(self) -> Dict[str, Any]:
+        """Get prompt fitting counts and tokens saved per call."""
+        
+        fitted = self.metrics["prompts_fitted"]
+        
+        return {
+            "budget": self.config.prompt_token_budget,
+            "prompts_fitted": fitted,
+            "prompts_truncated": self.metrics["prompts_truncated"],
+            "tokens_saved": self.metrics["prompt_tokens_saved"],
+            "average_tokens_saved": round(self.metrics["prompt_tokens_saved"] / fitted, 2) if fitted else 0,
+            "last_call": self.last_prompt_budget,
+            "token_counter": self.token_counter.get_stats()
+        }
+    
+    def _get_prompt_cache_metrics(self) -> Dict[str, Any]:
+        """Get cached-prefix token share and call latency with and without a prefix cache hit."""
+        
+        hits = self.metrics["prefix_cache_hits"]
+        misses = self.metrics["prefix_cache_misses"]
+        prompt_tokens = self.metrics["prompt_tokens"]
+        hit_latency = self.metrics["prefix_cache_hit_time"] / hits if hits else 0
+        miss_latency = self.metrics["prefix_cache_miss_time"] / misses if misses else 0
+        
+        return {
+            "prompt_tokens": prompt_tokens,
+            "cached_tokens": self.metrics["cached_prompt_tokens"],
+            "cached_token_rate": round(self.metrics["cached_prompt_tokens"] / prompt_tokens * 100, 2) if prompt_tokens else 0,
+            "hits": hits,
+            "misses": misses,
+            "average_latency_hit": round(hit_latency, 3),
+            "average_latency_miss": round(miss_latency, 3),
+            "latency_gain": round(miss_latency - hit_latency, 3) if hits and misses else None
+        }
+    
+    def _get_hedging_metrics(self) -> Dict[str, Any]:
+        """Get hedged-request counts, win/loss statistics and the current hedge delay."""
+        
+        hedges = self.metrics["hedges"]
+        hedge_delay = self._hedge_delay()
+        
+        return {
+            "enabled": self.hedging_enabled,
+            "hedge_delay": round(hedge_delay, 3) if hedge_delay is not None else None,
+            "hedges": hedges,
+            "wins": self.metrics["hedge_wins"],
+            "losses": self.metrics["hedge_losses"],
+            "win_rate": round(self.metrics["hedge_wins"] / hedges * 100, 2) if hedges else 0,
+            "hedge_rate": round(hedges / self.metrics["requests"] * 100, 2) if self.metrics["requests"] else 0,
+            "rate_capped": self.metrics["hedges_rate_capped"]
         }
     
     async def health_check(self) -> Dict[str, Any]:
@@ -130,13 +683,14 @@ class BaseAgent(ABC):
                 {"role": "user", "content": "Hello, this is a health check. Please respond with 'OK'."}
             ]
             
-            response = await self._make_llm_request(test_messages, max_tokens=10)
+            response = await self._make_llm_request(test_messages, use_cache=False, max_tokens=10)
             
             return {
                 "agent": self.name,
                 "healthy": True,
                 "response_time": time.time(),
-                "test_response": response[:50]  # First 50 chars
+                "test_response": response[:50],  # First 50 chars
+                "circuit_state": self.circuit_state
             }
             
         except Exception as e:
@@ -144,5 +698,6 @@ class BaseAgent(ABC):
                 "agent": self.name,
                 "healthy": False,
                 "error": str(e),
-                "response_time": time.time()
+                "response_time": time.time(),
+                "circuit_state": self.circuit_state
             }
\ No newline at end of file
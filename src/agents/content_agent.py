@@ -3,14 +3,117 @@ Content Agent - Manages content generation and refinement.
 """
 
 import asyncio
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, AsyncIterator
 from .base_agent import BaseAgent
+from ..core.prompts import get_prompt_registry
+from ..core.usage import UsageMeter, usage_scope
 
 class ContentAgent(BaseAgent):
     """Specialized agent for content generation and refinement tasks."""
     
+    # content type -> (system instructions, user message format, whether style guidance applies)
+    prompt_specs = {
+        "explanation": (
+            """You are a content specialist focused on clear explanations.
+            
+            Structure your explanation with:
+            1. Clear introduction
+            2. Main concepts with examples
+            3. Step-by-step breakdown if applicable
+            4. Conclusion or summary
+            
+            Make it accessible and engaging while maintaining accuracy.""",
+            "Please explain: {request}",
+            True
+        ),
+        "summary": (
+            """You are a content specialist focused on creating concise summaries.
+            
+            Create a summary that:
+            1. Captures key points
+            2. Maintains essential information
+            3. Uses clear, direct language
+            4. Follows logical structure
+            
+            Prioritize clarity and completeness within the length constraints.""",
+            "Please summarize: {request}",
+            True
+        ),
+        "analysis": (
+            """You are a content specialist focused on analytical writing.
+            
+            Provide analysis that includes:
+            1. Context and background
+            2. Key factors and variables
+            3. Relationships and patterns
+            4. Implications and conclusions
+            5. Supporting evidence and reasoning
+            
+            Maintain objectivity and critical thinking throughout.""",
+            "Please analyze: {request}",
+            True
+        ),
+        "creative": (
+            """You are a creative content specialist.
+            
+            Create engaging, original content that:
+            1. Captures attention and interest
+            2. Uses vivid language and imagery
+            3. Maintains coherent narrative or structure
+            4. Balances creativity with clarity
+            
+            Be imaginative while staying relevant to the request.""",
+            "Creative content request: {request}",
+            False
+        ),
+        "technical": (
+            """You are a technical documentation specialist.
+            
+            Create technical content that:
+            1. Uses precise, accurate terminology
+            2. Includes step-by-step instructions when applicable
+            3. Provides examples and code snippets if relevant
+            4. Follows standard documentation practices
+            5. Considers different skill levels
+            
+            Prioritize accuracy, completeness, and usability.""",
+            "Technical documentation request: {request}",
+            False
+        )
+    }
+    
+    # Drafting one part of a piece from a section of research findings (pipelined workflows)
+    section_prompt = (
+        """You are a content specialist writing one part of a longer piece.
+        
+        You receive the original request and one section of research
+        findings. Write only the part of the answer that covers these
+        findings, without an introduction or conclusion for the whole piece.""",
+        "Request: {request}\n\nResearch findings for this part:\n{findings}"
+    )
+    
+    # Completion limit of one section draft
+    section_max_tokens = 300
+    
+    length_guidance = {
+        "short": "Keep it concise (100-200 words). Focus on essential information only.",
+        "medium": "Provide moderate detail (200-500 words). Balance completeness with brevity.",
+        "long": "Provide comprehensive coverage (500-800 words). Include detailed explanations and examples.",
+        "extended": "Create thorough, in-depth content (800+ words). Cover all relevant aspects comprehensively."
+    }
+    
+    style_guidance = {
+        "professional": "Use formal, business-appropriate language. Maintain professional tone throughout.",
+        "casual": "Use conversational, friendly language. Be approachable and relatable.",
+        "academic": "Use scholarly language with proper citations and formal structure.",
+        "technical": "Use precise technical terminology. Focus on accuracy and clarity.",
+        "creative": "Use engaging, expressive language. Be imaginative and compelling."
+    }
+    
     def __init__(self, config, logger):
         super().__init__("ContentAgent", config, logger)
+        self.prompt_registry = get_prompt_registry()
+        self._compile_prompts()
         self.content_templates = {
             "explanation": "Provide a clear, structured explanation",
             "summary": "Create a concise summary",
@@ -18,6 +121,7 @@ class ContentAgent(BaseAgent):
             "creative": "Generate creative content",
             "technical": "Provide technical documentation"
         }
+        self.content_type_usage: Dict[str, UsageMeter] = {}
     
     async def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Process content generation request."""
@@ -33,17 +137,18 @@ class ContentAgent(BaseAgent):
             
             self.logger.info(f"ContentAgent: Generating {content_type} content: {content_request[:100]}...")
             
-            # Generate content based on type
-            if content_type == "summary":
-                result = await self._generate_summary(content_request, style, length)
-            elif content_type == "analysis":
-                result = await self._generate_analysis(content_request, style, length)
-            elif content_type == "creative":
-                result = await self._generate_creative(content_request, style, length)
-            elif content_type == "technical":
-                result = await self._generate_technical(content_request, style, length)
-            else:
-                result = await self._generate_explanation(content_request, style, length)
+            # Generate content based on type, metering its LLM usage per content type
+            with usage_scope(self.content_type_usage.setdefault(content_type, UsageMeter())):
+                if content_type == "summary":
+                    result = await self._generate_summary(content_request, style, length)
+                elif content_type == "analysis":
+                    result = await self._generate_analysis(content_request, style, length)
+                elif content_type == "creative":
+                    result = await self._generate_creative(content_request, style, length)
+                elif content_type == "technical":
+                    result = await self._generate_technical(content_request, style, length)
+                else:
+                    result = await self._generate_explanation(content_request, style, length)
             
             return result
             
@@ -55,33 +160,30 @@ class ContentAgent(BaseAgent):
                 "agent": self.name
             }
     
+    async def stream_content(self, input_data: Dict[str, Any]) -> AsyncIterator[str]:
+        """Stream generated content as filtered text deltas.
+        
+        Takes the same input as ``process`` and raises ValueError on invalid input.
+        """
+        
+        if not self.validate_input(input_data):
+            raise ValueError("Invalid input data")
+        
+        content_request = input_data.get("content_request", input_data.get("task", ""))
+        content_type = input_data.get("content_type", "explanation")
+        style = input_data.get("style", "professional")
+        length = input_data.get("length", "medium")
+        
+        self.logger.info(f"ContentAgent: Streaming {content_type} content: {content_request[:100]}...")
+        
+        messages = self._build_messages(content_type, content_request, style, length)
+        async for delta in self._stream_llm_request(messages, max_tokens=self._get_max_tokens(length)):
+            yield delta
+    
     async def _generate_explanation(self, request: str, style: str, length: str) -> Dict[str, Any]:
         """Generate explanatory content."""
         
-        length_guidance = self._get_length_guidance(length)
-        style_guidance = self._get_style_guidance(style)
-        
-        messages = [
-            {
-                "role": "system",
-                "content": f"""You are a content specialist focused on clear explanations.
-                
-                Style: {style_guidance}
-                Length: {length_guidance}
-                
-                Structure your explanation with:
-                1. Clear introduction
-                2. Main concepts with examples
-                3. Step-by-step breakdown if applicable
-                4. Conclusion or summary
-                
-                Make it accessible and engaging while maintaining accuracy."""
-            },
-            {
-                "role": "user",
-                "content": f"Please explain: {request}"
-            }
-        ]
+        messages = self._build_messages("explanation", request, style, length)
         
         try:
             response = await self._make_llm_request(messages, max_tokens=self._get_max_tokens(length))
@@ -107,30 +209,7 @@ class ContentAgent(BaseAgent):
     async def _generate_summary(self, request: str, style: str, length: str) -> Dict[str, Any]:
         """Generate summary content."""
         
-        length_guidance = self._get_length_guidance(length)
-        style_guidance = self._get_style_guidance(style)
-        
-        messages = [
-            {
-                "role": "system",
-                "content": f"""You are a content specialist focused on creating concise summaries.
-                
-                Style: {style_guidance}
-                Length: {length_guidance}
-                
-                Create a summary that:
-                1. Captures key points
-                2. Maintains essential information
-                3. Uses clear, direct language
-                4. Follows logical structure
-                
-                Prioritize clarity and completeness within the length constraints."""
-            },
-            {
-                "role": "user",
-                "content": f"Please summarize: {request}"
-            }
-        ]
+        messages = self._build_messages("summary", request, style, length)
         
         try:
             response = await self._make_llm_request(messages, max_tokens=self._get_max_tokens(length))
@@ -156,31 +235,7 @@ class ContentAgent(BaseAgent):
     async def _generate_analysis(self, request: str, style: str, length: str) -> Dict[str, Any]:
         """Generate analytical content."""
         
-        length_guidance = self._get_length_guidance(length)
-        style_guidance = self._get_style_guidance(style)
-        
-        messages = [
-            {
-                "role": "system",
-                "content": f"""You are a content specialist focused on analytical writing.
-                
-                Style: {style_guidance}
-                Length: {length_guidance}
-                
-                Provide analysis that includes:
-                1. Context and background
-                2. Key factors and variables
-                3. Relationships and patterns
-                4. Implications and conclusions
-                5. Supporting evidence and reasoning
-                
-                Maintain objectivity and critical thinking throughout."""
-            },
-            {
-                "role": "user",
-                "content": f"Please analyze: {request}"
-            }
-        ]
+        messages = self._build_messages("analysis", request, style, length)
         
         try:
             response = await self._make_llm_request(messages, max_tokens=self._get_max_tokens(length))
@@ -206,28 +261,7 @@ class ContentAgent(BaseAgent):
     async def _generate_creative(self, request: str, style: str, length: str) -> Dict[str, Any]:
         """Generate creative content."""
         
-        length_guidance = self._get_length_guidance(length)
-        
-        messages = [
-            {
-                "role": "system",
-                "content": f"""You are a creative content specialist.
-                
-                Length: {length_guidance}
-                
-                Create engaging, original content that:
-                1. Captures attention and interest
-                2. Uses vivid language and imagery
-                3. Maintains coherent narrative or structure
-                4. Balances creativity with clarity
-                
-                Be imaginative while staying relevant to the request."""
-            },
-            {
-                "role": "user",
-                "content": f"Creative content request: {request}"
-            }
-        ]
+        messages = self._build_messages("creative", request, style, length)
         
         try:
             response = await self._make_llm_request(messages, max_tokens=self._get_max_tokens(length))
@@ -253,29 +287,7 @@ class ContentAgent(BaseAgent):
     async def _generate_technical(self, request: str, style: str, length: str) -> Dict[str, Any]:
         """Generate technical documentation content."""
         
-        length_guidance = self._get_length_guidance(length)
-        
-        messages = [
-            {
-                "role": "system",
-                "content": f"""You are a technical documentation specialist.
-                
-                Length: {length_guidance}
-                
-                Create technical content that:
-                1. Uses precise, accurate terminology
-                2. Includes step-by-step instructions when applicable
-                3. Provides examples and code snippets if relevant
-                4. Follows standard documentation practices
-                5. Considers different skill levels
-                
-                Prioritize accuracy, completeness, and usability."""
-            },
-            {
-                "role": "user",
-                "content": f"Technical documentation request: {request}"
-            }
-        ]
+        messages = self._build_messages("technical", request, style, length)
         
         try:
             response = await self._make_llm_request(messages, max_tokens=self._get_max_tokens(length))
@@ -298,30 +310,71 @@ class ContentAgent(BaseAgent):
                 "agent": self.name
             }
     
-    def _get_length_guidance(self, length: str) -> str:
-        """Get length guidance for content generation."""
+    def _compile_prompts(self):
+        """Compile every (type, style, length) prompt and the per-style section prompt once per process."""
         
-        guidance = {
-            "short": "Keep it concise (100-200 words). Focus on essential information only.",
-            "medium": "Provide moderate detail (200-500 words). Balance completeness with brevity.",
-            "long": "Provide comprehensive coverage (500-800 words). Include detailed explanations and examples.",
-            "extended": "Create thorough, in-depth content (800+ words). Cover all relevant aspects comprehensively."
-        }
+        for content_type, (system, user_format, uses_style) in self.prompt_specs.items():
+            for style in self.style_guidance:
+                for length in self.length_guidance:
+                    guidance = [f"Length: {self.length_guidance[length]}"]
+                    if uses_style:
+                        guidance.insert(0, f"Style: {self.style_guidance[style]}")
+                    self.prompt_registry.compile(("ContentAgent", content_type, style, length), system, user_format, guidance)
         
-        return guidance.get(length, guidance["medium"])
+        system, user_format = self.section_prompt
+        for style in self.style_guidance:
+            self.prompt_registry.compile(("ContentAgent", "section", style), system, user_format, [f"Style: {self.style_guidance[style]}"])
     
-    def _get_style_guidance(self, style: str) -> str:
-        """Get style guidance for content generation."""
+    async def draft_section(self, request: str, findings: str, style: str = "professional", max_tokens: Optional[int] = None) -> Dict[str, Any]:
+        """Draft the part of the content covering one section of research findings."""
         
-        guidance = {
-            "professional": "Use formal, business-appropriate language. Maintain professional tone throughout.",
-            "casual": "Use conversational, friendly language. Be approachable and relatable.",
-            "academic": "Use scholarly language with proper citations and formal structure.",
-            "technical": "Use precise technical terminology. Focus on accuracy and clarity.",
-            "creative": "Use engaging, expressive language. Be imaginative and compelling."
-        }
+        messages = self.prompt_registry.render(
+            ("ContentAgent", "section", style if style in self.style_guidance else "professional"),
+            request=request,
+            findings=findings
+        )
+        
+        try:
+            with usage_scope(self.content_type_usage.setdefault("section", UsageMeter())):
+                response = await self._make_llm_request(messages, max_tokens=max_tokens or self.section_max_tokens)
+            filtered_response = self.filter_output(response)
+            
+            return {
+                "success": True,
+                "content": filtered_response,
+                "word_count": len(filtered_response.split()),
+                "agent": self.name
+            }
+            
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "agent": self.name
+            }
+    
+    def _build_messages(self, content_type: str, request: str, style: str, length: str) -> List[Dict[str, str]]:
+        """Build the LLM messages for a content type from its precompiled template."""
         
-        return guidance.get(style, guidance["professional"])
+        key = (
+            "ContentAgent",
+            content_type if content_type in self.prompt_specs else "explanation",
+            style if style in self.style_guidance else "professional",
+            length if length in self.length_guidance else "medium"
+        )
+        return self.prompt_registry.render(key, request=request)
+    
+    def _get_length_guidance(self, length: str) -> str:
+        """Get length guidance for content generation."""
+        return self.length_guidance.get(length, self.length_guidance["medium"])
+    
+    def _get_style_guidance(self, style: str) -> str:
+        """Get style guidance for content generation."""
+        return self.style_guidance.get(style, self.style_guidance["professional"])
+    
+    def section_max_tokens_for(self, length: str) -> int:
+        """Completion limit of one section draft, scaled by length like a whole piece's."""
+        return round(self.section_max_tokens * self._get_max_tokens(length) / self._get_max_tokens("medium"))
     
     def _get_max_tokens(self, length: str) -> int:
         """Get maximum tokens based on length requirement."""
@@ -370,6 +423,15 @@ class ContentAgent(BaseAgent):
         
         return True
     
+    def get_content_type_usage(self) -> Dict[str, Any]:
+        """Get token usage and estimated cost per content type."""
+        
+        return {
+            "usage_by_content_type": {
+                content_type: meter.to_dict() for content_type, meter in self.content_type_usage.items()
+            }
+        }
+    
     async def refine_content(self, content: str, refinement_instructions: str) -> Dict[str, Any]:
         """Refine existing content based on instructions."""
         
@@ -3,18 +3,49 @@ Coordinator Agent - Orchestrates workflow and manages agent communication.
 """
 
 import asyncio
-from typing import Dict, Any, List
+import json
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, Any, List, Optional, AsyncIterator, Iterable, Union
 from .base_agent import BaseAgent
 from .research_agent import ResearchAgent
 from .content_agent import ContentAgent
 from .validation_agent import ValidationAgent
+from ..core.history import WorkflowHistory
+from ..core.planner import RulePlanner, PlanCache
+from ..core.tokens import render_context
+from ..core.usage import UsageMeter, usage_scope
+from ..core.workflow_dag import WorkflowDAG
 
 class CoordinatorAgent(BaseAgent):
     """Coordinates multi-agent workflows and manages task distribution."""
     
+    # Run when the planner's answer cannot be parsed into a valid plan
+    default_steps = [
+        {"agent": "ResearchAgent", "action": "Gather relevant information", "priority": 1},
+        {"agent": "ContentAgent", "action": "Generate response", "priority": 2},
+        {"agent": "ValidationAgent", "action": "Validate output", "priority": 3}
+    ]
+    
+    # Models accepting response_format={"type": "json_object"}; others (e.g. gpt-4) reject it with a 400
+    json_mode_models = ("gpt-4o", "gpt-4-turbo", "gpt-4-1106", "gpt-4-0125", "gpt-4.1", "gpt-3.5-turbo")
+    
+    # "planned" runs the LLM's plan; "pipelined" drafts content from research sections as they
+    # stream in, and "sequential" runs the same research and drafting one after the other
+    workflow_modes = ["planned", "pipelined", "sequential"]
+    
+    # Recent process_many task latencies kept for percentiles
+    bulk_latency_window = 1000
+    
     def __init__(self, config, logger):
         super().__init__("CoordinatorAgent", config, logger)
-        self.workflow_history = []
+        # Compact records of recent workflows; full payloads optionally spill to disk
+        self.workflow_history = WorkflowHistory(
+            config.workflow_history_size,
+            Path(config.workflow_history_spill_dir) / "workflows.jsonl" if config.workflow_history_spill_dir else None,
+            spill_max_bytes=int(config.workflow_history_spill_max_mb * 1024 * 1024)
+        )
         
         # Initialize specialized agents
         self.research_agent = ResearchAgent(config, logger)
@@ -26,6 +57,47 @@ class CoordinatorAgent(BaseAgent):
             "ContentAgent": self.content_agent,
             "ValidationAgent": self.validation_agent
         }
+        
+        # Confident task shapes skip the LLM planner; LLM plans are reused per shape
+        self.rule_planner = RulePlanner()
+        self.plan_cache = PlanCache(config.plan_cache_size, config.plan_cache_ttl_seconds)
+        
+        self.planning_metrics = {
+            "plans": 0,
+            "by_source": {"rules": 0, "cache": 0, "llm": 0},
+            "llm_plan_time": 0.0,
+            "parsed": 0,
+            "invalid": 0,
+            "failed": 0,
+            "invalid_steps": 0,
+            "steps_planned": 0,
+            "steps_skipped": 0,
+            "skipped_by_agent": {agent_name: 0 for agent_name in self.agents}
+        }
+        
+        self.execution_metrics = {
+            "workflows": 0,
+            "wall_time": 0.0,
+            "step_time": 0.0,
+            "critical_path_time": 0.0,
+            "critical_path_by_agent": {},
+            "by_mode": {mode: {"workflows": 0, "wall_time": 0.0, "time_to_first_output": 0.0} for mode in self.workflow_modes}
+        }
+        
+        self.bulk_metrics = {
+            "runs": 0,
+            "tasks": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "timed_out": 0,
+            "elapsed": 0.0
+        }
+        self._bulk_latencies = deque(maxlen=self.bulk_latency_window)
+        self.last_bulk_run: Optional[Dict[str, Any]] = None
+        
+        # LLM usage of all completed workflows, planning included
+        self.workflow_usage = UsageMeter()
+        self.workflows_metered = 0
     
     async def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Process coordination request and orchestrate workflow."""
@@ -36,27 +108,45 @@ class CoordinatorAgent(BaseAgent):
         try:
             task = input_data.get("task", "")
             context = input_data.get("context", {})
+            mode = input_data.get("mode", "planned")
             
             self.logger.info(f"CoordinatorAgent: Processing task: {task[:100]}...")
             
-            # Analyze task and determine workflow
-            workflow_plan = await self._create_workflow_plan(task, context)
+            # Every LLM call of the workflow, in this agent or a specialized one, is metered
+            with usage_scope() as usage:
+                if mode == "planned":
+                    # Analyze task and determine workflow
+                    workflow_plan = await self._create_workflow_plan(task, context)
+                    self._record_plan(workflow_plan)
+                    
+                    # Execute workflow
+                    result = await self._execute_workflow(workflow_plan, input_data)
+                else:
+                    # Research feeds content generation directly, without a planning call
+                    workflow_plan = {
+                        "steps": [
+                            {"agent": "ResearchAgent", "action": "Stream findings", "priority": 1},
+                            {"agent": "ContentAgent", "action": "Draft from findings", "priority": 1 if mode == "pipelined" else 2}
+                        ],
+                        "mode": mode
+                    }
+                    result = await self._execute_research_content(input_data, pipelined=mode == "pipelined")
+            
+            timing = result["timing"]
+            self._record_mode(mode, timing["wall_time"], timing["time_to_first_output"])
             
-            # Execute workflow
-            result = await self._execute_workflow(workflow_plan, input_data)
+            self.workflow_usage.merge(usage)
+            self.workflows_metered += 1
+            workflow_usage = usage.to_dict()
             
             # Store workflow history
-            self.workflow_history.append({
-                "task": task,
-                "workflow_plan": workflow_plan,
-                "result": result,
-                "timestamp": asyncio.get_event_loop().time()
-            })
+            self.workflow_history.record(task, workflow_plan, result, workflow_usage, time.time())
             
             return {
                 "success": True,
                 "result": result,
                 "workflow_plan": workflow_plan,
+                "usage": workflow_usage,
                 "agent": self.name
             }
             
@@ -68,8 +158,182 @@ class CoordinatorAgent(BaseAgent):
                 "agent": self.name
             }
     
+    async def process_many(
+        self,
+        tasks: Iterable[Union[str, Dict[str, Any]]],
+        concurrency: Optional[int] = None,
+        per_task_timeout: Optional[float] = None,
+        ordered: bool = False
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Process many tasks concurrently, yielding each result as it completes.
+        
+        Tasks are ``process`` inputs, or plain task strings. At most
+        ``concurrency`` workflows (default ``bulk_concurrency``) are in flight,
+        and further tasks are only read from ``tasks`` as slots free up. A task
+        failing or exceeding ``per_task_timeout`` seconds yields an error result
+        without affecting the others. With ``ordered``, results are yielded in
+        input order, and no new task starts while ``concurrency`` finished
+        results are held back behind a slower earlier one. Each result carries
+        the task's ``index`` and ``latency``.
+        """
+        
+        concurrency = concurrency or self.config.bulk_concurrency
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        
+        inputs = iter(enumerate(tasks))
+        pending = set()
+        completed: Dict[int, Dict[str, Any]] = {}
+        next_index = 0
+        run = {"tasks": 0, "succeeded": 0, "failed": 0, "timed_out": 0}
+        latencies = []
+        started = time.monotonic()
+        
+        def start_next() -> bool:
+            item = next(inputs, None)
+            if item is None:
+                return False
+            index, task = item
+            input_data = {"task": task} if isinstance(task, str) else task
+            pending.add(asyncio.ensure_future(self._process_one(index, input_data, per_task_timeout)))
+            return True
+        
+        try:
+            while len(pending) < concurrency and start_next():
+                pass
+            
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for finished in done:
+                    pending.discard(finished)
+                    result = finished.result()
+                    completed[result["index"]] = result
+                    
+                    run["tasks"] += 1
+                    run["succeeded" if result.get("success") else "failed"] += 1
+                    run["timed_out"] += bool(result.get("timed_out"))
+                    latencies.append(result["latency"])
+                    self._bulk_latencies.append(result["latency"])
+                
+                # Unordered: yield everything finished; ordered: only the next indexes in sequence
+                ready = []
+                if ordered:
+                    while next_index in completed:
+                        ready.append(completed.pop(next_index))
+                        next_index += 1
+                else:
+                    ready = [completed.pop(index) for index in sorted(completed)]
+                
+                # Refill before yielding, but not while results wait behind a slow earlier task
+                while len(pending) < concurrency and len(completed) < concurrency and start_next():
+                    pass
+                
+                for result in ready:
+                    yield result
+        finally:
+            # The caller stopped early: cancel the workflows still running
+            for unfinished in pending:
+                unfinished.cancel()
+            self._record_bulk_run(run, latencies, time.monotonic() - started)
+    
+    async def _process_one(self, index: int, input_data: Dict[str, Any], timeout: Optional[float]) -> Dict[str, Any]:
+        """Run one workflow of a bulk run, turning a failure or timeout into an error result."""
+        
+        start_time = time.monotonic()
+        try:
+            result = await asyncio.wait_for(self.process(input_data), timeout=timeout)
+        except asyncio.TimeoutError:
+            self.logger.warning(f"CoordinatorAgent: Bulk task {index} timed out after {timeout}s")
+            result = {
+                "error": f"Task timed out after {timeout}s",
+                "success": False,
+                "timed_out": True,
+                "agent": self.name
+            }
+        except Exception as e:
+            self.logger.error(f"CoordinatorAgent: Bulk task {index} failed: {str(e)}")
+            result = {
+                "error": str(e),
+                "success": False,
+                "agent": self.name
+            }
+        
+        return {**result, "index": index, "latency": round(time.monotonic() - start_time, 3)}
+    
+    def _record_bulk_run(self, run: Dict[str, int], latencies: List[float], elapsed: float):
+        """Add a bulk run to the bulk metrics and keep its own report."""
+        
+        metrics = self.bulk_metrics
+        metrics["runs"] += 1
+        metrics["elapsed"] += elapsed
+        for field in ("tasks", "succeeded", "failed", "timed_out"):
+            metrics[field] += run[field]
+        
+        self.last_bulk_run = {
+            **run,
+            "elapsed": round(elapsed, 3),
+            "throughput": round(run["tasks"] / elapsed, 2) if elapsed > 0 else 0,
+            "latency": self._latency_percentiles(latencies)
+        }
+    
+    @staticmethod
+    def _latency_percentiles(latencies: Iterable[float]) -> Dict[str, float]:
+        """Nearest-rank p50, p90, p99 and max of a set of latencies."""
+        
+        latencies = sorted(latencies)
+        if not latencies:
+            return {"p50": 0, "p90": 0, "p99": 0, "max": 0}
+        return {
+            "p50": round(latencies[int(0.50 * (len(latencies) - 1))], 3),
+            "p90": round(latencies[int(0.90 * (len(latencies) - 1))], 3),
+            "p99": round(latencies[int(0.99 * (len(latencies) - 1))], 3),
+            "max": round(latencies[-1], 3)
+        }
+    
+    def get_bulk_metrics(self) -> Dict[str, Any]:
+        """Get process_many totals, throughput and task latency percentiles."""
+        
+        metrics = self.bulk_metrics
+        
+        return {
+            "bulk": {
+                "runs": metrics["runs"],
+                "tasks": metrics["tasks"],
+                "succeeded": metrics["succeeded"],
+                "failed": metrics["failed"],
+                "timed_out": metrics["timed_out"],
+                "throughput": round(metrics["tasks"] / metrics["elapsed"], 2) if metrics["elapsed"] > 0 else 0,
+                "latency": self._latency_percentiles(self._bulk_latencies),
+                "last_run": self.last_bulk_run
+            }
+        }
+    
     async def _create_workflow_plan(self, task: str, context: Dict[str, Any]) -> Dict[str, Any]:
-        """Create a workflow plan based on the task requirements."""
+        """Create a workflow plan from the rules, the plan cache or, failing both, the LLM planner."""
+        
+        classification = self.rule_planner.classify(task, has_context=bool(context))
+        shape = classification["shape"]
+        
+        if classification["confidence"] >= self.config.planner_rules_min_confidence:
+            workflow_plan, source = classification["plan"], "rules"
+        else:
+            workflow_plan = self.plan_cache.get(shape)
+            source = "cache"
+            if workflow_plan is None:
+                start_time = time.perf_counter()
+                workflow_plan = await self._create_llm_plan(task, context)
+                self.planning_metrics["llm_plan_time"] += time.perf_counter() - start_time
+                source = "llm"
+                if not workflow_plan.get("fallback"):
+                    self.plan_cache.put(shape, {k: v for k, v in workflow_plan.items() if k != "raw_response"})
+        
+        self.logger.debug(f"CoordinatorAgent: Plan from {source} (confidence {classification['confidence']})")
+        workflow_plan["planner"] = source
+        workflow_plan["planner_confidence"] = classification["confidence"]
+        return workflow_plan
+    
+    async def _create_llm_plan(self, task: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Ask the LLM for a workflow plan based on the task requirements."""
         
         messages = [
             {
@@ -82,10 +346,20 @@ class CoordinatorAgent(BaseAgent):
                 - ContentAgent: Content generation and refinement
                 - ValidationAgent: Quality assurance and safety checks
                 
-                Respond with a JSON structure containing:
+                Include only the steps the task needs. Simple questions and
+                requests need only ContentAgent. Add ResearchAgent when facts
+                must be gathered first, and ValidationAgent when the output
+                needs a safety or quality review.
+                
+                Steps with the same priority run in parallel, so independent
+                research questions can be separate steps. A step runs after
+                all lower-priority steps, or only after the step ids listed
+                in its optional "depends_on".
+                
+                Respond with a JSON object containing:
                 {
                     "steps": [
-                        {"agent": "agent_name", "action": "description", "priority": 1-3}
+                        {"id": "step_id", "agent": "agent_name", "action": "description", "priority": 1-3, "depends_on": ["step_id"]}
                     ],
                     "estimated_time": "time_estimate",
                     "complexity": "low|medium|high"
@@ -93,25 +367,36 @@ class CoordinatorAgent(BaseAgent):
             },
             {
                 "role": "user",
-                "content": f"Task: {task}\nContext: {context}"
+                "content": "Task: \nContext: "
             }
         ]
         
+        # Compact JSON instead of the dict repr; task and context share the remaining budget
+        prompt = self._fit_prompt(
+            {"task": task, "context": render_context(context)},
+            fixed="".join(message["content"] for message in messages)
+        )
+        messages[1]["content"] = f"Task: {prompt['task']}\nContext: {prompt['context']}"
+        
+        request_kwargs = {"max_tokens": 500, "temperature": 0}
+        if self.config.planner_json_mode and self.config.openai_model.startswith(self.json_mode_models):
+            request_kwargs["response_format"] = {"type": "json_object"}
+        
         try:
-            response = await self._make_llm_request(messages, max_tokens=500)
+            response = await self._make_llm_request(messages, **request_kwargs)
             
-            # Parse the response (simplified - in production, use proper JSON parsing)
-            workflow_plan = {
-                "steps": [
-                    {"agent": "ResearchAgent", "action": "Gather relevant information", "priority": 1},
-                    {"agent": "ContentAgent", "action": "Generate response", "priority": 2},
-                    {"agent": "ValidationAgent", "action": "Validate output", "priority": 3}
-                ],
-                "estimated_time": "30-60 seconds",
-                "complexity": "medium",
-                "raw_response": response
-            }
+            workflow_plan = self._parse_workflow_plan(response)
+            if workflow_plan is None:
+                self.logger.warning("CoordinatorAgent: Invalid workflow plan, using the default workflow")
+                workflow_plan = {
+                    "steps": [dict(step) for step in self.default_steps],
+                    "estimated_time": "30-60 seconds",
+                    "complexity": "medium",
+                    "fallback": True,
+                    "fallback_reason": "invalid_plan"
+                }
             
+            workflow_plan["raw_response"] = response
             return workflow_plan
             
         except Exception as e:
@@ -123,28 +408,293 @@ class CoordinatorAgent(BaseAgent):
                 ],
                 "estimated_time": "15-30 seconds",
                 "complexity": "low",
-                "fallback": True
+                "fallback": True,
+                "fallback_reason": "planning_failed"
             }
     
-    async def _execute_workflow(self, workflow_plan: Dict[str, Any], input_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute the planned workflow."""
+    def _parse_workflow_plan(self, response: str) -> Optional[Dict[str, Any]]:
+        """Parse the planner's JSON answer into a plan of known agents; None if nothing valid remains."""
+        
+        try:
+            plan = json.loads(response)
+        except (TypeError, ValueError):
+            # Models without JSON mode may wrap the object in prose or a code fence
+            start, end = (response or "").find("{"), (response or "").rfind("}")
+            try:
+                plan = json.loads(response[start:end + 1]) if 0 <= start < end else None
+            except ValueError:
+                plan = None
+        
+        if not isinstance(plan, dict) or not isinstance(plan.get("steps"), list):
+            return None
+        
+        steps = []
+        for position, step in enumerate(plan["steps"]):
+            agent_name = step.get("agent") if isinstance(step, dict) else None
+            action = step.get("action") if isinstance(step, dict) else None
+            action = action if isinstance(action, str) and action else "Process task"
+            # An agent may run several times (e.g. parallel research), but not twice for the same action
+            if agent_name not in self.agents or any(s["agent"] == agent_name and s["action"] == action for s in steps):
+                self.planning_metrics["invalid_steps"] += 1
+                continue
+            
+            priority = step.get("priority")
+            parsed_step = {
+                "agent": agent_name,
+                "action": action,
+                "priority": min(max(priority, 1), 3) if isinstance(priority, int) else min(position + 1, 3)
+            }
+            
+            step_id = step.get("id")
+            if isinstance(step_id, str) and step_id and all(s.get("id") != step_id for s in steps):
+                parsed_step["id"] = step_id
+            depends_on = step.get("depends_on")
+            if isinstance(depends_on, list):
+                parsed_step["depends_on"] = [dep for dep in depends_on if isinstance(dep, str)]
+            steps.append(parsed_step)
+        
+        if not steps:
+            return None
         
-        results = {}
+        complexity = plan.get("complexity")
+        estimated_time = plan.get("estimated_time")
+        return {
+            # Stable sort keeps the planner's order within a priority
+            "steps": sorted(steps, key=lambda step: step["priority"]),
+            "estimated_time": estimated_time if isinstance(estimated_time, str) else "unknown",
+            "complexity": complexity if complexity in ("low", "medium", "high") else "medium"
+        }
+    
+    def _record_plan(self, workflow_plan: Dict[str, Any]):
+        """Count the plan's outcome and the agents it leaves out."""
+        
+        metrics = self.planning_metrics
+        metrics["plans"] += 1
+        source = workflow_plan.get("planner", "llm")
+        metrics["by_source"][source] += 1
+        # Parse outcomes are those of LLM planning calls only
+        if source == "llm":
+            if workflow_plan.get("fallback_reason") == "invalid_plan":
+                metrics["invalid"] += 1
+            elif workflow_plan.get("fallback"):
+                metrics["failed"] += 1
+            else:
+                metrics["parsed"] += 1
         
-        for step in workflow_plan.get("steps", []):
+        planned = {step.get("agent") for step in workflow_plan.get("steps", [])}
+        metrics["steps_planned"] += len(workflow_plan.get("steps", []))
+        for agent_name in self.agents:
+            if agent_name not in planned:
+                metrics["steps_skipped"] += 1
+                metrics["skipped_by_agent"][agent_name] += 1
+    
+    def get_planning_metrics(self) -> Dict[str, Any]:
+        """Get plan parse outcomes and how often each agent's step is skipped."""
+        
+        metrics = self.planning_metrics
+        plans = metrics["plans"]
+        possible_steps = plans * len(self.agents)
+        llm_plans = metrics["by_source"]["llm"]
+        planner_hits = plans - llm_plans
+        
+        # Each rule or cache plan saves about one average LLM planning round trip
+        average_llm_plan_time = metrics["llm_plan_time"] / llm_plans if llm_plans else 0
+        time_saved = planner_hits * average_llm_plan_time
+        
+        return {
+            "planning": {
+                "plans": plans,
+                "by_source": dict(metrics["by_source"]),
+                "planner_hit_rate": round(planner_hits / plans * 100, 2) if plans else 0,
+                "average_llm_plan_time": round(average_llm_plan_time, 3),
+                "estimated_time_saved": round(time_saved, 3),
+                "time_saved_per_workflow": round(time_saved / plans, 3) if plans else 0,
+                "plan_cache": self.plan_cache.get_stats(),
+                "parsed": metrics["parsed"],
+                "invalid": metrics["invalid"],
+                "failed": metrics["failed"],
+                "parse_rate": round(metrics["parsed"] / llm_plans * 100, 2) if llm_plans else 0,
+                "invalid_steps": metrics["invalid_steps"],
+                "average_steps": round(metrics["steps_planned"] / plans, 2) if plans else 0,
+                "steps_skipped": metrics["steps_skipped"],
+                "skip_rate": round(metrics["steps_skipped"] / possible_steps * 100, 2) if possible_steps else 0,
+                "skip_rate_by_agent": {
+                    agent_name: round(skipped / plans * 100, 2) if plans else 0
+                    for agent_name, skipped in metrics["skipped_by_agent"].items()
+                }
+            }
+        }
+    
+    async def _execute_workflow(self, workflow_plan: Dict[str, Any], input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute the planned workflow as a dependency graph of steps."""
+        
+        async def run_step(step: Dict[str, Any]) -> Dict[str, Any]:
             agent_name = step.get("agent")
             action = step.get("action")
             
             self.logger.info(f"CoordinatorAgent: Executing step - {agent_name}: {action}")
-            
-            # Simulate agent execution (in a real system, this would call actual agents)
-            step_result = await self._simulate_agent_execution(agent_name, action, input_data)
-            results[agent_name] = step_result
+            return await self._simulate_agent_execution(agent_name, action, input_data)
+        
+        # Independent steps run concurrently; each waits only for the steps it depends on
+        dag = WorkflowDAG(workflow_plan.get("steps", []))
+        results, timing = await dag.run(run_step, self.config.workflow_max_parallel_steps)
+        # The synthesized output is only available once every step is done
+        timing["time_to_first_output"] = timing["wall_time"]
+        self._record_execution(timing)
         
         return {
             "workflow_results": results,
             "final_output": self._synthesize_results(results),
-            "execution_summary": f"Completed {len(workflow_plan.get('steps', []))} steps"
+            "execution_summary": f"Completed {len(results)} steps",
+            "timing": timing
+        }
+    
+    def _record_execution(self, timing: Dict[str, Any]):
+        """Add a workflow's step timings and critical path to the execution metrics."""
+        
+        metrics = self.execution_metrics
+        metrics["workflows"] += 1
+        metrics["wall_time"] += timing["wall_time"]
+        metrics["step_time"] += timing["step_time"]
+        metrics["critical_path_time"] += timing["critical_path_time"]
+        for step_id in timing["critical_path"]:
+            agent_name = timing["steps"][step_id]["agent"]
+            metrics["critical_path_by_agent"][agent_name] = metrics["critical_path_by_agent"].get(agent_name, 0) + 1
+    
+    async def _execute_research_content(self, input_data: Dict[str, Any], pipelined: bool) -> Dict[str, Any]:
+        """Research the task and draft content from the findings.
+        
+        Research findings stream in section by section. Pipelined, each section
+        goes through a queue to ContentAgent, which drafts it while research
+        is still generating. Otherwise all findings are drafted in one call
+        once research is done, with the same total completion budget.
+        """
+        
+        task = input_data.get("task", "")
+        style = input_data.get("style", "professional")
+        length = input_data.get("length", "medium")
+        research_input = self._prepare_agent_input("ResearchAgent", None, input_data)
+        
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.config.pipeline_queue_size)
+        draft_slots = asyncio.Semaphore(self.config.workflow_max_parallel_steps)
+        sections: List[str] = []
+        drafts: List[asyncio.Task] = []
+        research = {"success": True}
+        marks: Dict[str, float] = {}
+        started = time.monotonic()
+        
+        async def produce():
+            try:
+                async for section in self.research_agent.stream_findings(research_input):
+                    marks.setdefault("first_section", time.monotonic())
+                    sections.append(section)
+                    if pipelined:
+                        await queue.put(section)
+            except Exception as e:
+                self.logger.error(f"CoordinatorAgent: Research stream failed: {str(e)}")
+                research.update(success=False, error=str(e))
+            finally:
+                marks["research_done"] = time.monotonic()
+                await queue.put(None)
+        
+        async def draft(findings: str, max_tokens: int) -> Dict[str, Any]:
+            async with draft_slots:
+                result = await self.content_agent.draft_section(task, findings, style, max_tokens=max_tokens)
+            if not drafts or drafts[0] is asyncio.current_task():
+                marks.setdefault("first_output", time.monotonic())
+            return result
+        
+        async def consume():
+            section_tokens = self.content_agent.section_max_tokens_for(length)
+            if pipelined:
+                # Start drafting each section as soon as it arrives
+                while True:
+                    section = await queue.get()
+                    if section is None:
+                        break
+                    drafts.append(asyncio.ensure_future(draft(section, section_tokens)))
+            else:
+                await queue.get()
+                if sections:
+                    # One draft of every section, but never over the whole piece's completion limit
+                    max_tokens = min(section_tokens * len(sections), self.content_agent._get_max_tokens(length))
+                    drafts.append(asyncio.ensure_future(draft("\n\n".join(sections), max_tokens)))
+        
+        try:
+            await asyncio.gather(produce(), consume())
+            draft_results = list(await asyncio.gather(*drafts))
+        finally:
+            for pending_draft in drafts:
+                pending_draft.cancel()
+        
+        finished = time.monotonic()
+        findings = "\n\n".join(sections)
+        content = "\n\n".join(result["content"] for result in draft_results if result.get("success"))
+        
+        results = {
+            "ResearchAgent": {
+                "success": research["success"] and bool(sections),
+                "output": findings,
+                "agent": "ResearchAgent",
+                "action": "Stream findings",
+                "details": {**research, "sections": len(sections)}
+            },
+            "ContentAgent": {
+                "success": bool(draft_results) and all(result.get("success") for result in draft_results),
+                "output": content,
+                "agent": "ContentAgent",
+                "action": "Draft from findings",
+                "details": {"drafts": draft_results}
+            }
+        }
+        
+        return {
+            "workflow_results": results,
+            "final_output": content or self._synthesize_results(results),
+            "execution_summary": f"Drafted {len(draft_results)} parts from {len(sections)} research sections",
+            "timing": {
+                "mode": "pipelined" if pipelined else "sequential",
+                "wall_time": round(finished - started, 3),
+                "time_to_first_output": round(marks.get("first_output", finished) - started, 3),
+                "first_section_time": round(marks.get("first_section", finished) - started, 3),
+                "research_time": round(marks.get("research_done", finished) - started, 3),
+                "sections": len(sections),
+                "drafts": len(draft_results)
+            }
+        }
+    
+    def _record_mode(self, mode: str, wall_time: float, time_to_first_output: float):
+        """Add a workflow's latency and time to first output to its mode's metrics."""
+        
+        metrics = self.execution_metrics["by_mode"][mode]
+        metrics["workflows"] += 1
+        metrics["wall_time"] += wall_time
+        metrics["time_to_first_output"] += time_to_first_output
+    
+    def get_execution_metrics(self) -> Dict[str, Any]:
+        """Get how much workflow steps overlap and which agents sit on the critical path."""
+        
+        metrics = self.execution_metrics
+        workflows = metrics["workflows"]
+        
+        return {
+            "execution": {
+                "workflows": workflows,
+                "max_parallel_steps": self.config.workflow_max_parallel_steps,
+                "average_wall_time": round(metrics["wall_time"] / workflows, 3) if workflows else 0,
+                "average_step_time": round(metrics["step_time"] / workflows, 3) if workflows else 0,
+                "average_critical_path_time": round(metrics["critical_path_time"] / workflows, 3) if workflows else 0,
+                "parallelism": round(metrics["step_time"] / metrics["wall_time"], 2) if metrics["wall_time"] > 0 else 0,
+                "critical_path_by_agent": dict(metrics["critical_path_by_agent"]),
+                "by_mode": {
+                    mode: {
+                        "workflows": mode_metrics["workflows"],
+                        "average_wall_time": round(mode_metrics["wall_time"] / mode_metrics["workflows"], 3) if mode_metrics["workflows"] else 0,
+                        "average_time_to_first_output": round(mode_metrics["time_to_first_output"] / mode_metrics["workflows"], 3) if mode_metrics["workflows"] else 0
+                    }
+                    for mode, mode_metrics in metrics["by_mode"].items()
+                }
+            }
         }
     
     async def _simulate_agent_execution(self, agent_name: str, action: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -154,26 +704,18 @@ class CoordinatorAgent(BaseAgent):
             if agent_name in self.agents:
                 agent = self.agents[agent_name]
                 
-                # Prepare agent-specific input
-                agent_input = {
-                    "task": input_data.get("task", ""),
-                    "context": input_data.get("context", {}),
-                    "action": action
-                }
+                # Skip the step instead of queuing it behind a failing endpoint
+                if agent.circuit_open:
+                    self.logger.warning(f"CoordinatorAgent: Skipping {agent_name}, LLM circuit is open")
+                    return {
+                        "success": False,
+                        "error": "LLM endpoint circuit is open",
+                        "agent": agent_name,
+                        "action": action,
+                        "skipped": True
+                    }
                 
-                # Add agent-specific parameters
-                if agent_name == "ResearchAgent":
-                    agent_input["query"] = input_data.get("task", "")
-                    agent_input["research_type"] = "general"
-                elif agent_name == "ContentAgent":
-                    agent_input["content_request"] = input_data.get("task", "")
-                    agent_input["content_type"] = "explanation"
-                    agent_input["style"] = "professional"
-                    agent_input["length"] = "medium"
-                elif agent_name == "ValidationAgent":
-                    # For validation, we need content from previous agents
-                    agent_input["content"] = input_data.get("content", input_data.get("task", ""))
-                    agent_input["validation_type"] = "comprehensive"
+                agent_input = self._prepare_agent_input(agent_name, action, input_data)
                 
                 # Execute the agent
                 result = await agent.process(agent_input)
@@ -198,6 +740,49 @@ class CoordinatorAgent(BaseAgent):
                 "action": action
             }
     
+    def _prepare_agent_input(self, agent_name: str, action: Optional[str], input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Map the coordinator input onto a specialized agent's input."""
+        
+        agent_input = {
+            "task": input_data.get("task", ""),
+            "context": input_data.get("context", {}),
+            "action": action
+        }
+        
+        # Add agent-specific parameters
+        if agent_name == "ResearchAgent":
+            # Parallel research steps differ only in their action, so it is the query's focus
+            task = input_data.get("task", "")
+            agent_input["query"] = f"{task}\nFocus: {action}" if action else task
+            agent_input["research_type"] = "general"
+        elif agent_name == "ContentAgent":
+            agent_input["content_request"] = input_data.get("task", "")
+            agent_input["content_type"] = "explanation"
+            agent_input["style"] = input_data.get("style", "professional")
+            agent_input["length"] = input_data.get("length", "medium")
+        elif agent_name == "ValidationAgent":
+            # For validation, we need content from previous agents
+            agent_input["content"] = input_data.get("content", input_data.get("task", ""))
+            agent_input["validation_type"] = "comprehensive"
+        
+        return agent_input
+    
+    async def stream_response(self, input_data: Dict[str, Any]) -> AsyncIterator[str]:
+        """Stream the ContentAgent's answer for a task as text deltas.
+        
+        Skips planning, research and validation so the first tokens reach the
+        caller as early as possible. Raises ValueError on invalid input.
+        """
+        
+        if not self.validate_input(input_data):
+            raise ValueError("Invalid input data")
+        
+        self.logger.info(f"CoordinatorAgent: Streaming response for task: {input_data.get('task', '')[:100]}...")
+        
+        agent_input = self._prepare_agent_input("ContentAgent", "Generate response", input_data)
+        async for delta in self.content_agent.stream_content(agent_input):
+            yield delta
+    
     async def _llm_agent_simulation(self, agent_name: str, action: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Fallback LLM simulation for unknown agents."""
         
@@ -247,9 +832,22 @@ class CoordinatorAgent(BaseAgent):
         # Simple synthesis - in production, this could be more sophisticated
         return "\n\n".join(successful_results)
     
+    def validate_input(self, input_data: Dict[str, Any]) -> bool:
+        """Validate coordinator input, including the workflow mode."""
+        
+        if not super().validate_input(input_data):
+            return False
+        
+        mode = input_data.get("mode", "planned")
+        if mode not in self.workflow_modes:
+            self.logger.error(f"{self.name}: Invalid workflow mode: {mode}")
+            return False
+        
+        return True
+    
     def get_workflow_history(self) -> List[Dict[str, Any]]:
         """Get workflow execution history."""
-        return self.workflow_history[-10:]  # Return last 10 workflows
+        return self.workflow_history.recent(10)  # Return last 10 workflows
     
     def get_all_agent_metrics(self) -> Dict[str, Any]:
         """Get metrics from all agents."""
@@ -257,6 +855,11 @@ class CoordinatorAgent(BaseAgent):
         metrics = {
             "coordinator": self.get_metrics()
         }
+        metrics["coordinator"].update(self.get_planning_metrics())
+        metrics["coordinator"].update(self.get_execution_metrics())
+        metrics["coordinator"].update(self.get_bulk_metrics())
+        metrics["coordinator"]["usage_summary"] = self.get_usage_summary()
+        metrics["coordinator"]["history"] = self.workflow_history.get_stats()
         
         for agent_name, agent in self.agents.items():
             metrics[agent_name.lower()] = agent.get_metrics()
@@ -264,9 +867,38 @@ class CoordinatorAgent(BaseAgent):
             # Add specialized metrics for validation agent
             if agent_name == "ValidationAgent":
                 metrics[agent_name.lower()].update(agent.get_validation_metrics())
+            elif agent_name == "ContentAgent":
+                metrics[agent_name.lower()].update(agent.get_content_type_usage())
         
         return metrics
     
+    def get_usage_summary(self) -> Dict[str, Any]:
+        """Get token usage and estimated cost across agents, most expensive agent first."""
+        
+        total = UsageMeter()
+        by_agent = {}
+        for agent in [self, *self.agents.values()]:
+            total.merge(agent.usage)
+            by_agent[agent.name] = agent.usage.to_dict()
+        
+        totals = total.to_dict()
+        for agent_usage in by_agent.values():
+            agent_usage["cost_share"] = round(agent_usage["cost"] / totals["cost"] * 100, 2) if totals["cost"] else 0
+        
+        workflows = self.workflow_usage.to_dict()
+        count = self.workflows_metered
+        
+        return {
+            "total": totals,
+            "by_agent": dict(sorted(by_agent.items(), key=lambda item: item[1]["cost"], reverse=True)),
+            "workflows": {
+                "count": count,
+                "average_cost": round(workflows["cost"] / count, 6) if count else 0,
+                "average_tokens": round(workflows["total_tokens"] / count, 2) if count else 0,
+                "average_calls": round(workflows["calls"] / count, 2) if count else 0
+            }
+        }
+    
     async def health_check_all_agents(self) -> Dict[str, Any]:
         """Perform health check on all agents."""
         
@@ -290,5 +922,6 @@ class CoordinatorAgent(BaseAgent):
         return {
             "system_healthy": all_healthy,
             "individual_results": health_results,
+            "circuit_breaker": self.circuit_breaker.get_stats() if self.circuit_breaker is not None else self.backend.get_stats(),
             "timestamp": asyncio.get_event_loop().time()
         }
\ No newline at end of file
@@ -3,15 +3,80 @@ Research Agent - Handles information gathering and analysis.
 """
 
 import asyncio
-from typing import Dict, Any, List
+from typing import Dict, Any, List, AsyncIterator
 from .base_agent import BaseAgent
+from ..core.semantic_cache import SemanticCache
+from ..core.prompts import get_prompt_registry
+from ..core.pipeline import SectionSplitter
 
 class ResearchAgent(BaseAgent):
     """Specialized agent for research and information gathering tasks."""
     
+    # research type -> (system instructions, user message format)
+    prompt_specs = {
+        "general": (
+            """You are a research specialist. Provide comprehensive, accurate information on the given topic.
+            
+            Structure your response as:
+            1. Key findings (3-5 main points)
+            2. Supporting details
+            3. Relevant context
+            4. Confidence level (high/medium/low)
+            
+            Be factual, cite reasoning, and acknowledge limitations.""",
+            "Research topic: {query}"
+        ),
+        "factual": (
+            """You are a fact-checking specialist. Provide only verifiable, factual information.
+            
+            Focus on:
+            - Specific facts and figures
+            - Dates, names, and locations
+            - Quantifiable data
+            - Well-established information
+            
+            Clearly indicate when information cannot be verified or is uncertain.""",
+            "Factual research request: {query}"
+        ),
+        "analytical": (
+            """You are an analytical research specialist. Provide deep analysis and insights.
+            
+            Include:
+            - Multiple perspectives
+            - Cause and effect relationships
+            - Trends and patterns
+            - Implications and consequences
+            - Critical evaluation
+            
+            Structure your analysis clearly and support conclusions with reasoning.""",
+            "Analytical research request: {query}"
+        ),
+        "comparative": (
+            """You are a comparative research specialist. Analyze and compare different options, approaches, or perspectives.
+            
+            Provide:
+            - Clear comparison criteria
+            - Pros and cons for each option
+            - Objective evaluation
+            - Recommendations based on different use cases
+            - Summary comparison table if applicable
+            
+            Maintain objectivity and acknowledge trade-offs.""",
+            "Comparative research request: {query}"
+        )
+    }
+    
     def __init__(self, config, logger):
         super().__init__("ResearchAgent", config, logger)
         self.research_cache = {}
+        # Near-duplicate tier behind the exact cache, for rephrased questions
+        self.semantic_cache = SemanticCache(
+            threshold=config.semantic_cache_threshold,
+            max_entries=config.semantic_cache_max_entries
+        ) if config.enable_semantic_cache else None
+        self.prompt_registry = get_prompt_registry()
+        for research_type, (system, user_format) in self.prompt_specs.items():
+            self.prompt_registry.compile(("ResearchAgent", research_type), system, user_format)
     
     async def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Process research request and gather relevant information."""
@@ -31,6 +96,16 @@ class ResearchAgent(BaseAgent):
                 self.logger.info("ResearchAgent: Using cached result")
                 return self.research_cache[cache_key]
             
+            if self.semantic_cache is not None:
+                match = self.semantic_cache.lookup(query, namespace=research_type)
+                if match is not None:
+                    cached_result, similarity, cached_query = match
+                    self.logger.info(f"ResearchAgent: Using semantically cached result (similarity {similarity:.2f})")
+                    return {
+                        **cached_result,
+                        "semantic_cache": {"similarity": round(similarity, 3), "cached_query": cached_query}
+                    }
+            
             # Perform research based on type
             if research_type == "factual":
                 result = await self._factual_research(query)
@@ -43,6 +118,8 @@ class ResearchAgent(BaseAgent):
             
             # Cache the result
             self.research_cache[cache_key] = result
+            if self.semantic_cache is not None and result.get("success"):
+                self.semantic_cache.add(query, result, namespace=research_type)
             
             return result
             
@@ -54,27 +131,33 @@ class ResearchAgent(BaseAgent):
                 "agent": self.name
             }
     
+    async def stream_findings(self, input_data: Dict[str, Any]) -> AsyncIterator[str]:
+        """Stream research findings section by section as they are generated.
+        
+        Takes the same input as ``process`` and raises ValueError on invalid
+        input. Sections end at paragraphs and list items, or after
+        ``pipeline_section_max_chars`` characters. Streamed findings are not cached.
+        """
+        
+        if not self.validate_input(input_data):
+            raise ValueError("Invalid input data")
+        
+        query = input_data.get("query", input_data.get("task", ""))
+        research_type = input_data.get("research_type", "general")
+        
+        self.logger.info(f"ResearchAgent: Streaming research findings: {query[:100]}...")
+        
+        splitter = SectionSplitter(self.config.pipeline_section_max_chars)
+        async for delta in self._stream_llm_request(self._build_messages(research_type, query), max_tokens=800):
+            for section in splitter.feed(delta):
+                yield section
+        for section in splitter.flush():
+            yield section
+    
     async def _general_research(self, query: str) -> Dict[str, Any]:
         """Perform general research on the given query."""
         
-        messages = [
-            {
-                "role": "system",
-                "content": """You are a research specialist. Provide comprehensive, accurate information on the given topic.
-                
-                Structure your response as:
-                1. Key findings (3-5 main points)
-                2. Supporting details
-                3. Relevant context
-                4. Confidence level (high/medium/low)
-                
-                Be factual, cite reasoning, and acknowledge limitations."""
-            },
-            {
-                "role": "user",
-                "content": f"Research topic: {query}"
-            }
-        ]
+        messages = self._build_messages("general", query)
         
         try:
             response = await self._make_llm_request(messages, max_tokens=800)
@@ -99,24 +182,7 @@ class ResearchAgent(BaseAgent):
     async def _factual_research(self, query: str) -> Dict[str, Any]:
         """Perform factual research focusing on verifiable information."""
         
-        messages = [
-            {
-                "role": "system",
-                "content": """You are a fact-checking specialist. Provide only verifiable, factual information.
-                
-                Focus on:
-                - Specific facts and figures
-                - Dates, names, and locations
-                - Quantifiable data
-                - Well-established information
-                
-                Clearly indicate when information cannot be verified or is uncertain."""
-            },
-            {
-                "role": "user",
-                "content": f"Factual research request: {query}"
-            }
-        ]
+        messages = self._build_messages("factual", query)
         
         try:
             response = await self._make_llm_request(messages, max_tokens=600)
@@ -141,25 +207,7 @@ class ResearchAgent(BaseAgent):
     async def _analytical_research(self, query: str) -> Dict[str, Any]:
         """Perform analytical research with deeper insights."""
         
-        messages = [
-            {
-                "role": "system",
-                "content": """You are an analytical research specialist. Provide deep analysis and insights.
-                
-                Include:
-                - Multiple perspectives
-                - Cause and effect relationships
-                - Trends and patterns
-                - Implications and consequences
-                - Critical evaluation
-                
-                Structure your analysis clearly and support conclusions with reasoning."""
-            },
-            {
-                "role": "user",
-                "content": f"Analytical research request: {query}"
-            }
-        ]
+        messages = self._build_messages("analytical", query)
         
         try:
             response = await self._make_llm_request(messages, max_tokens=1000)
@@ -184,25 +232,7 @@ class ResearchAgent(BaseAgent):
     async def _comparative_research(self, query: str) -> Dict[str, Any]:
         """Perform comparative research analyzing multiple options or perspectives."""
         
-        messages = [
-            {
-                "role": "system",
-                "content": """You are a comparative research specialist. Analyze and compare different options, approaches, or perspectives.
-                
-                Provide:
-                - Clear comparison criteria
-                - Pros and cons for each option
-                - Objective evaluation
-                - Recommendations based on different use cases
-                - Summary comparison table if applicable
-                
-                Maintain objectivity and acknowledge trade-offs."""
-            },
-            {
-                "role": "user",
-                "content": f"Comparative research request: {query}"
-            }
-        ]
+        messages = self._build_messages("comparative", query)
         
         try:
             response = await self._make_llm_request(messages, max_tokens=900)
@@ -224,6 +254,10 @@ class ResearchAgent(BaseAgent):
                 "agent": self.name
             }
     
+    def _build_messages(self, research_type: str, query: str) -> List[Dict[str, str]]:
+        """Build the LLM messages for a research type from its precompiled template."""
+        return self.prompt_registry.render(("ResearchAgent", research_type), query=query)
+    
     def _assess_confidence(self, response: str) -> str:
         """Assess confidence level based on response content."""
         
@@ -274,11 +308,14 @@ class ResearchAgent(BaseAgent):
     def clear_cache(self):
         """Clear the research cache."""
         self.research_cache.clear()
+        if self.semantic_cache is not None:
+            self.semantic_cache.clear()
         self.logger.info("ResearchAgent: Cache cleared")
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
         return {
             "cache_size": len(self.research_cache),
-            "cache_keys": list(self.research_cache.keys())[:5]  # Show first 5 keys
+            "cache_keys": list(self.research_cache.keys())[:5],  # Show first 5 keys
+            "semantic_cache": self.semantic_cache.get_stats() if self.semantic_cache is not None else None
         }
\ No newline at end of file
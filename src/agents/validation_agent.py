@@ -3,13 +3,26 @@ Validation Agent - Ensures output quality and safety.
 """
 
 import asyncio
+import json
 import re
-from typing import Dict, Any, List, Tuple
+import time
+from typing import Dict, Any, List, Tuple, Optional
 from .base_agent import BaseAgent
 
+# Asked of the cascade's small model so uncertain answers can be escalated
+VERDICT_INSTRUCTION = (
+    '\n\nEnd your answer with a final line of JSON, exactly {"issues_found": true or false, "confident": true or false}. '
+    'Set "confident" to true only if you are sure of your assessment.'
+)
+
 class ValidationAgent(BaseAgent):
     """Specialized agent for quality assurance and safety validation."""
     
+    # Words in an LLM check's answer that count as flagging an issue
+    safety_keywords = ["unsafe", "harmful"]
+    quality_keywords = ["unclear", "confusing", "incomplete", "error", "improve"]
+    technical_keywords = ["incorrect", "missing", "syntax", "deprecated", "outdated"]
+    
     def __init__(self, config, logger):
         super().__init__("ValidationAgent", config, logger)
         self.safety_patterns = self._initialize_safety_patterns()
@@ -19,6 +32,17 @@ class ValidationAgent(BaseAgent):
             "quality_issues_detected": 0,
             "validations_passed": 0
         }
+        self.cascade_enabled = config.enable_validation_cascade and config.validation_cascade_model != config.openai_model
+        self.cascade_metrics = {
+            "checks": 0,
+            "small_model_answers": 0,
+            "escalations": 0,
+            "escalated_uncertain": 0,
+            "escalated_flagged": 0,
+            "escalated_error": 0,
+            "total_time": 0.0,
+            "large_model_time": 0.0
+        }
     
     async def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Process validation request for content quality and safety."""
@@ -195,6 +219,81 @@ class ValidationAgent(BaseAgent):
             "agent": self.name
         }
     
+    def _append_fitted_content(self, messages: List[Dict[str, str]], content: str) -> List[Dict[str, str]]:
+        """Append `content` to the last message, fitted to the token budget left by the instructions."""
+        
+        fixed = "".join(message["content"] for message in messages)
+        fitted = self._fit_prompt({"content": content}, fixed=fixed)["content"]
+        return messages[:-1] + [{**messages[-1], "content": messages[-1]["content"] + fitted}]
+    
+    async def _cascade_llm_request(self, messages: List[Dict[str, str]], **kwargs) -> str:
+        """Run an LLM check on the small cascade model first, escalating to ``config.openai_model`` when needed.
+        
+        The small model ends its answer with a JSON verdict. Its answer is
+        used when the verdict is confident and reports no issues; flagged
+        issues, uncertain or unparseable verdicts and small-model errors are
+        re-checked by the large model. If the endpoint does not have the small
+        model (404), the cascade is turned off for this agent.
+        """
+        
+        if not self.cascade_enabled:
+            return await self._make_llm_request(messages, **kwargs)
+        
+        start = time.monotonic()
+        self.cascade_metrics["checks"] += 1
+        small_messages = [{**messages[0], "content": messages[0]["content"] + VERDICT_INSTRUCTION}] + messages[1:]
+        
+        try:
+            try:
+                answer = await self._make_llm_request(small_messages, model=self.config.validation_cascade_model, **kwargs)
+                answer, verdict = self._split_verdict(answer)
+                if verdict is None or verdict.get("confident") is not True:
+                    reason = "uncertain"
+                elif verdict.get("issues_found") is not False:
+                    reason = "flagged"
+                else:
+                    reason = None
+            except Exception as e:
+                self.logger.warning(f"ValidationAgent: Cascade model failed, escalating: {str(e)}")
+                reason = "error"
+                if getattr(e, "status_code", None) == 404:
+                    # The endpoint has no such model; every later check would fail the same way
+                    self.cascade_enabled = False
+                    self.logger.warning(f"ValidationAgent: {self.config.validation_cascade_model} not found, disabling the cascade")
+            
+            if reason is None:
+                self.cascade_metrics["small_model_answers"] += 1
+                return answer
+            
+            self.cascade_metrics["escalations"] += 1
+            self.cascade_metrics[f"escalated_{reason}"] += 1
+            self.logger.info(f"ValidationAgent: Escalating LLM check to {self.config.openai_model} ({reason})")
+            
+            large_start = time.monotonic()
+            try:
+                return await self._make_llm_request(messages, **kwargs)
+            finally:
+                self.cascade_metrics["large_model_time"] += time.monotonic() - large_start
+        finally:
+            self.cascade_metrics["total_time"] += time.monotonic() - start
+    
+    @staticmethod
+    def _split_verdict(answer: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Strip the trailing JSON verdict from a small-model answer and return (answer, verdict).
+        
+        The verdict is None when the answer does not end with a parseable one.
+        """
+        
+        answer = answer or ""
+        match = re.search(r'\{[^{}]*"confident"[^{}]*\}\s*$', answer)
+        if match is None:
+            return answer, None
+        try:
+            verdict = json.loads(match.group(0))
+        except ValueError:
+            return answer, None
+        return answer[:match.start()].rstrip(), verdict if isinstance(verdict, dict) else None
+    
     async def _llm_safety_check(self, content: str) -> Dict[str, Any]:
         """Use LLM to perform safety assessment."""
         
@@ -219,16 +318,17 @@ class ValidationAgent(BaseAgent):
             },
             {
                 "role": "user",
-                "content": f"Analyze this content for safety issues:\n\n{content[:2000]}"  # Limit content length
+                "content": "Analyze this content for safety issues:\n\n"
             }
         ]
+        messages = self._append_fitted_content(messages, content)
         
         try:
-            response = await self._make_llm_request(messages, max_tokens=400)
+            response = await self._cascade_llm_request(messages, max_tokens=400, temperature=0)
             
             # Parse response (simplified - in production, use proper JSON parsing)
             issues = []
-            if "unsafe" in response.lower() or "harmful" in response.lower():
+            if any(keyword in response.lower() for keyword in self.safety_keywords):
                 issues.append({
                     "type": "potential_safety_concern",
                     "severity": "medium",
@@ -264,18 +364,17 @@ class ValidationAgent(BaseAgent):
             },
             {
                 "role": "user",
-                "content": f"Analyze this content for quality issues:\n\n{content[:2000]}"
+                "content": "Analyze this content for quality issues:\n\n"
             }
         ]
+        messages = self._append_fitted_content(messages, content)
         
         try:
-            response = await self._make_llm_request(messages, max_tokens=300)
+            response = await self._cascade_llm_request(messages, max_tokens=300, temperature=0)
             
             # Parse response for quality issues
             issues = []
-            quality_keywords = ["unclear", "confusing", "incomplete", "error", "improve"]
-            
-            if any(keyword in response.lower() for keyword in quality_keywords):
+            if any(keyword in response.lower() for keyword in self.quality_keywords):
                 issues.append({
                     "type": "quality_concern",
                     "severity": "low",
@@ -311,18 +410,17 @@ class ValidationAgent(BaseAgent):
             },
             {
                 "role": "user",
-                "content": f"Analyze this technical content:\n\n{content[:2000]}"
+                "content": "Analyze this technical content:\n\n"
             }
         ]
+        messages = self._append_fitted_content(messages, content)
         
         try:
-            response = await self._make_llm_request(messages, max_tokens=300)
+            response = await self._cascade_llm_request(messages, max_tokens=300, temperature=0)
             
             # Parse response for technical issues
             issues = []
-            technical_keywords = ["incorrect", "missing", "syntax", "deprecated", "outdated"]
-            
-            if any(keyword in response.lower() for keyword in technical_keywords):
+            if any(keyword in response.lower() for keyword in self.technical_keywords):
                 issues.append({
                     "type": "technical_concern",
                     "severity": "medium",
@@ -523,5 +621,35 @@ class ValidationAgent(BaseAgent):
             **self.quality_metrics,
             "pass_rate": round(pass_rate, 2),
             "avg_safety_issues": round(self.quality_metrics["safety_issues_detected"] / max(1, total_validations), 2),
-            "avg_quality_issues": round(self.quality_metrics["quality_issues_detected"] / max(1, total_validations), 2)
-        }
\ No newline at end of file
+            "avg_quality_issues": round(self.quality_metrics["quality_issues_detected"] / max(1, total_validations), 2),
+            "cascade": self._get_cascade_metrics()
+        }
+    
+    def _get_cascade_metrics(self) -> Dict[str, Any]:
+        """Get cascade escalation rates and the latency change against large-model-only checks.
+        
+        Large-model latency is measured on escalated checks, so the latency
+        change is only reported once at least one check has escalated.
+        """
+        
+        checks = self.cascade_metrics["checks"]
+        escalations = self.cascade_metrics["escalations"]
+        average_latency = self.cascade_metrics["total_time"] / checks if checks else None
+        large_model_latency = self.cascade_metrics["large_model_time"] / escalations if escalations else None
+        latency_change = (
+            average_latency - large_model_latency
+            if average_latency is not None and large_model_latency is not None else None
+        )
+        
+        return {
+            "enabled": self.cascade_enabled,
+            "small_model": self.config.validation_cascade_model,
+            "large_model": self.config.openai_model,
+            **{key: value for key, value in self.cascade_metrics.items() if not key.endswith("_time")},
+            "escalation_rate": round(escalations / checks * 100, 2) if checks else 0,
+            "average_latency": round(average_latency, 3) if average_latency is not None else None,
+            "large_model_latency": round(large_model_latency, 3) if large_model_latency is not None else None,
+            "latency_change": round(latency_change, 3) if latency_change is not None else None,
+            "latency_change_percent": round(latency_change / large_model_latency * 100, 2) if latency_change is not None and large_model_latency > 0 else None
+        }
+
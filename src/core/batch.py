@@ -0,0 +1,329 @@
+"""
+Offline batch execution for agent jobs.
+Collects the LLM requests agents would send, submits them as OpenAI
+Batch-format JSONL through a pluggable backend, and feeds the results
+back into each agent's normal result construction.
+"""
+
+import asyncio
+import contextvars
+import json
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple, Callable
+
+from .llm_client import get_client_pool
+
+CHAT_COMPLETIONS_ENDPOINT = "/v1/chat/completions"
+
+class BatchError(Exception):
+    """Raised when a batch, or one request in it, fails."""
+    pass
+
+class BatchBackend(ABC):
+    """Submits Batch-format JSONL files and returns their output records."""
+    
+    @abstractmethod
+    async def submit(self, input_path: Path) -> str:
+        """Submit a JSONL input file and return the batch id."""
+        pass
+    
+    @abstractmethod
+    async def poll(self, batch_id: str) -> Optional[List[Dict[str, Any]]]:
+        """Return the batch's output records once it has finished, None while it is running."""
+        pass
+
+class OpenAIBatchBackend(BatchBackend):
+    """Backend for the OpenAI Batch API (uploads the file, creates the batch, downloads the output)."""
+    
+    def __init__(self, client_pool, work_dir: Path, completion_window: str = "24h"):
+        self.client_pool = client_pool
+        self.work_dir = Path(work_dir)
+        self.completion_window = completion_window
+    
+    async def submit(self, input_path: Path) -> str:
+        client = self.client_pool.get_client()
+        input_file = await client.files.create(file=(input_path.name, input_path.read_bytes()), purpose="batch")
+        batch = await client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=CHAT_COMPLETIONS_ENDPOINT,
+            completion_window=self.completion_window
+        )
+        return batch.id
+    
+    async def poll(self, batch_id: str) -> Optional[List[Dict[str, Any]]]:
+        client = self.client_pool.get_client()
+        batch = await client.batches.retrieve(batch_id)
+        
+        if batch.status in ("failed", "expired", "cancelled"):
+            raise BatchError(f"Batch {batch_id} {batch.status}")
+        if batch.status != "completed":
+            return None
+        
+        records = []
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                content = await client.files.content(file_id)
+                records.extend(json.loads(line) for line in content.text.splitlines() if line.strip())
+        
+        output_path = self.work_dir / f"{batch_id}_output.jsonl"
+        output_path.write_text("".join(json.dumps(record) + "\n" for record in records), encoding="utf-8")
+        return records
+
+def _echo_responder(body: Dict[str, Any]) -> str:
+    """Default local response: echo the last user message."""
+    
+    user_messages = [message["content"] for message in body["messages"] if message.get("role") == "user"]
+    return f"[local batch response] {user_messages[-1] if user_messages else ''}"
+
+class LocalBatchBackend(BatchBackend):
+    """File-based stand-in for the Batch API, for tests and dry runs.
+    
+    "Completes" each batch immediately by writing an output JSONL file next
+    to the input, with one chat completion per request produced by
+    ``responder(body)``.
+    """
+    
+    def __init__(self, work_dir: Path, responder: Optional[Callable[[Dict[str, Any]], str]] = None):
+        self.work_dir = Path(work_dir)
+        self.responder = responder or _echo_responder
+        self.submitted: List[Path] = []
+    
+    async def submit(self, input_path: Path) -> str:
+        batch_id = f"local_batch_{len(self.submitted) + 1}"
+        self.submitted.append(input_path)
+        
+        output_lines = []
+        for line in input_path.read_text(encoding="utf-8").splitlines():
+            request = json.loads(line)
+            content = self.responder(request["body"])
+            # Word counts stand in for the token usage the Batch API reports
+            prompt_tokens = sum(len(str(message.get("content", "")).split()) for message in request["body"]["messages"])
+            completion_tokens = len(content.split())
+            output_lines.append(json.dumps({
+                "id": f"{batch_id}_{request['custom_id']}",
+                "custom_id": request["custom_id"],
+                "response": {
+                    "status_code": 200,
+                    "body": {
+                        "object": "chat.completion",
+                        "model": request["body"].get("model"),
+                        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                        "usage": {
+                            "prompt_tokens": prompt_tokens,
+                            "completion_tokens": completion_tokens,
+                            "total_tokens": prompt_tokens + completion_tokens
+                        }
+                    }
+                },
+                "error": None
+            }))
+        
+        (self.work_dir / f"{batch_id}_output.jsonl").write_text("".join(line + "\n" for line in output_lines), encoding="utf-8")
+        return batch_id
+    
+    async def poll(self, batch_id: str) -> Optional[List[Dict[str, Any]]]:
+        output_path = self.work_dir / f"{batch_id}_output.jsonl"
+        if not output_path.exists():
+            return None
+        return [json.loads(line) for line in output_path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+class BatchCollector:
+    """Queue of LLM requests made by agents running under a BatchRunner."""
+    
+    def __init__(self):
+        self.pending: Dict[str, Tuple[Dict[str, Any], asyncio.Future]] = {}
+        self.requests_added = 0
+    
+    def request(self, key: str, body: Dict[str, Any]) -> Tuple[asyncio.Future, bool]:
+        """Queue a request body and return (future, queued).
+        
+        Identical requests (same key) share one future; ``queued`` is only
+        True for the first, so its caller alone records the usage.
+        """
+        
+        entry = self.pending.get(key)
+        if entry is not None:
+            return entry[1], False
+        entry = (body, asyncio.get_running_loop().create_future())
+        self.pending[key] = entry
+        self.requests_added += 1
+        return entry[1], True
+    
+    def drain(self) -> Dict[str, Tuple[Dict[str, Any], asyncio.Future]]:
+        """Take every queued request."""
+        
+        pending, self.pending = self.pending, {}
+        return pending
+
+_current_batch: contextvars.ContextVar = contextvars.ContextVar("current_batch", default=None)
+
+def current_batch() -> Optional[BatchCollector]:
+    """Batch collector of the job running in this context, if any."""
+    return _current_batch.get()
+
+class BatchRunner:
+    """Runs agent jobs in batch mode.
+    
+    Each job's ``agent.process(input_data)`` runs as usual, except that LLM
+    requests are queued instead of sent. Once every job is finished or
+    waiting on a queued request, the queue is written as JSONL, submitted
+    and polled. Each completion, with its token usage, is then handed back
+    to the waiting ``_make_llm_request`` call. Agents that make several LLM calls per job
+    simply take several rounds.
+    """
+    
+    def __init__(
+        self,
+        backend: BatchBackend,
+        work_dir: Path,
+        poll_interval: float = 30.0,
+        collect_window: float = 0.05,
+        max_requests_per_batch: int = 50000
+    ):
+        self.backend = backend
+        self.work_dir = Path(work_dir)
+        self.poll_interval = poll_interval
+        self.collect_window = collect_window
+        self.max_requests_per_batch = max_requests_per_batch
+        
+        self.stats = {
+            "jobs": 0,
+            "rounds": 0,
+            "batches": 0,
+            "requests": 0,
+            "failed_requests": 0,
+            "wait_time": 0.0
+        }
+    
+    async def run(self, jobs: List[Tuple[Any, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Run (agent, input_data) jobs and return their results in order."""
+        
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        collector = BatchCollector()
+        
+        # Tasks copy the current context, so every job sees the collector
+        token = _current_batch.set(collector)
+        try:
+            tasks = [asyncio.ensure_future(agent.process(input_data)) for agent, input_data in jobs]
+        finally:
+            _current_batch.reset(token)
+        self.stats["jobs"] += len(tasks)
+        
+        try:
+            while not all(task.done() for task in tasks):
+                await self._collect_round(tasks, collector)
+                queued = collector.drain()
+                if queued:
+                    self.stats["rounds"] += 1
+                    await self._execute_round(queued)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+        
+        results = []
+        for task in tasks:
+            error = task.exception()
+            results.append(task.result() if error is None else {"success": False, "error": str(error)})
+        return results
+    
+    async def _collect_round(self, tasks: List[asyncio.Future], collector: BatchCollector):
+        """Let jobs run until each one is finished or waiting on a queued request."""
+        
+        while True:
+            added = collector.requests_added
+            _, pending = await asyncio.wait(tasks, timeout=self.collect_window)
+            if not pending:
+                return
+            if collector.pending and collector.requests_added == added:
+                return
+    
+    async def _execute_round(self, queued: Dict[str, Tuple[Dict[str, Any], asyncio.Future]]):
+        """Submit one round of queued requests (split into batches) and resolve their futures."""
+        
+        items = list(queued.values())
+        for start in range(0, len(items), self.max_requests_per_batch):
+            chunk = items[start:start + self.max_requests_per_batch]
+            batch_start = time.monotonic()
+            try:
+                records = await self._submit_batch([body for body, _ in chunk])
+            except Exception as e:
+                for _, future in chunk:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            latency = time.monotonic() - batch_start
+            
+            for index, (_, future) in enumerate(chunk):
+                if future.done():
+                    continue
+                try:
+                    future.set_result({**self._parse_record(records.get(f"request-{index}")), "latency": latency})
+                except BatchError as e:
+                    self.stats["failed_requests"] += 1
+                    future.set_exception(e)
+    
+    async def _submit_batch(self, bodies: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Write bodies as Batch-format JSONL, submit them and wait for the output records."""
+        
+        self.stats["batches"] += 1
+        self.stats["requests"] += len(bodies)
+        input_path = self.work_dir / f"batch_{int(time.time() * 1000)}_{self.stats['batches']}_input.jsonl"
+        input_path.write_text("".join(
+            json.dumps({"custom_id": f"request-{index}", "method": "POST", "url": CHAT_COMPLETIONS_ENDPOINT, "body": body}) + "\n"
+            for index, body in enumerate(bodies)
+        ), encoding="utf-8")
+        
+        start = time.monotonic()
+        batch_id = await self.backend.submit(input_path)
+        records = await self.backend.poll(batch_id)
+        while records is None:
+            await asyncio.sleep(self.poll_interval)
+            records = await self.backend.poll(batch_id)
+        self.stats["wait_time"] += time.monotonic() - start
+        
+        return {record.get("custom_id"): record for record in records}
+    
+    @staticmethod
+    def _parse_record(record: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Extract the completion text and token usage from one output record."""
+        
+        if record is None:
+            raise BatchError("No output record for batch request")
+        if record.get("error"):
+            raise BatchError(f"Batch request failed: {record['error']}")
+        
+        response = record.get("response") or {}
+        if response.get("status_code") != 200:
+            raise BatchError(f"Batch request failed with status {response.get('status_code')}: {response.get('body')}")
+        
+        body = response["body"]
+        usage = body.get("usage") or {}
+        return {
+            "content": body["choices"][0]["message"]["content"],
+            "prompt_tokens": usage.get("prompt_tokens") or 0,
+            "cached_tokens": (usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0,
+            "completion_tokens": usage.get("completion_tokens") or 0,
+            "total_tokens": usage.get("total_tokens") or 0
+        }
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get job, round, batch and request counts."""
+        
+        stats = dict(self.stats)
+        stats["wait_time"] = round(stats["wait_time"], 3)
+        return stats
+
+def create_batch_runner(config, backend: Optional[BatchBackend] = None) -> BatchRunner:
+    """Build a BatchRunner from `config`, using the configured backend unless one is given."""
+    
+    work_dir = Path(config.batch_work_dir)
+    if backend is None:
+        if config.batch_backend == "local":
+            backend = LocalBatchBackend(work_dir)
+        else:
+            backend = OpenAIBatchBackend(get_client_pool(config), work_dir, config.batch_completion_window)
+    
+    return BatchRunner(backend, work_dir, poll_interval=config.batch_poll_interval)
@@ -0,0 +1,195 @@
+"""
+Circuit breaker for LLM endpoints.
+Stops sending requests to a failing endpoint and probes it before resuming.
+"""
+
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Tuple
+
+from .retry import is_transient_error
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose circuit is open."""
+    
+    def __init__(self, message: str, retry_in: float = 0.0):
+        super().__init__(message)
+        self.retry_in = retry_in
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker shared by all agents on an endpoint.
+    
+    The circuit opens after ``failure_threshold`` consecutive transient
+    failures (timeouts, connection errors, 429, 5xx). While open, calls are
+    rejected without touching the network. After ``recovery_timeout`` seconds
+    up to ``half_open_max_calls`` probe calls are let through: a successful
+    probe closes the circuit, a failed one opens it again. Non-transient
+    errors (e.g. a 400) say nothing about endpoint health and are ignored.
+    """
+    
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0, half_open_max_calls: int = 1):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._lock = threading.Lock()
+        
+        self.stats = {
+            "rejected": 0,
+            "opened": 0,
+            "closed": 0,
+            "probes": 0
+        }
+    
+    @property
+    def state(self) -> str:
+        """Current state: "closed", "open" or "half_open"."""
+        
+        with self._lock:
+            return self._current_state(time.monotonic())
+    
+    @property
+    def is_open(self) -> bool:
+        """Whether a call made now would be rejected."""
+        
+        with self._lock:
+            state = self._current_state(time.monotonic())
+            return state == OPEN or (state == HALF_OPEN and self._probes_in_flight >= self.half_open_max_calls)
+    
+    def _current_state(self, now: float) -> str:
+        """Move an expired open circuit to half-open. Caller holds the lock."""
+        
+        if self._state == OPEN and now - self._opened_at >= self.recovery_timeout:
+            self._state = HALF_OPEN
+            self._probes_in_flight = 0
+        return self._state
+    
+    def before_call(self) -> bool:
+        """Admit a call or raise CircuitOpenError; returns True when the call is a probe."""
+        
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            
+            if state == CLOSED:
+                return False
+            
+            if state == HALF_OPEN and self._probes_in_flight < self.half_open_max_calls:
+                self._probes_in_flight += 1
+                self.stats["probes"] += 1
+                return True
+            
+            self.stats["rejected"] += 1
+            retry_in = max(0.0, self._opened_at + self.recovery_timeout - now)
+        
+        raise CircuitOpenError(f"Circuit open for LLM endpoint (retry in {retry_in:.1f}s)", retry_in=retry_in)
+    
+    def record_success(self, probe: bool = False):
+        """Record a completed call; a successful probe closes the circuit."""
+        
+        with self._lock:
+            self._consecutive_failures = 0
+            if probe and self._state == HALF_OPEN:
+                self._probes_in_flight -= 1
+                self._state = CLOSED
+                self.stats["closed"] += 1
+    
+    def record_failure(self, probe: bool = False):
+        """Record a transient failure; opens the circuit at the threshold or on a failed probe."""
+        
+        with self._lock:
+            if probe and self._state == HALF_OPEN:
+                self._probes_in_flight -= 1
+                self._open()
+            elif self._state == CLOSED:
+                self._consecutive_failures += 1
+                if self._consecutive_failures >= self.failure_threshold:
+                    self._open()
+    
+    def record_error(self, error: Exception, probe: bool = False):
+        """Record a failed call; only transient errors count against the endpoint."""
+        
+        if is_transient_error(error):
+            self.record_failure(probe)
+        else:
+            self.release(probe)
+    
+    def release(self, probe: bool = False):
+        """Record a call that ended without a verdict on endpoint health."""
+        
+        with self._lock:
+            if probe and self._state == HALF_OPEN:
+                self._probes_in_flight -= 1
+    
+    def _open(self):
+        """Open the circuit. Caller holds the lock."""
+        
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._consecutive_failures = 0
+        self.stats["opened"] += 1
+    
+    @contextmanager
+    def call(self):
+        """Guard one call: fail fast while open and feed the outcome back into the breaker."""
+        
+        probe = self.before_call()
+        try:
+            yield
+        except Exception as e:
+            self.record_error(e, probe)
+            raise
+        except BaseException:
+            # Cancelled or closed early
+            self.release(probe)
+            raise
+        self.record_success(probe)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the circuit state and transition counters."""
+        
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            return {
+                "state": state,
+                "consecutive_failures": self._consecutive_failures,
+                "failure_threshold": self.failure_threshold,
+                "recovery_timeout": self.recovery_timeout,
+                "retry_in": round(max(0.0, self._opened_at + self.recovery_timeout - now), 3) if state == OPEN else 0,
+                **self.stats
+            }
+
+_breakers: Dict[Tuple, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+def get_circuit_breaker(config) -> CircuitBreaker:
+    """Get the process-wide circuit breaker for the endpoint described by `config`."""
+    
+    key = (
+        hashlib.sha256(config.openai_api_key.encode()).hexdigest(),
+        config.openai_base_url,
+        config.circuit_breaker_failure_threshold,
+        config.circuit_breaker_recovery_timeout,
+        config.circuit_breaker_half_open_max_calls
+    )
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                failure_threshold=config.circuit_breaker_failure_threshold,
+                recovery_timeout=config.circuit_breaker_recovery_timeout,
+                half_open_max_calls=config.circuit_breaker_half_open_max_calls
+            )
+            _breakers[key] = breaker
+        return breaker
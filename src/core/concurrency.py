@@ -0,0 +1,230 @@
+"""
+Adaptive concurrency control for in-flight LLM requests.
+Uses additive-increase / multiplicative-decrease (AIMD) on the in-flight limit.
+"""
+
+import asyncio
+import hashlib
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional, Tuple
+
+import openai
+
+class ConcurrencyLimitExceeded(Exception):
+    """Raised when a request waits too long for an in-flight slot."""
+    pass
+
+def is_overload_error(error: Exception) -> bool:
+    """Whether an error means the provider is overloaded (429 or timeout)."""
+    
+    if isinstance(error, (asyncio.TimeoutError, openai.APITimeoutError, openai.RateLimitError)):
+        return True
+    return getattr(error, "status_code", None) == 429
+
+class _Waiter:
+    """A queued acquire call, woken on its own event loop."""
+    
+    __slots__ = ("loop", "future", "granted")
+    
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.future = loop.create_future()
+        self.granted = False
+
+def _wake(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD limit on concurrent LLM requests, shared by all agents on an endpoint.
+    
+    The limit grows by roughly one slot per limit's worth of fast responses
+    while the limit is actually being used, and is multiplied by
+    ``backoff_ratio`` on 429s, timeouts or latency above
+    ``latency_tolerance`` times the observed no-load latency, at most once
+    per round trip so one burst of failures counts as one signal. Latency
+    baselines are kept per request size class (the requested ``max_tokens``)
+    so a long completion is not mistaken for provider slowdown.
+    """
+    
+    def __init__(
+        self,
+        initial_limit: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        backoff_ratio: float = 0.5,
+        latency_tolerance: float = 2.0,
+        baseline_window: int = 100
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+        
+        self.limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self.in_flight = 0
+        self._waiters = deque()
+        self.baseline_window = baseline_window
+        self._latencies: Dict[Any, deque] = {}
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+        
+        self.stats = {
+            "acquired": 0,
+            "rejections": 0,
+            "increases": 0,
+            "decreases": 0,
+            "overload_signals": 0,
+            "latency_inflation_signals": 0
+        }
+    
+    @property
+    def current_limit(self) -> int:
+        """Effective number of requests allowed in flight."""
+        return max(self.min_limit, int(self.limit))
+    
+    async def acquire(self, timeout: Optional[float] = None):
+        """Wait for an in-flight slot; raise ConcurrencyLimitExceeded after `timeout` seconds."""
+        
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self.in_flight < self.current_limit and not self._waiters:
+                self.in_flight += 1
+                self.stats["acquired"] += 1
+                return
+            waiter = _Waiter(loop)
+            self._waiters.append(waiter)
+        
+        try:
+            await asyncio.wait_for(waiter.future, timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            with self._lock:
+                if waiter.granted:
+                    # The slot arrived while we were giving up on it
+                    if isinstance(e, asyncio.TimeoutError):
+                        self.stats["acquired"] += 1
+                        return
+                    self.in_flight -= 1
+                    self._grant()
+                else:
+                    self._waiters.remove(waiter)
+                    if isinstance(e, asyncio.TimeoutError):
+                        self.stats["rejections"] += 1
+            if isinstance(e, asyncio.TimeoutError):
+                raise ConcurrencyLimitExceeded(
+                    f"No LLM request slot within {timeout}s (limit {self.current_limit})"
+                ) from None
+            raise
+        
+        with self._lock:
+            self.stats["acquired"] += 1
+    
+    def release(self, latency: Optional[float] = None, overloaded: bool = False, size_class: Any = None):
+        """Return a slot and feed the request outcome into the AIMD controller."""
+        
+        with self._lock:
+            if overloaded:
+                self.stats["overload_signals"] += 1
+                self._decrease(cooldown=self._overload_cooldown(latency, size_class))
+            elif latency is not None:
+                self._on_latency(latency, size_class)
+            
+            self.in_flight -= 1
+            self._grant()
+    
+    def _on_latency(self, latency: float, size_class: Any):
+        """Grow the limit while latency stays near baseline; shrink it when it inflates."""
+        
+        samples = self._latencies.setdefault(size_class, deque(maxlen=self.baseline_window))
+        samples.append(latency)
+        baseline = min(samples)
+        
+        if latency > baseline * self.latency_tolerance and len(samples) >= 5:
+            self.stats["latency_inflation_signals"] += 1
+            self._decrease(cooldown=baseline)
+        elif self.in_flight >= self.current_limit / 2 and self.limit < self.max_limit:
+            # Only grow a limit that is being used, otherwise idle periods inflate it
+            before = self.current_limit
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            if self.current_limit > before:
+                self.stats["increases"] += 1
+    
+    def _overload_cooldown(self, latency: Optional[float], size_class: Any) -> float:
+        """One round trip: the failed request's own latency, else the no-load baseline for its size class.
+        
+        Requests that were already in flight at the last decrease were sent under
+        the old limit, so their 429s and timeouts must not cut it again.
+        """
+        
+        if latency is not None:
+            return latency
+        samples = self._latencies.get(size_class)
+        if samples:
+            return min(samples)
+        return min((min(samples) for samples in self._latencies.values() if samples), default=0.0)
+    
+    def _decrease(self, cooldown: float = 0.0):
+        """Multiplicative decrease, at most once per `cooldown` seconds."""
+        
+        now = time.monotonic()
+        if now - self._last_decrease < cooldown:
+            return
+        self._last_decrease = now
+        self.limit = max(float(self.min_limit), self.limit * self.backoff_ratio)
+        self.stats["decreases"] += 1
+    
+    def _grant(self):
+        """Hand free slots to queued waiters in FIFO order. Caller holds the lock."""
+        
+        while self._waiters and self.in_flight < self.current_limit:
+            waiter = self._waiters.popleft()
+            try:
+                waiter.loop.call_soon_threadsafe(_wake, waiter.future)
+            except RuntimeError:
+                continue  # Waiter's event loop is closed
+            waiter.granted = True
+            self.in_flight += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the current limit, queue depth and controller counters."""
+        
+        with self._lock:
+            return {
+                "current_limit": self.current_limit,
+                "min_limit": self.min_limit,
+                "max_limit": self.max_limit,
+                "in_flight": self.in_flight,
+                "queued": len(self._waiters),
+                "baseline_latency": {
+                    str(size_class): round(min(samples), 3) for size_class, samples in self._latencies.items()
+                },
+                **self.stats
+            }
+
+_limiters: Dict[Tuple, AdaptiveConcurrencyLimiter] = {}
+_limiters_lock = threading.Lock()
+
+def get_concurrency_limiter(config) -> AdaptiveConcurrencyLimiter:
+    """Get the process-wide concurrency limiter for the endpoint described by `config`."""
+    
+    key = (
+        hashlib.sha256(config.openai_api_key.encode()).hexdigest(),
+        config.openai_base_url,
+        config.concurrency_initial_limit,
+        config.concurrency_min_limit,
+        config.concurrency_max_limit,
+        config.concurrency_latency_tolerance
+    )
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = AdaptiveConcurrencyLimiter(
+                initial_limit=config.concurrency_initial_limit,
+                min_limit=config.concurrency_min_limit,
+                max_limit=config.concurrency_max_limit,
+                latency_tolerance=config.concurrency_latency_tolerance
+            )
+            _limiters[key] = limiter
+        return limiter
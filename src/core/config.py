@@ -3,11 +3,12 @@ Configuration management for the Multi-Agent AI System.
 Handles environment variables, validation, and default settings.
 """
 
+import json
 import os
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from pathlib import Path
 from dotenv import load_dotenv
-from pydantic import BaseModel, Field, field_validator, ConfigDict
+from pydantic import BaseModel, Field, field_validator, model_validator, ConfigDict
 
 # Load environment variables
 load_dotenv()
@@ -21,15 +22,103 @@ class Config(BaseModel):
     )
     
     # API Configuration
-    openai_api_key: str = Field(..., min_length=1)
+    openai_api_key: str = Field(default="")  # Required by the openai backend
     openai_model: str = Field(default="gpt-4")
+    openai_base_url: Optional[str] = Field(default=None)
+    
+    # LLM Backend Configuration ("local" is a deterministic stand-in that needs no API key)
+    llm_backend: str = Field(default="openai")
+    local_backend_latency: float = Field(default=0.05, ge=0)
+    local_backend_tokens_per_second: float = Field(default=200.0, gt=0)
+    local_backend_jitter: float = Field(default=0.0, ge=0, le=1)
+    
+    # Endpoint Pool Configuration (llm_backend="pool" spreads requests across these endpoints)
+    llm_endpoints: List[Dict[str, Any]] = Field(default_factory=list)
+    endpoint_balancing: str = Field(default="latency")
     
     # System Configuration
     max_retries: int = Field(default=3, ge=1, le=10)
+    retry_base_delay: float = Field(default=0.5, gt=0)
+    retry_max_delay: float = Field(default=8.0, gt=0)
+    retry_budget_ratio: float = Field(default=0.1, ge=0, le=1)
+    retry_budget_min_retries: int = Field(default=10, ge=0)
     timeout_seconds: int = Field(default=30, ge=5, le=300)
     max_iterations: int = Field(default=10, ge=1, le=50)
     rate_limit_requests: int = Field(default=60, ge=1)
     rate_limit_window: int = Field(default=60, ge=1)
+    rate_limit_tokens_per_minute: int = Field(default=0, ge=0)  # 0 disables the token budget
+    
+    # Adaptive Concurrency Configuration (AIMD limit on in-flight LLM requests)
+    concurrency_initial_limit: int = Field(default=8, ge=1)
+    concurrency_min_limit: int = Field(default=1, ge=1)
+    concurrency_max_limit: int = Field(default=64, ge=1)
+    concurrency_latency_tolerance: float = Field(default=2.0, gt=1.0)
+    
+    # Circuit Breaker Configuration (per LLM endpoint)
+    circuit_breaker_failure_threshold: int = Field(default=5, ge=1)
+    circuit_breaker_recovery_timeout: float = Field(default=30.0, gt=0)
+    circuit_breaker_half_open_max_calls: int = Field(default=1, ge=1)
+    
+    # Request Hedging Configuration (duplicate LLM requests slower than the agent's p95)
+    enable_request_hedging: bool = Field(default=False)
+    hedge_agents: str = Field(default="ResearchAgent,ContentAgent")
+    hedge_max_rate: float = Field(default=0.1, ge=0, le=1)
+    
+    # Response Cache Configuration (persistent, shared by worker processes on one host)
+    enable_response_cache: bool = Field(default=False)
+    response_cache_path: str = Field(default="cache/llm_responses.db")
+    response_cache_ttl_seconds: int = Field(default=86400, ge=1)
+    response_cache_max_mb: int = Field(default=256, ge=1)
+    
+    # Semantic Cache Configuration (near-duplicate research questions)
+    enable_semantic_cache: bool = Field(default=False)  # Lexical matching can reuse answers to different questions
+    semantic_cache_threshold: float = Field(default=0.9, gt=0, le=1)
+    semantic_cache_max_entries: int = Field(default=1000, ge=1)
+    
+    # Batch Mode Configuration (offline bulk jobs through a Batch API)
+    batch_backend: str = Field(default="openai")
+    batch_work_dir: str = Field(default="batches")
+    batch_poll_interval: float = Field(default=30.0, gt=0)
+    batch_completion_window: str = Field(default="24h")
+    
+    # Validation Cascade Configuration (opt-in: LLM checks try a smaller model first)
+    enable_validation_cascade: bool = Field(default=False)
+    validation_cascade_model: str = Field(default="gpt-4o-mini")
+    
+    # Workflow Planning Configuration (CoordinatorAgent runs only the planned steps)
+    planner_json_mode: bool = Field(default=True)  # Only sent to models with JSON mode, e.g. gpt-4o
+    planner_rules_min_confidence: float = Field(default=0.8, ge=0)  # Above 1 always asks the LLM
+    plan_cache_size: int = Field(default=256, ge=0)  # LLM plans kept per task shape; 0 disables
+    plan_cache_ttl_seconds: float = Field(default=3600.0, gt=0)
+    workflow_max_parallel_steps: int = Field(default=4, ge=1)  # Independent steps run concurrently
+    pipeline_section_max_chars: int = Field(default=800, ge=100)  # Research sections streamed to ContentAgent
+    pipeline_queue_size: int = Field(default=8, ge=1)
+    bulk_concurrency: int = Field(default=10, ge=1)  # Default workflows in flight in process_many
+    workflow_history_size: int = Field(default=100, ge=1)  # Compact records of recent workflows
+    workflow_history_spill_dir: str = Field(default="")  # Full payloads as JSON Lines; empty disables
+    workflow_history_spill_max_mb: float = Field(default=64.0, gt=0)  # Rotated at this size; two files kept
+    
+    # Token Budget Configuration (prompt sections are fitted to a per-call token budget)
+    prompt_token_budget: int = Field(default=3000, ge=100)
+    max_input_tokens: int = Field(default=4000, ge=1)
+    token_cache_size: int = Field(default=4096, ge=0)
+    
+    # Usage Accounting Configuration (USD per million tokens, merged over the built-in prices)
+    model_prices: Dict[str, Dict[str, float]] = Field(default_factory=dict)
+    
+    # Connection Pool Configuration
+    http_max_connections: int = Field(default=20, ge=1)
+    http_max_keepalive_connections: int = Field(default=10, ge=0)
+    http_keepalive_expiry: float = Field(default=30.0, ge=0)
+    
+    # HTTP Transport Configuration (per-phase timeouts, HTTP/2 and connection pre-warming)
+    http_connect_timeout: float = Field(default=5.0, gt=0)
+    http_read_timeout: Optional[float] = Field(default=None, gt=0)  # None uses timeout_seconds
+    http_write_timeout: float = Field(default=10.0, gt=0)
+    http_pool_timeout: float = Field(default=5.0, gt=0)
+    http2: bool = Field(default=False)  # Needs the h2 package
+    http_prewarm_connections: int = Field(default=0, ge=0)
+    http_prewarm_interval: float = Field(default=0.0, ge=0)  # 0 prewarms once per event loop
     
     # Logging Configuration
     log_level: str = Field(default="INFO")
@@ -56,11 +145,71 @@ class Config(BaseModel):
         env_values = {
             "openai_api_key": os.getenv("OPENAI_API_KEY", ""),
             "openai_model": os.getenv("OPENAI_MODEL", "gpt-4"),
+            "openai_base_url": os.getenv("OPENAI_BASE_URL") or None,
+            "llm_backend": os.getenv("LLM_BACKEND", "openai"),
+            "local_backend_latency": float(os.getenv("LOCAL_BACKEND_LATENCY", "0.05")),
+            "local_backend_tokens_per_second": float(os.getenv("LOCAL_BACKEND_TOKENS_PER_SECOND", "200")),
+            "local_backend_jitter": float(os.getenv("LOCAL_BACKEND_JITTER", "0")),
+            "llm_endpoints": os.getenv("LLM_ENDPOINTS", ""),
+            "endpoint_balancing": os.getenv("ENDPOINT_BALANCING", "latency"),
             "max_retries": int(os.getenv("MAX_RETRIES", "3")),
+            "retry_base_delay": float(os.getenv("RETRY_BASE_DELAY", "0.5")),
+            "retry_max_delay": float(os.getenv("RETRY_MAX_DELAY", "8.0")),
+            "retry_budget_ratio": float(os.getenv("RETRY_BUDGET_RATIO", "0.1")),
+            "retry_budget_min_retries": int(os.getenv("RETRY_BUDGET_MIN_RETRIES", "10")),
             "timeout_seconds": int(os.getenv("TIMEOUT_SECONDS", "30")),
             "max_iterations": int(os.getenv("MAX_ITERATIONS", "10")),
             "rate_limit_requests": int(os.getenv("RATE_LIMIT_REQUESTS", "60")),
             "rate_limit_window": int(os.getenv("RATE_LIMIT_WINDOW", "60")),
+            "rate_limit_tokens_per_minute": int(os.getenv("RATE_LIMIT_TOKENS_PER_MINUTE", "0")),
+            "concurrency_initial_limit": int(os.getenv("CONCURRENCY_INITIAL_LIMIT", "8")),
+            "concurrency_min_limit": int(os.getenv("CONCURRENCY_MIN_LIMIT", "1")),
+            "concurrency_max_limit": int(os.getenv("CONCURRENCY_MAX_LIMIT", "64")),
+            "concurrency_latency_tolerance": float(os.getenv("CONCURRENCY_LATENCY_TOLERANCE", "2.0")),
+            "circuit_breaker_failure_threshold": int(os.getenv("CIRCUIT_BREAKER_FAILURE_THRESHOLD", "5")),
+            "circuit_breaker_recovery_timeout": float(os.getenv("CIRCUIT_BREAKER_RECOVERY_TIMEOUT", "30")),
+            "circuit_breaker_half_open_max_calls": int(os.getenv("CIRCUIT_BREAKER_HALF_OPEN_MAX_CALLS", "1")),
+            "enable_request_hedging": os.getenv("ENABLE_REQUEST_HEDGING", "false").lower() == "true",
+            "hedge_agents": os.getenv("HEDGE_AGENTS", "ResearchAgent,ContentAgent"),
+            "hedge_max_rate": float(os.getenv("HEDGE_MAX_RATE", "0.1")),
+            "enable_response_cache": os.getenv("ENABLE_RESPONSE_CACHE", "false").lower() == "true",
+            "response_cache_path": os.getenv("RESPONSE_CACHE_PATH", "cache/llm_responses.db"),
+            "response_cache_ttl_seconds": int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "86400")),
+            "response_cache_max_mb": int(os.getenv("RESPONSE_CACHE_MAX_MB", "256")),
+            "enable_semantic_cache": os.getenv("ENABLE_SEMANTIC_CACHE", "false").lower() == "true",
+            "semantic_cache_threshold": float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.9")),
+            "semantic_cache_max_entries": int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "1000")),
+            "batch_backend": os.getenv("BATCH_BACKEND", "openai"),
+            "batch_work_dir": os.getenv("BATCH_WORK_DIR", "batches"),
+            "batch_poll_interval": float(os.getenv("BATCH_POLL_INTERVAL", "30")),
+            "batch_completion_window": os.getenv("BATCH_COMPLETION_WINDOW", "24h"),
+            "enable_validation_cascade": os.getenv("ENABLE_VALIDATION_CASCADE", "false").lower() == "true",
+            "validation_cascade_model": os.getenv("VALIDATION_CASCADE_MODEL", "gpt-4o-mini"),
+            "planner_json_mode": os.getenv("PLANNER_JSON_MODE", "true").lower() == "true",
+            "planner_rules_min_confidence": float(os.getenv("PLANNER_RULES_MIN_CONFIDENCE", "0.8")),
+            "plan_cache_size": int(os.getenv("PLAN_CACHE_SIZE", "256")),
+            "plan_cache_ttl_seconds": float(os.getenv("PLAN_CACHE_TTL_SECONDS", "3600")),
+            "workflow_max_parallel_steps": int(os.getenv("WORKFLOW_MAX_PARALLEL_STEPS", "4")),
+            "pipeline_section_max_chars": int(os.getenv("PIPELINE_SECTION_MAX_CHARS", "800")),
+            "pipeline_queue_size": int(os.getenv("PIPELINE_QUEUE_SIZE", "8")),
+            "bulk_concurrency": int(os.getenv("BULK_CONCURRENCY", "10")),
+            "workflow_history_size": int(os.getenv("WORKFLOW_HISTORY_SIZE", "100")),
+            "workflow_history_spill_dir": os.getenv("WORKFLOW_HISTORY_SPILL_DIR", ""),
+            "workflow_history_spill_max_mb": float(os.getenv("WORKFLOW_HISTORY_SPILL_MAX_MB", "64")),
+            "prompt_token_budget": int(os.getenv("PROMPT_TOKEN_BUDGET", "3000")),
+            "max_input_tokens": int(os.getenv("MAX_INPUT_TOKENS", "4000")),
+            "token_cache_size": int(os.getenv("TOKEN_CACHE_SIZE", "4096")),
+            "model_prices": os.getenv("MODEL_PRICES", ""),
+            "http_max_connections": int(os.getenv("HTTP_MAX_CONNECTIONS", "20")),
+            "http_max_keepalive_connections": int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "10")),
+            "http_keepalive_expiry": float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30")),
+            "http_connect_timeout": float(os.getenv("HTTP_CONNECT_TIMEOUT", "5")),
+            "http_read_timeout": float(os.getenv("HTTP_READ_TIMEOUT")) if os.getenv("HTTP_READ_TIMEOUT") else None,
+            "http_write_timeout": float(os.getenv("HTTP_WRITE_TIMEOUT", "10")),
+            "http_pool_timeout": float(os.getenv("HTTP_POOL_TIMEOUT", "5")),
+            "http2": os.getenv("HTTP2", "false").lower() == "true",
+            "http_prewarm_connections": int(os.getenv("HTTP_PREWARM_CONNECTIONS", "0")),
+            "http_prewarm_interval": float(os.getenv("HTTP_PREWARM_INTERVAL", "0")),
             "log_level": os.getenv("LOG_LEVEL", "INFO"),
             "log_file": os.getenv("LOG_FILE", "logs/app.log"),
             "enable_file_logging": os.getenv("ENABLE_FILE_LOGGING", "true").lower() == "true",
@@ -87,13 +236,63 @@ class Config(BaseModel):
             raise ValueError(f"Log level must be one of: {valid_levels}")
         return v.upper()
     
-    @field_validator("openai_api_key")
+    @field_validator("batch_backend")
     @classmethod
-    def validate_api_key(cls, v):
-        if not v or v == "your_openai_api_key_here":
-            raise ValueError("OpenAI API key must be provided")
+    def validate_batch_backend(cls, v):
+        valid_backends = ["openai", "local"]
+        if v.lower() not in valid_backends:
+            raise ValueError(f"Batch backend must be one of: {valid_backends}")
+        return v.lower()
+    
+    @field_validator("llm_backend")
+    @classmethod
+    def validate_llm_backend(cls, v):
+        valid_backends = ["openai", "local", "pool"]
+        if v.lower() not in valid_backends:
+            raise ValueError(f"LLM backend must be one of: {valid_backends}")
+        return v.lower()
+    
+    @field_validator("llm_endpoints", mode="before")
+    @classmethod
+    def validate_llm_endpoints(cls, v):
+        # LLM_ENDPOINTS holds a JSON list of endpoint objects
+        if isinstance(v, str):
+            v = json.loads(v) if v.strip() else []
+        
+        valid_keys = {"name", "base_url", "api_key", "api_key_env", "rate_limit_requests", "rate_limit_window", "max_connections"}
+        for endpoint in v:
+            if not isinstance(endpoint, dict) or not set(endpoint) <= valid_keys:
+                raise ValueError(f"Each LLM endpoint must be an object with keys from: {sorted(valid_keys)}")
+        return v
+    
+    @field_validator("model_prices", mode="before")
+    @classmethod
+    def validate_model_prices(cls, v):
+        # MODEL_PRICES holds a JSON object: model -> {"input", "output"[, "cached_input"]}
+        if isinstance(v, str):
+            v = json.loads(v) if v.strip() else {}
+        
+        for model, price in v.items():
+            if not isinstance(price, dict) or not {"input", "output"} <= set(price) <= {"input", "cached_input", "output"}:
+                raise ValueError(f"Price of {model} must have input and output (and optionally cached_input) per million tokens")
         return v
     
+    @field_validator("endpoint_balancing")
+    @classmethod
+    def validate_endpoint_balancing(cls, v):
+        valid_strategies = ["latency", "least_outstanding"]
+        if v.lower() not in valid_strategies:
+            raise ValueError(f"Endpoint balancing must be one of: {valid_strategies}")
+        return v.lower()
+    
+    @model_validator(mode="after")
+    def validate_api_key(self):
+        if self.llm_backend == "openai" and (not self.openai_api_key or self.openai_api_key == "your_openai_api_key_here"):
+            raise ValueError("OpenAI API key must be provided")
+        if self.llm_backend == "pool" and not self.llm_endpoints:
+            raise ValueError("The pool backend needs at least one entry in llm_endpoints")
+        return self
+    
     def get_allowed_file_types(self) -> list:
         """Get list of allowed file types."""
         return [ext.strip() for ext in self.allowed_file_types.split(",")]
@@ -0,0 +1,278 @@
+"""
+Pool of OpenAI-compatible LLM endpoints for the Multi-Agent AI System.
+Spreads completions across several API keys and endpoints (e.g. a
+self-hosted gateway), balancing on latency and outstanding requests.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from typing import Dict, Any, List, AsyncIterator, Optional
+
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .concurrency import AdaptiveConcurrencyLimiter, is_overload_error
+from .llm_backend import LLMBackend, OpenAIBackend
+from .llm_client import SharedClientPool, transport_options, transport_key
+from .rate_limiter import RateLimiter
+
+BALANCING_STRATEGIES = ["latency", "least_outstanding"]
+
+class PoolMember:
+    """One endpoint of the pool with its own client, rate limits, concurrency limit and circuit breaker."""
+    
+    def __init__(self, name: str, backend: OpenAIBackend, rate_limiter: RateLimiter, circuit_breaker: CircuitBreaker,
+                 concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None):
+        self.name = name
+        self.backend = backend
+        self.rate_limiter = rate_limiter
+        self.circuit_breaker = circuit_breaker
+        self.concurrency_limiter = concurrency_limiter or AdaptiveConcurrencyLimiter()
+        
+        # Decayed average call latency; 0 until the first success
+        self.latency = 0.0
+        self.stats = {
+            "requests": 0,
+            "successes": 0,
+            "failures": 0,
+            "in_flight": 0,
+            "peak_in_flight": 0
+        }
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the member's traffic, latency and health."""
+        
+        return {
+            "name": self.name,
+            "endpoint": self.backend.client_pool.base_url or "default",
+            **self.stats,
+            "latency": round(self.latency, 3),
+            "state": self.circuit_breaker.state,
+            "rate_limiter": self.rate_limiter.get_stats(),
+            "concurrency": self.concurrency_limiter.get_stats()
+        }
+
+class EndpointPool(LLMBackend):
+    """Backend that sends each completion to one member of a pool of endpoints.
+    
+    With ``balancing="latency"`` the member with the lowest decayed latency
+    times (outstanding requests + 1) is chosen (peak-EWMA), so slow members
+    get proportionally less traffic. ``"least_outstanding"`` picks the member
+    with the fewest requests in flight. Either way members whose own rate
+    limit would make the call wait are only used when all are throttled,
+    members at their own adaptive concurrency limit are used only when all
+    are, and members whose circuit is open are ejected until their recovery
+    probe. Ties rotate, so unmeasured members share the first requests.
+    """
+    
+    name = "pool"
+    per_endpoint_limits = True
+    
+    # Weight of the newest latency sample in the decayed average
+    latency_decay = 0.3
+    
+    def __init__(self, members: List[PoolMember], balancing: str = "latency"):
+        if not members:
+            raise ValueError("Endpoint pool needs at least one member")
+        if balancing not in BALANCING_STRATEGIES:
+            raise ValueError(f"Balancing must be one of: {BALANCING_STRATEGIES}")
+        
+        self.members = members
+        self.balancing = balancing
+        self._turn = 0
+        self._lock = threading.Lock()
+        
+        self.stats = {
+            "requests": 0,
+            "all_ejected": 0,
+            "all_throttled": 0
+        }
+    
+    def _score(self, member: PoolMember):
+        """Sort key of a member for the balancing strategy; lower is better."""
+        
+        if self.balancing == "least_outstanding":
+            return (member.stats["in_flight"], member.latency)
+        return member.latency * (member.stats["in_flight"] + 1)
+    
+    def _select(self) -> PoolMember:
+        """Pick a member and count the request as in flight on it."""
+        
+        with self._lock:
+            self.stats["requests"] += 1
+            candidates = [member for member in self.members if not member.circuit_breaker.is_open]
+            if not candidates:
+                self.stats["all_ejected"] += 1
+                retry_in = min(member.circuit_breaker.get_stats()["retry_in"] for member in self.members)
+                raise CircuitOpenError(f"All {len(self.members)} LLM endpoints are ejected", retry_in=retry_in)
+            
+            # Rotate the starting point so ties spread across members
+            start = self._turn % len(candidates)
+            self._turn += 1
+            candidates = candidates[start:] + candidates[:start]
+            
+            waits = {id(member): member.rate_limiter.next_available() for member in candidates}
+            if all(wait > 0 for wait in waits.values()):
+                self.stats["all_throttled"] += 1
+            member = min(candidates, key=lambda member: (
+                waits[id(member)] > 0,
+                waits[id(member)],
+                member.concurrency_limiter.in_flight >= member.concurrency_limiter.current_limit,
+                self._score(member)
+            ))
+            
+            member.stats["requests"] += 1
+            member.stats["in_flight"] += 1
+            member.stats["peak_in_flight"] = max(member.stats["peak_in_flight"], member.stats["in_flight"])
+            return member
+    
+    def _finish(self, member: PoolMember, latency: Optional[float]):
+        """Count a request as done; `latency` is None for failures."""
+        
+        with self._lock:
+            member.stats["in_flight"] -= 1
+            if latency is None:
+                member.stats["failures"] += 1
+                return
+            
+            member.stats["successes"] += 1
+            if member.latency == 0.0:
+                member.latency = latency
+            else:
+                member.latency += self.latency_decay * (latency - member.latency)
+    
+    @staticmethod
+    def _release(member: PoolMember, start: float, error: Optional[BaseException], latency: Optional[float], size_class: Any):
+        """Return the member's in-flight slot, feeding its own AIMD controller."""
+        
+        if isinstance(error, Exception) and is_overload_error(error):
+            member.concurrency_limiter.release(latency=time.monotonic() - start, overloaded=True, size_class=size_class)
+        else:
+            # Other errors and cancellations carry no latency signal
+            member.concurrency_limiter.release(latency=latency, size_class=size_class)
+    
+    async def complete(self, model: str, messages: List[Dict[str, str]], timeout: float, **kwargs) -> Dict[str, Any]:
+        member = self._select()
+        latency = None
+        try:
+            await member.rate_limiter.acquire()
+            await member.concurrency_limiter.acquire(timeout=timeout)
+            start = time.monotonic()
+            error = None
+            try:
+                with member.circuit_breaker.call():
+                    completion = await member.backend.complete(model, messages, timeout=timeout, **kwargs)
+                latency = time.monotonic() - start
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                self._release(member, start, error, latency, kwargs.get("max_tokens"))
+        finally:
+            self._finish(member, latency)
+        
+        completion["endpoint"] = member.name
+        return completion
+    
+    async def stream(self, model: str, messages: List[Dict[str, str]], timeout: float, **kwargs) -> AsyncIterator[str]:
+        member = self._select()
+        latency = None
+        try:
+            await member.rate_limiter.acquire()
+            await member.concurrency_limiter.acquire(timeout=timeout)
+            start = time.monotonic()
+            first_token_latency = None
+            error = None
+            try:
+                with member.circuit_breaker.call():
+                    async for delta in member.backend.stream(model, messages, timeout=timeout, **kwargs):
+                        if first_token_latency is None:
+                            first_token_latency = time.monotonic() - start
+                        yield delta
+                # Streams are balanced on time to first token
+                latency = first_token_latency if first_token_latency is not None else time.monotonic() - start
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                self._release(member, start, error, latency, "stream_first_token")
+        finally:
+            self._finish(member, latency)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+        
+        members = [member.get_stats() for member in self.members]
+        return {
+            "name": self.name,
+            "balancing": self.balancing,
+            **stats,
+            "healthy_members": sum(1 for member in members if member["state"] != "open"),
+            "members": members
+        }
+
+def build_endpoint_pool(config) -> EndpointPool:
+    """Build a pool from `config.llm_endpoints`; missing member settings fall back to the config's."""
+    
+    members = []
+    for index, endpoint in enumerate(config.llm_endpoints):
+        api_key = endpoint.get("api_key")
+        if api_key is None:
+            api_key = os.getenv(endpoint["api_key_env"], "") if endpoint.get("api_key_env") else config.openai_api_key
+        base_url = endpoint.get("base_url") or config.openai_base_url
+        
+        client_pool = SharedClientPool(
+            api_key=api_key,
+            base_url=base_url,
+            **transport_options(config, max_connections=endpoint.get("max_connections"))
+        )
+        members.append(PoolMember(
+            name=endpoint.get("name") or base_url or f"endpoint-{index}",
+            backend=OpenAIBackend(client_pool),
+            rate_limiter=RateLimiter(
+                requests=endpoint.get("rate_limit_requests", config.rate_limit_requests),
+                window=endpoint.get("rate_limit_window", config.rate_limit_window)
+            ),
+            circuit_breaker=CircuitBreaker(
+                failure_threshold=config.circuit_breaker_failure_threshold,
+                recovery_timeout=config.circuit_breaker_recovery_timeout,
+                half_open_max_calls=config.circuit_breaker_half_open_max_calls
+            ),
+            concurrency_limiter=AdaptiveConcurrencyLimiter(
+                initial_limit=config.concurrency_initial_limit,
+                min_limit=config.concurrency_min_limit,
+                max_limit=config.concurrency_max_limit,
+                latency_tolerance=config.concurrency_latency_tolerance
+            )
+        ))
+    
+    return EndpointPool(members, balancing=config.endpoint_balancing)
+
+def endpoint_pool_key(config) -> tuple:
+    """Registry key of the pool described by `config` (API keys are hashed)."""
+    
+    endpoints = tuple(
+        tuple(sorted(
+            (name, hashlib.sha256(str(value).encode()).hexdigest() if name == "api_key" else value)
+            for name, value in endpoint.items()
+        ))
+        for endpoint in config.llm_endpoints
+    )
+    return (
+        "pool",
+        endpoints,
+        config.endpoint_balancing,
+        hashlib.sha256(config.openai_api_key.encode()).hexdigest(),
+        config.openai_base_url,
+        *transport_key(config),
+        config.rate_limit_requests,
+        config.rate_limit_window,
+        config.circuit_breaker_failure_threshold,
+        config.circuit_breaker_recovery_timeout,
+        config.circuit_breaker_half_open_max_calls,
+        config.concurrency_initial_limit,
+        config.concurrency_min_limit,
+        config.concurrency_max_limit,
+        config.concurrency_latency_tolerance
+    )
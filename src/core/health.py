@@ -8,14 +8,17 @@ import psutil
 from typing import Dict, List, Any
 from pathlib import Path
 import requests
-from openai import OpenAI
+
+from .llm_client import get_client_pool
+from .llm_backend import get_llm_backend
 
 class HealthChecker:
     """System health monitoring and validation."""
     
     def __init__(self, config):
         self.config = config
-        self.client = OpenAI(api_key=config.openai_api_key) if config.openai_api_key else None
+        uses_api = config.llm_backend == "openai" and config.openai_api_key
+        self.client = get_client_pool(config).get_sync_client() if uses_api else None
     
     def check_system_health(self) -> Dict[str, Any]:
         """Comprehensive system health check."""
@@ -60,6 +63,22 @@ class HealthChecker:
     def _check_api_connectivity(self) -> Dict[str, Any]:
         """Check OpenAI API connectivity."""
         
+        if self.config.llm_backend == "local":
+            return {
+                "status": True,
+                "message": "Local LLM backend (no API in use)",
+                "details": {"backend": "local"}
+            }
+        
+        if self.config.llm_backend == "pool":
+            pool_stats = get_llm_backend(self.config).get_stats()
+            healthy = pool_stats["healthy_members"]
+            return {
+                "status": healthy > 0,
+                "message": f"{healthy} of {len(pool_stats['members'])} LLM endpoints in rotation",
+                "details": {member["name"]: member["state"] for member in pool_stats["members"]}
+            }
+        
         if not self.client:
             return {
                 "status": False,
@@ -157,7 +176,7 @@ class HealthChecker:
         issues = []
         
         # Check required configuration
-        if not self.config.openai_api_key:
+        if self.config.llm_backend == "openai" and not self.config.openai_api_key:
             issues.append("Missing OpenAI API key")
         
         if self.config.max_retries < 1:
@@ -0,0 +1,212 @@
+"""
+Bounded workflow history.
+Keeps compact records of the most recent coordinator workflows in a
+fixed-capacity ring buffer, so memory stays flat however long the process
+runs. Full result payloads can optionally be appended, off the event loop,
+to a size-capped JSON Lines file.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait as futures_wait
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Union
+
+class WorkflowRecord:
+    """Compact summary of one workflow: task, plan, outcome, timings and sizes."""
+    
+    __slots__ = (
+        "task_hash", "task", "mode", "planner", "steps", "success", "wall_time",
+        "time_to_first_output", "output_chars", "usage", "timestamp", "payload_offset",
+        "payload_generation"
+    )
+    
+    # Characters of the task kept in the record; the hash identifies the full task
+    task_preview_chars = 200
+    
+    def __init__(self, task: str, workflow_plan: Dict[str, Any], result: Dict[str, Any],
+                 usage: Optional[Dict[str, Any]] = None, timestamp: float = 0.0):
+        step_results = result.get("workflow_results")
+        timing = result.get("timing", {})
+        
+        self.task_hash = hashlib.sha256(task.encode("utf-8")).hexdigest()[:16]
+        self.task = task[:self.task_preview_chars]
+        self.mode = workflow_plan.get("mode", "planned")
+        self.planner = workflow_plan.get("planner")
+        self.steps = tuple(step.get("agent") for step in workflow_plan.get("steps", []))
+        if isinstance(step_results, dict):
+            self.success = all(step.get("success", False) for step in step_results.values())
+        else:
+            self.success = bool(result.get("success", True))
+        self.wall_time = timing.get("wall_time")
+        self.time_to_first_output = timing.get("time_to_first_output")
+        self.output_chars = len(result.get("final_output") or "")
+        self.usage = usage
+        self.timestamp = timestamp
+        self.payload_offset: Optional[int] = None
+        self.payload_generation: Optional[int] = None
+    
+    @classmethod
+    def from_entry(cls, entry: Dict[str, Any]) -> "WorkflowRecord":
+        """Build a record from a history entry dict with task, workflow_plan and result."""
+        return cls(
+            entry.get("task", ""),
+            entry.get("workflow_plan") or {},
+            entry.get("result") or {},
+            entry.get("usage"),
+            entry.get("timestamp", 0.0)
+        )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the record as a dict."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+class WorkflowHistory:
+    """Thread-safe ring buffer of the last ``capacity`` workflow records.
+    
+    With a ``spill_path``, each workflow's full plan and result are appended
+    to that JSON Lines file by a background writer thread, so the event loop
+    never waits on disk. Once the file would exceed ``spill_max_bytes`` it is
+    rotated to ``<name>.1``, replacing the previous one, so at most two files
+    are kept. Records note the file generation and byte offset of their
+    payload, which ``load_payload(record)`` reads back while it is kept.
+    """
+    
+    def __init__(self, capacity: int = 100, spill_path: Optional[Union[str, Path]] = None,
+                 spill_max_bytes: int = 64 * 1024 * 1024):
+        self.capacity = capacity
+        self.spill_path = Path(spill_path) if spill_path else None
+        self.spill_max_bytes = spill_max_bytes
+        self._records: "deque[WorkflowRecord]" = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self.stats = {"recorded": 0, "dropped": 0, "spilled": 0, "spilled_bytes": 0, "spill_errors": 0, "rotations": 0}
+        
+        # One writer thread keeps appends in order; only it touches the current file's size and generation
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="workflow-history") if self.spill_path else None
+        self._pending: "deque[Future]" = deque()
+        self._spill_lock = threading.Lock()
+        self._generation = 0
+        self._spill_size: Optional[int] = None
+    
+    def record(self, task: str, workflow_plan: Dict[str, Any], result: Dict[str, Any],
+               usage: Optional[Dict[str, Any]] = None, timestamp: float = 0.0) -> WorkflowRecord:
+        """Add a completed workflow, queueing its full payload for the spill file if configured."""
+        
+        record = WorkflowRecord(task, workflow_plan, result, usage, timestamp)
+        if self._writer is not None:
+            # Serialized now, so later changes to the result cannot race the writer
+            line = (json.dumps({
+                "task_hash": record.task_hash,
+                "task": task,
+                "workflow_plan": workflow_plan,
+                "result": result,
+                "timestamp": timestamp
+            }, default=str) + "\n").encode("utf-8")
+            future = self._writer.submit(self._spill, record, line)
+            with self._lock:
+                self._pending.append(future)
+                while self._pending and self._pending[0].done():
+                    self._pending.popleft()
+        self.append(record)
+        return record
+    
+    def append(self, entry: Union[WorkflowRecord, Dict[str, Any]]):
+        """Add a record, or an entry dict summarized into one; the oldest is dropped when full."""
+        
+        record = entry if isinstance(entry, WorkflowRecord) else WorkflowRecord.from_entry(entry)
+        with self._lock:
+            if len(self._records) == self.capacity:
+                self.stats["dropped"] += 1
+            self._records.append(record)
+            self.stats["recorded"] += 1
+    
+    def _spill(self, record: WorkflowRecord, line: bytes):
+        """Append a payload line to the spill file, rotating it first if full. Runs on the writer thread."""
+        
+        try:
+            with self._spill_lock:
+                if self._spill_size is None:
+                    self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+                    self._spill_size = self.spill_path.stat().st_size if self.spill_path.exists() else 0
+                
+                if self._spill_size and self._spill_size + len(line) > self.spill_max_bytes:
+                    os.replace(self.spill_path, self._rotated_path)
+                    self._generation += 1
+                    self._spill_size = 0
+                    with self._lock:
+                        self.stats["rotations"] += 1
+                
+                with open(self.spill_path, "ab") as spill_file:
+                    spill_file.write(line)
+                record.payload_offset = self._spill_size
+                record.payload_generation = self._generation
+                self._spill_size += len(line)
+            
+            with self._lock:
+                self.stats["spilled"] += 1
+                self.stats["spilled_bytes"] += len(line)
+        except OSError:
+            with self._lock:
+                self.stats["spill_errors"] += 1
+    
+    @property
+    def _rotated_path(self) -> Path:
+        return self.spill_path.with_name(self.spill_path.name + ".1")
+    
+    def flush(self, timeout: Optional[float] = None):
+        """Wait until every queued payload has been written."""
+        
+        with self._lock:
+            pending = list(self._pending)
+            self._pending.clear()
+        futures_wait(pending, timeout=timeout)
+    
+    def load_payload(self, record: Union[WorkflowRecord, Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Read a record's full payload back, or None if it was not spilled or was rotated away."""
+        
+        if isinstance(record, WorkflowRecord):
+            record = record.to_dict()
+        offset, generation = record.get("payload_offset"), record.get("payload_generation")
+        if self.spill_path is None or offset is None:
+            return None
+        
+        with self._spill_lock:
+            if generation == self._generation:
+                path = self.spill_path
+            elif generation == self._generation - 1:
+                path = self._rotated_path
+            else:
+                return None
+            with open(path, "rb") as spill_file:
+                spill_file.seek(offset)
+                return json.loads(spill_file.readline())
+    
+    def recent(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get the last ``limit`` records as dicts, oldest first."""
+        
+        with self._lock:
+            records = list(self._records)[-limit:] if limit > 0 else []
+        return [record.to_dict() for record in records]
+    
+    def clear(self):
+        """Remove all records; the spill files are kept."""
+        
+        with self._lock:
+            self._records.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the buffer size and how many records were recorded, dropped and spilled."""
+        
+        with self._lock:
+            return {
+                "size": len(self._records),
+                "capacity": self.capacity,
+                **self.stats,
+                "spill_pending": sum(1 for future in self._pending if not future.done())
+            }
+    
+    def __len__(self) -> int:
+        return len(self._records)
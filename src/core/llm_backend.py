@@ -0,0 +1,284 @@
+"""
+LLM backends for the Multi-Agent AI System.
+Agents send chat completions through a backend: the OpenAI API, or a
+deterministic local stand-in for load tests, CI benchmarks and offline runs.
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, AsyncIterator, Tuple
+
+from .llm_client import get_client_pool
+from .tokens import get_token_counter, TOKENS_PER_REPLY
+
+class LLMBackend(ABC):
+    """Sends chat completions for BaseAgent.
+    
+    ``complete`` returns a dict with the completion ``content`` and the
+    ``prompt_tokens``, ``cached_tokens`` (prompt prefix served from the
+    provider's cache), ``completion_tokens`` and ``total_tokens`` of the call
+    (None when the backend does not report usage). ``stream`` yields the
+    completion's text deltas.
+    """
+    
+    name = "base"
+    client_pool = None
+    # Backends that rate limit and eject their endpoints themselves, so agents skip the account-wide ones
+    per_endpoint_limits = False
+    
+    @abstractmethod
+    async def complete(self, model: str, messages: List[Dict[str, str]], timeout: float, **kwargs) -> Dict[str, Any]:
+        """Return one chat completion with its token usage."""
+        pass
+    
+    @abstractmethod
+    def stream(self, model: str, messages: List[Dict[str, str]], timeout: float, **kwargs) -> AsyncIterator[str]:
+        """Yield the text deltas of a streamed chat completion."""
+        pass
+    
+    @abstractmethod
+    def get_stats(self) -> Dict[str, Any]:
+        """Get backend name and usage statistics."""
+        pass
+
+def _usage_count(usage, field: str) -> Optional[int]:
+    """Read one token count from a provider usage object, if reported."""
+    
+    value = getattr(usage, field, None)
+    return value if isinstance(value, int) else None
+
+class OpenAIBackend(LLMBackend):
+    """Backend for OpenAI-compatible endpoints, through the shared client pool.
+    
+    Connect, read, write and pool timeouts come from the pool's client; the
+    caller enforces the overall ``timeout`` of the call.
+    """
+    
+    name = "openai"
+    
+    def __init__(self, client_pool):
+        self.client_pool = client_pool
+    
+    async def complete(self, model: str, messages: List[Dict[str, str]], timeout: float, **kwargs) -> Dict[str, Any]:
+        async with self.client_pool.track():
+            response = await self.client_pool.get_client().chat.completions.create(
+                model=model,
+                messages=messages,
+                **kwargs
+            )
+        
+        usage = getattr(response, "usage", None)
+        return {
+            "content": response.choices[0].message.content,
+            "prompt_tokens": _usage_count(usage, "prompt_tokens"),
+            "cached_tokens": _usage_count(getattr(usage, "prompt_tokens_details", None), "cached_tokens"),
+            "completion_tokens": _usage_count(usage, "completion_tokens"),
+            "total_tokens": _usage_count(usage, "total_tokens")
+        }
+    
+    async def stream(self, model: str, messages: List[Dict[str, str]], timeout: float, **kwargs) -> AsyncIterator[str]:
+        async with self.client_pool.track():
+            stream = await self.client_pool.get_client().chat.completions.create(
+                model=model,
+                messages=messages,
+                stream=True,
+                **kwargs
+            )
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    yield delta
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "endpoint": self.client_pool.base_url or "default"
+        }
+
+class LocalBackend(LLMBackend):
+    """Deterministic stand-in for an LLM endpoint; needs no API key or network.
+    
+    The answer to a request is a pure function of the model, messages and
+    parameters, so repeated runs produce the same text. Each call waits
+    ``latency`` seconds before the first token and then ``1 / tokens_per_second``
+    per token. ``jitter`` spreads the first-token latency by up to that
+    fraction either way, using the request hash rather than a clock, so
+    latencies are reproducible too. Completions use between half and all of
+    ``max_tokens`` (default 256).
+    
+    Like a provider prefix cache, it reports as ``cached_tokens`` the tokens
+    of the longest run of leading messages it has already seen. Caching does
+    not change the simulated latency.
+    """
+    
+    name = "local"
+    
+    vocabulary = [
+        "analysis", "shows", "that", "the", "system", "provides", "clear", "benefits", "for", "users",
+        "and", "teams", "while", "key", "factors", "include", "cost", "performance", "reliability", "scale",
+        "research", "suggests", "further", "evaluation", "of", "current", "approaches", "is", "recommended", "overall"
+    ]
+    
+    # Message prefixes remembered for cached_tokens
+    prefix_cache_size = 4096
+    
+    def __init__(self, latency: float = 0.05, tokens_per_second: float = 200.0, jitter: float = 0.0, token_counter=None):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.jitter = jitter
+        self.token_counter = token_counter
+        self._prefixes: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        
+        self.stats = {
+            "requests": 0,
+            "streams": 0,
+            "in_flight": 0,
+            "peak_in_flight": 0,
+            "prompt_tokens": 0,
+            "cached_tokens": 0,
+            "completion_tokens": 0,
+            "busy_time": 0.0
+        }
+    
+    def _plan(self, model: str, messages: List[Dict[str, str]], kwargs: Dict[str, Any]) -> Tuple[List[str], float]:
+        """Deterministic completion words and first-token delay for a request."""
+        
+        payload = json.dumps({"model": model, "messages": messages, "kwargs": kwargs}, sort_keys=True, default=str)
+        rng = random.Random(hashlib.sha256(payload.encode("utf-8")).digest())
+        
+        max_tokens = kwargs.get("max_tokens") or 256
+        length = max(1, int(max_tokens * rng.uniform(0.5, 1.0)))
+        
+        user_messages = [message.get("content") or "" for message in messages if message.get("role") == "user"]
+        words = f"Local response to: {user_messages[-1][:80] if user_messages else ''}".split()
+        words.extend(rng.choice(self.vocabulary) for _ in range(max(0, length - len(words))))
+        
+        delay = self.latency * (1.0 + self.jitter * rng.uniform(-1.0, 1.0))
+        return words[:length], delay
+    
+    def _start(self, messages: List[Dict[str, str]], stream: bool = False) -> Tuple[int, int]:
+        """Count a request as in flight; returns its prompt tokens and cached prefix tokens."""
+        
+        counter = self.token_counter
+        prompt_tokens = counter.count_messages(messages) if counter is not None else 0
+        prefix_hashes = []
+        digest = hashlib.sha256()
+        for message in messages[:-1]:
+            digest.update(json.dumps(message, sort_keys=True).encode("utf-8"))
+            prefix_hashes.append(digest.hexdigest())
+        
+        with self._lock:
+            cached_messages = 0
+            for index, prefix_hash in enumerate(prefix_hashes):
+                if prefix_hash not in self._prefixes:
+                    break
+                self._prefixes.move_to_end(prefix_hash)
+                cached_messages = index + 1
+            for prefix_hash in prefix_hashes[cached_messages:]:
+                self._prefixes[prefix_hash] = None
+            while len(self._prefixes) > self.prefix_cache_size:
+                self._prefixes.popitem(last=False)
+            
+            cached_tokens = 0
+            if counter is not None and cached_messages:
+                cached_tokens = counter.count_messages(messages[:cached_messages]) - TOKENS_PER_REPLY
+            self.stats["requests"] += 1
+            self.stats["streams"] += stream
+            self.stats["in_flight"] += 1
+            self.stats["peak_in_flight"] = max(self.stats["peak_in_flight"], self.stats["in_flight"])
+            self.stats["prompt_tokens"] += prompt_tokens
+            self.stats["cached_tokens"] += cached_tokens
+        return prompt_tokens, cached_tokens
+    
+    def _finish(self, started: float, completion_tokens: int):
+        with self._lock:
+            self.stats["in_flight"] -= 1
+            self.stats["completion_tokens"] += completion_tokens
+            self.stats["busy_time"] += time.monotonic() - started
+    
+    async def complete(self, model: str, messages: List[Dict[str, str]], timeout: float, **kwargs) -> Dict[str, Any]:
+        words, delay = self._plan(model, messages, kwargs)
+        started = time.monotonic()
+        prompt_tokens, cached_tokens = self._start(messages)
+        completion_tokens = 0
+        try:
+            await asyncio.sleep(delay + len(words) / self.tokens_per_second)
+            completion_tokens = len(words)
+        finally:
+            self._finish(started, completion_tokens)
+        
+        return {
+            "content": " ".join(words),
+            "prompt_tokens": prompt_tokens,
+            "cached_tokens": cached_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+    
+    async def stream(self, model: str, messages: List[Dict[str, str]], timeout: float, **kwargs) -> AsyncIterator[str]:
+        words, delay = self._plan(model, messages, kwargs)
+        started = time.monotonic()
+        self._start(messages, stream=True)
+        sent = 0
+        try:
+            await asyncio.sleep(delay)
+            for index, word in enumerate(words):
+                await asyncio.sleep(1.0 / self.tokens_per_second)
+                yield word if index == 0 else f" {word}"
+                sent += 1
+        finally:
+            self._finish(started, sent)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+        
+        return {
+            "name": self.name,
+            "latency": self.latency,
+            "tokens_per_second": self.tokens_per_second,
+            "jitter": self.jitter,
+            **stats,
+            "busy_time": round(stats["busy_time"], 3)
+        }
+
+_backends: Dict[Tuple, LLMBackend] = {}
+_backends_lock = threading.Lock()
+
+def get_llm_backend(config) -> LLMBackend:
+    """Get the process-wide LLM backend selected by `config.llm_backend`."""
+    
+    # Imported here: the pool's members are OpenAIBackends
+    from .endpoint_pool import build_endpoint_pool, endpoint_pool_key
+    
+    if config.llm_backend == "local":
+        key = ("local", config.local_backend_latency, config.local_backend_tokens_per_second, config.local_backend_jitter)
+    elif config.llm_backend == "pool":
+        key = endpoint_pool_key(config)
+    else:
+        # One backend per shared client pool
+        key = ("openai", get_client_pool(config))
+    
+    with _backends_lock:
+        backend = _backends.get(key)
+        if backend is None:
+            if config.llm_backend == "local":
+                backend = LocalBackend(
+                    latency=config.local_backend_latency,
+                    tokens_per_second=config.local_backend_tokens_per_second,
+                    jitter=config.local_backend_jitter,
+                    token_counter=get_token_counter(config)
+                )
+            elif config.llm_backend == "pool":
+                backend = build_endpoint_pool(config)
+            else:
+                backend = OpenAIBackend(get_client_pool(config))
+            _backends[key] = backend
+        return backend
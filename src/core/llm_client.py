@@ -0,0 +1,302 @@
+"""
+Shared LLM client registry for the Multi-Agent AI System.
+Hands every agent one pooled HTTP transport instead of a client per agent.
+"""
+
+import asyncio
+import hashlib
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional, Tuple, Union
+
+import httpx
+import openai
+from openai import AsyncOpenAI, OpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient
+
+# HTTP/2 needs the optional h2 package (pip install "httpx[http2]")
+try:
+    import h2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+class SharedClientPool:
+    """Pooled OpenAI clients shared by every agent with the same client settings.
+    
+    Async connections are bound to the event loop that opened them, so one
+    ``AsyncOpenAI`` client is kept per running loop. All of them share the
+    same limits and report into the same utilization counters.
+    
+    With ``http2`` (and h2 installed) HTTPS endpoints negotiate HTTP/2 and
+    multiplex concurrent requests over few connections; plain ``http://``
+    endpoints are then spoken to with HTTP/2 prior knowledge (h2c). With
+    ``prewarm_connections`` set, a background task on each event loop opens
+    that many connections as soon as the loop's client is created and, with
+    ``prewarm_interval``, repeats every that many seconds so idle periods
+    don't leave only expired connections.
+    """
+    
+    def __init__(self, api_key: str, base_url: Optional[str], timeout: Union[float, httpx.Timeout], limits: httpx.Limits,
+                 http2: bool = False, prewarm_connections: int = 0, prewarm_interval: float = 0.0):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self.limits = limits
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.prewarm_connections = prewarm_connections
+        self.prewarm_interval = prewarm_interval
+        
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._prewarm_tasks = weakref.WeakKeyDictionary()
+        self._no_loop_client: Optional[AsyncOpenAI] = None
+        self._sync_client: Optional[OpenAI] = None
+        self._lock = threading.Lock()
+        
+        self.stats = {
+            "requests": 0,
+            "in_flight": 0,
+            "peak_in_flight": 0,
+            "saturated_requests": 0,
+            "busy_time": 0.0,
+            "prewarms": 0,
+            "prewarmed_connections": 0,
+            "prewarm_failures": 0
+        }
+        self._created_at = time.monotonic()
+    
+    def get_client(self) -> AsyncOpenAI:
+        """Get the pooled async client for the current event loop."""
+        
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        
+        with self._lock:
+            if loop is None:
+                if self._no_loop_client is None:
+                    self._no_loop_client = self._build_async_client()
+                return self._no_loop_client
+            
+            client = self._async_clients.get(loop)
+            if client is None:
+                client = self._build_async_client()
+                self._async_clients[loop] = client
+                if self.prewarm_connections > 0:
+                    self._prewarm_tasks[loop] = loop.create_task(self._keep_warm())
+            return client
+    
+    def get_sync_client(self) -> OpenAI:
+        """Get the pooled synchronous client (used outside the event loop, e.g. health checks)."""
+        
+        with self._lock:
+            if self._sync_client is None:
+                self._sync_client = OpenAI(
+                    api_key=self.api_key,
+                    base_url=self.base_url,
+                    timeout=self.timeout,
+                    max_retries=0,
+                    http_client=DefaultHttpxClient(**self._transport_options())
+                )
+            return self._sync_client
+    
+    def _transport_options(self) -> Dict[str, Any]:
+        """httpx client options: limits, phase timeouts and HTTP versions."""
+        
+        options = {"limits": self.limits, "timeout": self.timeout}
+        if self.http2:
+            options["http2"] = True
+            # Cleartext endpoints can't negotiate HTTP/2, so use prior knowledge
+            options["http1"] = not (self.base_url or "").startswith("http://")
+        return options
+    
+    def _build_async_client(self) -> AsyncOpenAI:
+        """Create an async client backed by a connection pool with the configured limits."""
+        return AsyncOpenAI(
+            api_key=self.api_key,
+            base_url=self.base_url,
+            timeout=self.timeout,
+            max_retries=0,  # BaseAgent's retry engine owns retries
+            http_client=DefaultAsyncHttpxClient(**self._transport_options())
+        )
+    
+    async def prewarm(self, connections: Optional[int] = None) -> int:
+        """Open up to `connections` (default: prewarm_connections) connections; returns how many were reached.
+        
+        Each connection is opened by a concurrent model-list request. Any HTTP
+        response, including an error status, leaves a warm connection behind.
+        With HTTP/2 the requests share one connection.
+        """
+        
+        client = self.get_client()
+        count = connections or self.prewarm_connections or 1
+        
+        async def ping() -> bool:
+            try:
+                await client.models.list()
+            except openai.APIStatusError:
+                pass
+            except Exception:
+                return False
+            return True
+        
+        results = await asyncio.gather(*(ping() for _ in range(count)))
+        with self._lock:
+            self.stats["prewarms"] += 1
+            self.stats["prewarmed_connections"] += sum(results)
+            self.stats["prewarm_failures"] += len(results) - sum(results)
+        return sum(results)
+    
+    async def _keep_warm(self):
+        """Prewarm the current loop's connections now and then every prewarm_interval seconds."""
+        
+        while True:
+            await self.prewarm()
+            if self.prewarm_interval <= 0:
+                return
+            await asyncio.sleep(self.prewarm_interval)
+    
+    def stop_prewarming(self):
+        """Cancel the background prewarm tasks of every event loop."""
+        
+        with self._lock:
+            tasks = list(self._prewarm_tasks.values())
+            self._prewarm_tasks.clear()
+        for task in tasks:
+            task.cancel()
+    
+    @asynccontextmanager
+    async def track(self):
+        """Count a request as in flight on this pool for utilization stats."""
+        
+        start = time.monotonic()
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["in_flight"] += 1
+            self.stats["peak_in_flight"] = max(self.stats["peak_in_flight"], self.stats["in_flight"])
+            if self.limits.max_connections and self.stats["in_flight"] > self.limits.max_connections:
+                self.stats["saturated_requests"] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.stats["in_flight"] -= 1
+                self.stats["busy_time"] += time.monotonic() - start
+    
+    def _connection_counts(self) -> Tuple[int, int]:
+        """Count open and idle connections across this pool's async clients."""
+        
+        open_connections = 0
+        idle_connections = 0
+        with self._lock:
+            clients = list(self._async_clients.values())
+            if self._no_loop_client is not None:
+                clients.append(self._no_loop_client)
+        
+        for client in clients:
+            # httpx does not expose pool state publicly; read it defensively
+            transport = getattr(getattr(client, "_client", None), "_transport", None)
+            connections = getattr(getattr(transport, "_pool", None), "connections", None) or []
+            open_connections += len(connections)
+            idle_connections += sum(1 for conn in connections if getattr(conn, "is_idle", lambda: False)())
+        
+        return open_connections, idle_connections
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool utilization statistics for sizing the connection limits."""
+        
+        open_connections, idle_connections = self._connection_counts()
+        max_connections = self.limits.max_connections or 0
+        elapsed = max(time.monotonic() - self._created_at, 1e-9)
+        
+        with self._lock:
+            stats = dict(self.stats)
+            loops = len(self._async_clients)
+        
+        return {
+            "endpoint": self.base_url or "default",
+            "http2": self.http2,
+            "max_connections": max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "keepalive_expiry": self.limits.keepalive_expiry,
+            "requests": stats["requests"],
+            "in_flight": stats["in_flight"],
+            "peak_in_flight": stats["peak_in_flight"],
+            "saturated_requests": stats["saturated_requests"],
+            "utilization": round(stats["in_flight"] / max_connections, 3) if max_connections else 0,
+            "peak_utilization": round(stats["peak_in_flight"] / max_connections, 3) if max_connections else 0,
+            "average_concurrency": round(stats["busy_time"] / elapsed, 3),
+            "open_connections": open_connections,
+            "idle_connections": idle_connections,
+            "event_loops": loops,
+            "prewarms": stats["prewarms"],
+            "prewarmed_connections": stats["prewarmed_connections"],
+            "prewarm_failures": stats["prewarm_failures"]
+        }
+
+_pools: Dict[Tuple, SharedClientPool] = {}
+_pools_lock = threading.Lock()
+
+def http_timeout(config) -> httpx.Timeout:
+    """Per-phase HTTP timeouts; reads default to the overall timeout_seconds."""
+    return httpx.Timeout(
+        connect=config.http_connect_timeout,
+        read=config.http_read_timeout or config.timeout_seconds,
+        write=config.http_write_timeout,
+        pool=config.http_pool_timeout
+    )
+
+def transport_options(config, max_connections: Optional[int] = None) -> Dict[str, Any]:
+    """SharedClientPool arguments for the transport settings in `config`."""
+    return {
+        "timeout": http_timeout(config),
+        "limits": httpx.Limits(
+            max_connections=max_connections or config.http_max_connections,
+            max_keepalive_connections=config.http_max_keepalive_connections,
+            keepalive_expiry=config.http_keepalive_expiry
+        ),
+        "http2": config.http2,
+        "prewarm_connections": config.http_prewarm_connections,
+        "prewarm_interval": config.http_prewarm_interval
+    }
+
+def transport_key(config) -> Tuple:
+    """Every setting that shapes the transport, for registry keys."""
+    return (
+        config.timeout_seconds,
+        config.http_max_connections,
+        config.http_max_keepalive_connections,
+        config.http_keepalive_expiry,
+        config.http_connect_timeout,
+        config.http_read_timeout,
+        config.http_write_timeout,
+        config.http_pool_timeout,
+        config.http2,
+        config.http_prewarm_connections,
+        config.http_prewarm_interval
+    )
+
+def _pool_key(config) -> Tuple:
+    """Registry key: credentials, endpoint and the transport settings."""
+    return (
+        hashlib.sha256(config.openai_api_key.encode()).hexdigest(),
+        config.openai_base_url,
+        *transport_key(config)
+    )
+
+def get_client_pool(config) -> SharedClientPool:
+    """Get the process-wide client pool for the given configuration."""
+    
+    key = _pool_key(config)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = SharedClientPool(
+                api_key=config.openai_api_key,
+                base_url=config.openai_base_url,
+                **transport_options(config)
+            )
+            _pools[key] = pool
+        return pool
@@ -0,0 +1,60 @@
+"""
+Section streaming between agents.
+Splits a stream of text deltas into sections, so a downstream agent can
+start on the first sections of an answer while the rest is generated.
+"""
+
+import re
+from typing import List
+
+# A section ends at a blank line, or before a numbered item, bullet or heading on a new line
+_BOUNDARY_RE = re.compile(r"\n[ \t]*\n\s*|\n(?=[ \t]*(?:\d+[.)]|[-*•]|#{1,6})[ \t])")
+_SENTENCE_END_RE = re.compile(r"[.!?][\"')\]]*\s+")
+
+class SectionSplitter:
+    """Incremental splitter of streamed text into sections.
+    
+    Sections end at paragraph and list-item boundaries. Text without such a
+    boundary is cut once it reaches ``max_chars``, after the last sentence
+    if there is one, else at the last whitespace.
+    """
+    
+    def __init__(self, max_chars: int = 800):
+        self.max_chars = max_chars
+        self.pending = ""
+    
+    def feed(self, delta: str) -> List[str]:
+        """Add a delta; return the sections it completes."""
+        
+        self.pending += delta
+        sections = []
+        
+        while True:
+            # A boundary counts once text follows it, since the next delta could extend it
+            match = next((m for m in _BOUNDARY_RE.finditer(self.pending) if m.end() < len(self.pending)), None)
+            if match is not None:
+                cut, resume = match.start(), match.end()
+            elif len(self.pending) >= self.max_chars:
+                window = self.pending[:self.max_chars]
+                sentence_ends = list(_SENTENCE_END_RE.finditer(window))
+                if sentence_ends:
+                    cut = resume = sentence_ends[-1].end()
+                else:
+                    space = max(window.rfind(" "), window.rfind("\n"))
+                    cut = resume = space + 1 if space > 0 else self.max_chars
+            else:
+                break
+            
+            section = self.pending[:cut].strip()
+            self.pending = self.pending[resume:]
+            if section:
+                sections.append(section)
+        
+        return sections
+    
+    def flush(self) -> List[str]:
+        """Return the remaining text as the last section, if any."""
+        
+        section = self.pending.strip()
+        self.pending = ""
+        return [section] if section else []
@@ -0,0 +1,153 @@
+"""
+Fast workflow planning without an LLM round trip.
+A keyword classifier maps a task to a coarse shape (which agents it seems
+to need, its length, whether it is a plain question) with a confidence.
+Confident shapes get a rule-based plan; other shapes reuse the structure
+of the plan the LLM planner produced for the same shape, kept in an LRU
+cache.
+"""
+
+import copy
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+# Short factual questions need no research or review
+_QUESTION_RE = re.compile(r"^\s*(what|who|when|where|which|how many|how much|define|is|are|does|do|can)\b", re.IGNORECASE)
+
+# Task-independent action of each agent's step, used by rule plans and cached plans
+GENERIC_ACTIONS = {
+    "ResearchAgent": "Gather relevant information",
+    "ContentAgent": "Generate response",
+    "ValidationAgent": "Validate output"
+}
+
+class RulePlanner:
+    """Keyword classifier of tasks into workflow shapes, with a plan per shape.
+    
+    Each research or review keyword found raises the confidence that the
+    task needs that agent. Short plain questions are answered by
+    ContentAgent alone. Tasks matching nothing get a low confidence.
+    """
+    
+    research_keywords = (
+        "research", "compare", "comparison", "versus", " vs ", "latest", "statistics",
+        "sources", "evidence", "market", "trends", "investigate", "literature", "survey"
+    )
+    validation_keywords = (
+        "verify", "fact-check", "fact check", "validate", "review", "proofread",
+        "accuracy", "accurate", "compliance", "safety"
+    )
+    
+    question_confidence = 0.9
+    unknown_confidence = 0.3
+    
+    def classify(self, task: str, has_context: bool = False) -> Dict[str, Any]:
+        """Classify a task; returns its shape, confidence and rule-based plan."""
+        
+        text = f" {task.lower()} "
+        words = len(task.split())
+        research_hits = sum(1 for keyword in self.research_keywords if keyword in text)
+        validation_hits = sum(1 for keyword in self.validation_keywords if keyword in text)
+        question = bool(_QUESTION_RE.match(task)) and words <= 12 and not (research_hits or validation_hits)
+        
+        if question:
+            confidence = self.question_confidence
+        elif research_hits or validation_hits:
+            confidence = min(0.95, 0.6 + 0.15 * (research_hits + validation_hits))
+        else:
+            confidence = self.unknown_confidence
+        
+        length = "short" if words <= 12 else "medium" if words <= 40 else "long"
+        shape = (bool(research_hits), bool(validation_hits), question, length, has_context)
+        
+        steps = []
+        if research_hits:
+            steps.append({"agent": "ResearchAgent", "action": GENERIC_ACTIONS["ResearchAgent"], "priority": 1})
+        steps.append({"agent": "ContentAgent", "action": "Answer directly" if question else GENERIC_ACTIONS["ContentAgent"], "priority": 2})
+        if validation_hits:
+            steps.append({"agent": "ValidationAgent", "action": GENERIC_ACTIONS["ValidationAgent"], "priority": 3})
+        
+        return {
+            "shape": shape,
+            "confidence": round(confidence, 2),
+            "plan": {
+                "steps": steps,
+                "estimated_time": "unknown",
+                "complexity": ["low", "medium", "high"][len(steps) - 1]
+            }
+        }
+
+def structural_plan(plan: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of a plan with each step's task-specific action replaced by its agent's generic action.
+    
+    Many unrelated tasks share a shape, so only the plan's structure (agents,
+    priorities, dependencies) may be reused between them.
+    """
+    
+    plan = copy.deepcopy(plan)
+    for step in plan.get("steps", []):
+        step["action"] = GENERIC_ACTIONS.get(step.get("agent"), "Process task")
+    return plan
+
+class PlanCache:
+    """Thread-safe LRU cache of workflow plan structures by task shape, with a time to live."""
+    
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0}
+    
+    def get(self, shape: Tuple) -> Optional[Dict[str, Any]]:
+        """Get a copy of the plan cached for a shape, or None."""
+        
+        with self._lock:
+            entry = self._entries.get(shape)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl_seconds:
+                del self._entries[shape]
+                self.stats["expired"] += 1
+                entry = None
+            
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            
+            self._entries.move_to_end(shape)
+            self.stats["hits"] += 1
+            return copy.deepcopy(entry[1])
+    
+    def put(self, shape: Tuple, plan: Dict[str, Any]):
+        """Cache a plan's structure for a shape, evicting the least recently used shapes over the limit."""
+        
+        if self.max_entries <= 0:
+            return
+        
+        with self._lock:
+            self._entries[shape] = (time.monotonic(), structural_plan(plan))
+            self._entries.move_to_end(shape)
+            self.stats["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+    
+    def clear(self):
+        """Remove all cached plans."""
+        
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache size, hits, misses and hit rate."""
+        
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                **self.stats,
+                "hit_rate": round(self.stats["hits"] / lookups * 100, 2) if lookups else 0
+            }
@@ -0,0 +1,103 @@
+"""
+Precompiled prompt templates.
+Agents compile their prompts once per process and render only the request
+into them, with a message layout that keeps the prompt prefix byte-identical
+across calls so providers can reuse their prefix cache.
+"""
+
+import inspect
+import threading
+from typing import Dict, Any, List, Tuple, Sequence, Hashable
+
+class PromptTemplate:
+    """A compiled prompt: a static message prefix and the user message format.
+    
+    The prefix holds the most widely shared text first (the task
+    instructions), then the settings shared by fewer calls (e.g. style and
+    length guidance). The per-call request only ever appears in the final
+    user message, so every call with the same settings sends a byte-identical
+    prefix.
+    """
+    
+    __slots__ = ("key", "prefix", "user_format")
+    
+    def __init__(self, key: Hashable, prefix: Tuple[Tuple[str, str], ...], user_format: str):
+        self.key = key
+        self.prefix = prefix
+        self.user_format = user_format
+    
+    def render(self, **values) -> List[Dict[str, str]]:
+        """Build the messages for one call."""
+        
+        messages = [{"role": role, "content": content} for role, content in self.prefix]
+        messages.append({"role": "user", "content": self.user_format.format(**values)})
+        return messages
+
+def compile_prompt(key: Hashable, system: str, user_format: str, guidance: Sequence[str] = ()) -> PromptTemplate:
+    """Compile a prompt from instructions, optional guidance lines and the user message format.
+    
+    Indentation left over from triple-quoted source strings is removed, since
+    it only costs tokens.
+    """
+    
+    prefix = [("system", inspect.cleandoc(system))]
+    if guidance:
+        prefix.append(("system", "\n".join(guidance)))
+    return PromptTemplate(key, tuple(prefix), user_format)
+
+class PromptRegistry:
+    """Process-wide store of compiled prompt templates, keyed by e.g. (agent, type, style, length)."""
+    
+    def __init__(self):
+        self._templates: Dict[Hashable, PromptTemplate] = {}
+        self._lock = threading.Lock()
+        
+        self.stats = {
+            "renders": 0,
+            "misses": 0
+        }
+    
+    def compile(self, key: Hashable, system: str, user_format: str, guidance: Sequence[str] = ()) -> PromptTemplate:
+        """Compile and register a template, or return the one already registered under `key`."""
+        
+        with self._lock:
+            template = self._templates.get(key)
+            if template is None:
+                template = compile_prompt(key, system, user_format, guidance)
+                self._templates[key] = template
+            return template
+    
+    def get(self, key: Hashable) -> PromptTemplate:
+        """Get a compiled template; raises KeyError for unknown keys."""
+        return self._templates[key]
+    
+    def render(self, key: Hashable, **values) -> List[Dict[str, str]]:
+        """Render the template registered under `key`."""
+        
+        template = self._templates.get(key)
+        if template is None:
+            self.stats["misses"] += 1
+            raise KeyError(f"No prompt template compiled for {key}")
+        self.stats["renders"] += 1
+        return template.render(**values)
+    
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._templates
+    
+    def __len__(self) -> int:
+        return len(self._templates)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the number of compiled templates and renders."""
+        
+        return {
+            "templates": len(self._templates),
+            "distinct_prefixes": len({template.prefix for template in self._templates.values()}),
+            **self.stats
+        }
+
+_registry = PromptRegistry()
+
+def get_prompt_registry() -> PromptRegistry:
+    """Get the process-wide prompt registry."""
+    return _registry
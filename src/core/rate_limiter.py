@@ -0,0 +1,164 @@
+"""
+Shared rate limiting for LLM requests.
+Enforces requests-per-window and an optional tokens-per-minute budget.
+"""
+
+import asyncio
+import hashlib
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
+
+class GCRABucket:
+    """Generic Cell Rate Algorithm bucket (the scheduling form of a token bucket).
+    
+    Each reservation pushes the theoretical arrival time (TAT) forward by
+    ``cost * emission_interval``. Callers that reserve first are scheduled
+    first, which gives FIFO fairness without a waiter queue.
+    """
+    
+    def __init__(self, limit: float, period: float):
+        self.limit = limit
+        self.period = period
+        self.emission_interval = period / limit
+        self.burst_tolerance = period - self.emission_interval
+        self.tat = 0.0
+    
+    def reserve(self, now: float, cost: float = 1.0) -> float:
+        """Reserve `cost` units and return the delay before they may be used."""
+        
+        tat = max(self.tat, now)
+        allowed_at = tat - self.burst_tolerance
+        self.tat = tat + cost * self.emission_interval
+        return max(0.0, allowed_at - now)
+    
+    def delay(self, now: float) -> float:
+        """Delay a reservation made now would get, without reserving."""
+        return max(0.0, max(self.tat, now) - self.burst_tolerance - now)
+    
+    def adjust(self, cost_delta: float):
+        """Correct an earlier reservation once the real cost is known."""
+        self.tat += cost_delta * self.emission_interval
+
+class RateLimiter:
+    """Async rate limiter shared by every agent that talks to the same account."""
+    
+    def __init__(self, requests: int, window: float, tokens_per_minute: int = 0):
+        self.request_bucket = GCRABucket(requests, window)
+        self.token_bucket = GCRABucket(tokens_per_minute, 60.0) if tokens_per_minute else None
+        self._lock = threading.Lock()
+        
+        self.stats = {
+            "acquired": 0,
+            "throttled": 0,
+            "waiting": 0,
+            "total_wait_time": 0.0,
+            "max_wait_time": 0.0,
+            "reserved_tokens": 0,
+            "used_tokens": 0,
+            "cancelled": 0
+        }
+    
+    async def acquire(self, estimated_tokens: int = 0) -> float:
+        """Wait for a request slot (and token budget) and return the time spent queued."""
+        
+        with self._lock:
+            now = time.monotonic()
+            delay = self.request_bucket.reserve(now)
+            if self.token_bucket is not None:
+                delay = max(delay, self.token_bucket.reserve(now, estimated_tokens))
+                self.stats["reserved_tokens"] += estimated_tokens
+            
+            self.stats["acquired"] += 1
+            if delay > 0:
+                self.stats["throttled"] += 1
+                self.stats["waiting"] += 1
+        
+        if delay > 0:
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                # The caller gave up (e.g. a losing hedge or a timeout): give the reservation back
+                with self._lock:
+                    self.request_bucket.adjust(-1)
+                    if self.token_bucket is not None:
+                        self.token_bucket.adjust(-estimated_tokens)
+                        self.stats["reserved_tokens"] -= estimated_tokens
+                    self.stats["acquired"] -= 1
+                    self.stats["throttled"] -= 1
+                    self.stats["cancelled"] += 1
+                raise
+            finally:
+                with self._lock:
+                    self.stats["waiting"] -= 1
+        
+        with self._lock:
+            self.stats["total_wait_time"] += delay
+            self.stats["max_wait_time"] = max(self.stats["max_wait_time"], delay)
+        
+        return delay
+    
+    def next_available(self) -> float:
+        """Seconds until a request (and its token budget) would be admitted, without reserving it."""
+        
+        with self._lock:
+            now = time.monotonic()
+            delay = self.request_bucket.delay(now)
+            if self.token_bucket is not None:
+                delay = max(delay, self.token_bucket.delay(now))
+            return delay
+    
+    def record_usage(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        """Settle the token budget with the usage reported by the provider."""
+        
+        if self.token_bucket is None or actual_tokens is None:
+            return
+        
+        with self._lock:
+            self.token_bucket.adjust(actual_tokens - estimated_tokens)
+            self.stats["used_tokens"] += actual_tokens
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get limiter configuration and queue-wait metrics."""
+        
+        with self._lock:
+            stats = dict(self.stats)
+        
+        acquired = stats["acquired"]
+        return {
+            "requests_per_window": self.request_bucket.limit,
+            "window_seconds": self.request_bucket.period,
+            "tokens_per_minute": self.token_bucket.limit if self.token_bucket else None,
+            "acquired": acquired,
+            "throttled": stats["throttled"],
+            "waiting": stats["waiting"],
+            "cancelled": stats["cancelled"],
+            "total_wait_time": round(stats["total_wait_time"], 3),
+            "average_wait_time": round(stats["total_wait_time"] / acquired, 3) if acquired else 0,
+            "max_wait_time": round(stats["max_wait_time"], 3),
+            "reserved_tokens": stats["reserved_tokens"],
+            "used_tokens": stats["used_tokens"]
+        }
+
+_limiters: Dict[Tuple, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+def get_rate_limiter(config) -> RateLimiter:
+    """Get the process-wide rate limiter for the account described by `config`."""
+    
+    key = (
+        hashlib.sha256(config.openai_api_key.encode()).hexdigest(),
+        config.rate_limit_requests,
+        config.rate_limit_window,
+        config.rate_limit_tokens_per_minute
+    )
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = RateLimiter(
+                requests=config.rate_limit_requests,
+                window=config.rate_limit_window,
+                tokens_per_minute=config.rate_limit_tokens_per_minute
+            )
+            _limiters[key] = limiter
+        return limiter
@@ -0,0 +1,196 @@
+"""
+Persistent LLM response cache.
+Content-addressed responses in SQLite, shared by every worker process on a host.
+"""
+
+import asyncio
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+CREATE INDEX IF NOT EXISTS responses_created_at ON responses (created_at);
+
+-- Running total of stored bytes, kept exact across processes by triggers
+CREATE TABLE IF NOT EXISTS cache_size (id INTEGER PRIMARY KEY CHECK (id = 0), total_bytes INTEGER NOT NULL);
+INSERT OR IGNORE INTO cache_size VALUES (0, 0);
+
+CREATE TRIGGER IF NOT EXISTS responses_insert AFTER INSERT ON responses BEGIN
+    UPDATE cache_size SET total_bytes = total_bytes + NEW.size WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS responses_delete AFTER DELETE ON responses BEGIN
+    UPDATE cache_size SET total_bytes = total_bytes - OLD.size WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS responses_resize AFTER UPDATE OF size ON responses BEGIN
+    UPDATE cache_size SET total_bytes = total_bytes - OLD.size + NEW.size WHERE id = 0;
+END;
+"""
+
+class ResponseCache:
+    """On-disk LLM response cache with TTL and size-bounded LRU eviction.
+    
+    Keys are the SHA-256 request keys built by ``BaseAgent._request_key``.
+    The database runs in WAL mode so several processes can read and write
+    it at once. Database calls run in the default executor to keep the event
+    loop free, and database errors are counted as misses rather than raised.
+    """
+    
+    def __init__(self, path: str, max_bytes: int, ttl_seconds: float):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "expired": 0,
+            "errors": 0,
+            "hit_bytes": 0,
+            "stored_bytes": 0
+        }
+    
+    async def get(self, key: str) -> Optional[str]:
+        """Look up a cached response; None on a miss, expiry or database error."""
+        return await asyncio.get_running_loop().run_in_executor(None, self._get, key)
+    
+    async def set(self, key: str, response: str):
+        """Store a response, evicting least recently used entries beyond the size bound."""
+        await asyncio.get_running_loop().run_in_executor(None, self._set, key, response)
+    
+    def _get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT response, size FROM responses WHERE key = ? AND created_at > ?",
+                    (key, now - self.ttl_seconds)
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            except sqlite3.Error:
+                self.stats["errors"] += 1
+                row = None
+            
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            
+            self.stats["hits"] += 1
+            self.stats["hit_bytes"] += row[1]
+            return row[0]
+    
+    def _set(self, key: str, response: str):
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    self._conn.execute(
+                        "INSERT INTO responses (key, response, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?) "
+                        "ON CONFLICT (key) DO UPDATE SET response = excluded.response, size = excluded.size, "
+                        "created_at = excluded.created_at, accessed_at = excluded.accessed_at",
+                        (key, response, size, now, now)
+                    )
+                    expired = self._conn.execute(
+                        "DELETE FROM responses WHERE created_at <= ?", (now - self.ttl_seconds,)
+                    ).rowcount
+                    evicted = self._evict()
+                    self._conn.execute("COMMIT")
+                except BaseException:
+                    self._conn.execute("ROLLBACK")
+                    raise
+            except sqlite3.Error:
+                self.stats["errors"] += 1
+                return
+            
+            self.stats["stores"] += 1
+            self.stats["stored_bytes"] += size
+            self.stats["expired"] += expired
+            self.stats["evictions"] += evicted
+    
+    def _evict(self) -> int:
+        """Delete least recently used entries until the cache fits in max_bytes. Caller holds a transaction."""
+        
+        total_bytes = self._conn.execute("SELECT total_bytes FROM cache_size WHERE id = 0").fetchone()[0]
+        if total_bytes <= self.max_bytes:
+            return 0
+        
+        # Keep the most recently used entries whose running size fits the bound
+        return self._conn.execute(
+            "DELETE FROM responses WHERE key IN ("
+            "SELECT key FROM (SELECT key, SUM(size) OVER (ORDER BY accessed_at DESC, key) AS running FROM responses) "
+            "WHERE running > ?)",
+            (self.max_bytes,)
+        ).rowcount
+    
+    def clear(self):
+        """Remove every cached response."""
+        
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counts, bytes served and the current size of the cache."""
+        
+        with self._lock:
+            stats = dict(self.stats)
+            try:
+                entries, = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+                total_bytes, = self._conn.execute("SELECT total_bytes FROM cache_size WHERE id = 0").fetchone()
+            except sqlite3.Error:
+                entries, total_bytes = None, None
+        
+        lookups = stats["hits"] + stats["misses"]
+        return {
+            "path": self.path,
+            "entries": entries,
+            "bytes": total_bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "hit_rate": round(stats["hits"] / lookups * 100, 2) if lookups else 0,
+            **stats
+        }
+
+_caches: Dict[str, ResponseCache] = {}
+_caches_lock = threading.Lock()
+
+def get_response_cache(config) -> Optional[ResponseCache]:
+    """Get the process-wide response cache for `config`, or None when caching is disabled."""
+    
+    if not config.enable_response_cache:
+        return None
+    
+    path = str(Path(config.response_cache_path).resolve())
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = ResponseCache(
+                path=path,
+                max_bytes=config.response_cache_max_mb * 1024 * 1024,
+                ttl_seconds=config.response_cache_ttl_seconds
+            )
+            _caches[path] = cache
+        return cache
@@ -0,0 +1,236 @@
+"""
+Retry engine for LLM requests.
+Retries only transient failures, honours Retry-After, backs off with full
+jitter and enforces a process-wide retry budget.
+"""
+
+import asyncio
+import email.utils
+import random
+import threading
+import time
+from typing import Dict, Any, Optional, Callable, Awaitable, TypeVar, Tuple
+
+import openai
+
+T = TypeVar("T")
+
+TRANSIENT_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+def is_transient_error(error: Exception) -> bool:
+    """Whether an error is worth retrying (timeouts, connection errors, 429, 5xx)."""
+    
+    if isinstance(error, (asyncio.TimeoutError, openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        return False
+    return status_code in TRANSIENT_STATUS_CODES or status_code >= 500
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Read the server's requested delay from Retry-After headers, if any."""
+    
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return max(0.0, float(retry_after_ms) / 1000)
+        except ValueError:
+            pass
+    
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    
+    # HTTP-date form
+    try:
+        retry_at = email.utils.parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+class RetryBudget:
+    """Caps retries to a fraction of requests across the whole process.
+    
+    Every request deposits ``ratio`` retry credits and every retry withdraws
+    one. The balance starts at, and is capped to, ``min_retries`` so short
+    bursts can retry while sustained retries stay below ``ratio`` of traffic.
+    """
+    
+    def __init__(self, ratio: float = 0.1, min_retries: int = 10):
+        self.ratio = ratio
+        self.max_balance = float(min_retries)
+        self.balance = float(min_retries)
+        self._lock = threading.Lock()
+        
+        self.stats = {
+            "requests": 0,
+            "retries": 0,
+            "exhausted": 0
+        }
+    
+    def record_request(self):
+        """Deposit credit for a new (non-retry) request."""
+        
+        with self._lock:
+            self.stats["requests"] += 1
+            self.balance = min(self.max_balance, self.balance + self.ratio)
+    
+    def try_withdraw(self) -> bool:
+        """Take credit for one retry; False when the budget is exhausted."""
+        
+        with self._lock:
+            if self.balance < 1.0:
+                self.stats["exhausted"] += 1
+                return False
+            self.balance -= 1.0
+            self.stats["retries"] += 1
+            return True
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get budget usage counters."""
+        
+        with self._lock:
+            requests = self.stats["requests"]
+            return {
+                "ratio": self.ratio,
+                "balance": round(self.balance, 2),
+                "requests": requests,
+                "retries": self.stats["retries"],
+                "exhausted": self.stats["exhausted"],
+                "retry_rate": round(self.stats["retries"] / requests, 3) if requests else 0
+            }
+
+class RetryEngine:
+    """Runs an async operation with transient-only retries and full-jitter backoff."""
+    
+    def __init__(
+        self,
+        max_retries: int,
+        base_delay: float,
+        max_delay: float,
+        max_retry_after: float,
+        budget: RetryBudget
+    ):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.budget = budget
+        self._lock = threading.Lock()
+        
+        self.stats = {
+            "retries": 0,
+            "backoff_time": 0.0,
+            "gave_up_non_transient": 0,
+            "gave_up_attempts": 0,
+            "gave_up_budget": 0,
+            "gave_up_retry_after": 0
+        }
+    
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given retry number (0-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+    
+    def _next_delay(self, error: Exception, attempt: int) -> Tuple[Optional[float], str]:
+        """Delay before the next attempt, or None with the reason for giving up."""
+        
+        if not is_transient_error(error):
+            return None, "gave_up_non_transient"
+        if attempt >= self.max_retries:
+            return None, "gave_up_attempts"
+        
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None and retry_after > self.max_retry_after:
+            return None, "gave_up_retry_after"
+        
+        if not self.budget.try_withdraw():
+            return None, "gave_up_budget"
+        
+        delay = self.backoff(attempt)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay, ""
+    
+    async def run(
+        self,
+        operation: Callable[[], Awaitable[T]],
+        on_retry: Optional[Callable[[Exception, int, float], None]] = None
+    ) -> T:
+        """Run `operation`, retrying transient failures within the budget."""
+        
+        self.budget.record_request()
+        attempt = 0
+        
+        while True:
+            try:
+                return await operation()
+            except Exception as e:
+                delay, reason = self._next_delay(e, attempt)
+                if delay is None:
+                    with self._lock:
+                        self.stats[reason] += 1
+                    raise
+                
+                with self._lock:
+                    self.stats["retries"] += 1
+                    self.stats["backoff_time"] += delay
+                if on_retry is not None:
+                    on_retry(e, attempt + 1, delay)
+                
+                await asyncio.sleep(delay)
+                attempt += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get retry counts, time lost to backoff and budget usage."""
+        
+        with self._lock:
+            stats = dict(self.stats)
+        stats["backoff_time"] = round(stats["backoff_time"], 3)
+        stats["max_retries"] = self.max_retries
+        stats["budget"] = self.budget.get_stats()
+        return stats
+
+_budgets: Dict[Tuple, RetryBudget] = {}
+_engines: Dict[Tuple, RetryEngine] = {}
+_registry_lock = threading.Lock()
+
+def get_retry_engine(config) -> RetryEngine:
+    """Get the retry engine for `config`; all engines with the same budget settings share one budget."""
+    
+    budget_key = (config.retry_budget_ratio, config.retry_budget_min_retries)
+    engine_key = budget_key + (
+        config.max_retries,
+        config.retry_base_delay,
+        config.retry_max_delay,
+        config.timeout_seconds
+    )
+    
+    with _registry_lock:
+        budget = _budgets.get(budget_key)
+        if budget is None:
+            budget = RetryBudget(ratio=config.retry_budget_ratio, min_retries=config.retry_budget_min_retries)
+            _budgets[budget_key] = budget
+        
+        engine = _engines.get(engine_key)
+        if engine is None:
+            engine = RetryEngine(
+                max_retries=config.max_retries,
+                base_delay=config.retry_base_delay,
+                max_delay=config.retry_max_delay,
+                max_retry_after=config.timeout_seconds,
+                budget=budget
+            )
+            _engines[engine_key] = engine
+        return engine
@@ -0,0 +1,235 @@
+"""
+Semantic near-duplicate cache.
+Embeds prompts with a hashed n-gram TF-IDF vectorizer and searches them
+with a single matrix-vector product over a contiguous NumPy index.
+"""
+
+import re
+import threading
+import time
+import zlib
+from typing import Dict, Any, Optional, List, Tuple
+
+import numpy as np
+
+_WORD_RE = re.compile(r"\w+")
+
+class HashedTfidfVectorizer:
+    """Dependency-free text embedding: hashed word and character n-grams with TF-IDF weights.
+    
+    Features are word unigrams and bigrams plus character trigrams of each
+    word, hashed into ``dim`` buckets with CRC32 so vectors are stable across
+    processes. Term frequencies are sublinear and IDF is learned from the
+    documents added so far.
+    """
+    
+    def __init__(self, dim: int = 2048):
+        self.dim = dim
+        self.documents = 0
+        self.document_frequency = np.zeros(dim, dtype=np.float32)
+    
+    def _features(self, text: str) -> List[str]:
+        words = _WORD_RE.findall(text.lower())
+        features = list(words)
+        features.extend(f"{first} {second}" for first, second in zip(words, words[1:]))
+        for word in words:
+            padded = f"<{word}>"
+            features.extend(f"#{padded[i:i + 3]}" for i in range(len(padded) - 2))
+        return features
+    
+    def term_frequencies(self, text: str) -> np.ndarray:
+        """Sublinear hashed term frequencies of `text`."""
+        
+        buckets = [zlib.crc32(feature.encode("utf-8")) % self.dim for feature in self._features(text)]
+        counts = np.bincount(np.asarray(buckets, dtype=np.int64), minlength=self.dim).astype(np.float32)
+        nonzero = counts > 0
+        counts[nonzero] = 1.0 + np.log(counts[nonzero])
+        return counts
+    
+    def fit_document(self, tf: np.ndarray):
+        """Count a stored document towards the IDF statistics."""
+        
+        self.documents += 1
+        self.document_frequency += tf > 0
+    
+    def transform(self, tf: np.ndarray) -> np.ndarray:
+        """Apply the current IDF weights and L2-normalize."""
+        
+        idf = np.log((1.0 + self.documents) / (1.0 + self.document_frequency)) + 1.0
+        vector = tf * idf
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+class SemanticCache:
+    """Near-duplicate lookup of cached answers by cosine similarity of prompt embeddings.
+    
+    Vectors are L2-normalized rows of one contiguous float32 matrix, so a
+    lookup is a single matrix-vector product. Entries only match within the
+    same ``namespace`` (e.g. research type). Rows are weighted with the IDF
+    known when they were added. The least recently used entry is replaced
+    once ``max_entries`` is reached.
+    """
+    
+    def __init__(self, threshold: float = 0.9, max_entries: int = 1000, dim: int = 2048):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.vectorizer = HashedTfidfVectorizer(dim)
+        
+        self._matrix = np.zeros((min(64, max_entries), dim), dtype=np.float32)
+        self._last_used = np.zeros(len(self._matrix), dtype=np.float64)
+        self._namespace_ids = np.zeros(len(self._matrix), dtype=np.int32)
+        self._namespace_index: Dict[Optional[str], int] = {}
+        self._prompts: List[str] = []
+        self._answers: List[Any] = []
+        self._size = 0
+        self._lock = threading.Lock()
+        
+        self.stats = {
+            "lookups": 0,
+            "hits": 0,
+            "misses": 0,
+            "entries_added": 0,
+            "evictions": 0,
+            "total_lookup_time": 0.0,
+            "max_lookup_time": 0.0
+        }
+        self.last_evaluation: Optional[Dict[str, Any]] = None
+    
+    def lookup(self, prompt: str, namespace: Optional[str] = None) -> Optional[Tuple[Any, float, str]]:
+        """Find the most similar cached prompt; returns (answer, similarity, cached prompt) above the threshold."""
+        
+        start = time.perf_counter()
+        tf = self.vectorizer.term_frequencies(prompt)
+        
+        with self._lock:
+            match = self._best_match(self.vectorizer.transform(tf), namespace)
+            if match is not None and match[1] >= self.threshold:
+                index, similarity = match
+                self._last_used[index] = time.monotonic()
+                result = (self._answers[index], similarity, self._prompts[index])
+            else:
+                result = None
+            
+            elapsed = time.perf_counter() - start
+            self.stats["lookups"] += 1
+            self.stats["hits" if result is not None else "misses"] += 1
+            self.stats["total_lookup_time"] += elapsed
+            self.stats["max_lookup_time"] = max(self.stats["max_lookup_time"], elapsed)
+        
+        return result
+    
+    def _best_match(self, query: np.ndarray, namespace: Optional[str]) -> Optional[Tuple[int, float]]:
+        """Index and cosine similarity of the closest entry in `namespace`. Caller holds the lock."""
+        
+        namespace_id = self._namespace_index.get(namespace)
+        if self._size == 0 or namespace_id is None:
+            return None
+        
+        scores = self._matrix[:self._size] @ query
+        if len(self._namespace_index) > 1:
+            scores[self._namespace_ids[:self._size] != namespace_id] = -1.0
+        
+        index = int(np.argmax(scores))
+        return index, float(scores[index])
+    
+    def add(self, prompt: str, answer: Any, namespace: Optional[str] = None):
+        """Store an answer under the embedding of `prompt`."""
+        
+        tf = self.vectorizer.term_frequencies(prompt)
+        
+        with self._lock:
+            self.vectorizer.fit_document(tf)
+            vector = self.vectorizer.transform(tf)
+            
+            if self._size < self.max_entries:
+                if self._size == len(self._matrix):
+                    self._grow()
+                index = self._size
+                self._size += 1
+                self._prompts.append(prompt)
+                self._answers.append(answer)
+            else:
+                index = int(np.argmin(self._last_used[:self._size]))
+                self._prompts[index] = prompt
+                self._answers[index] = answer
+                self.stats["evictions"] += 1
+            
+            self._matrix[index] = vector
+            self._last_used[index] = time.monotonic()
+            self._namespace_ids[index] = self._namespace_index.setdefault(namespace, len(self._namespace_index))
+            self.stats["entries_added"] += 1
+    
+    def _grow(self):
+        """Double the index capacity (up to max_entries). Caller holds the lock."""
+        
+        capacity = min(self.max_entries, len(self._matrix) * 2)
+        matrix = np.zeros((capacity, self.vectorizer.dim), dtype=np.float32)
+        matrix[:self._size] = self._matrix[:self._size]
+        last_used = np.zeros(capacity, dtype=np.float64)
+        last_used[:self._size] = self._last_used[:self._size]
+        namespace_ids = np.zeros(capacity, dtype=np.int32)
+        namespace_ids[:self._size] = self._namespace_ids[:self._size]
+        self._matrix, self._last_used, self._namespace_ids = matrix, last_used, namespace_ids
+    
+    def similarity(self, first: str, second: str) -> float:
+        """Cosine similarity of two prompts under the current IDF weights."""
+        
+        a = self.vectorizer.transform(self.vectorizer.term_frequencies(first))
+        b = self.vectorizer.transform(self.vectorizer.term_frequencies(second))
+        return float(a @ b)
+    
+    def evaluate(self, labeled_pairs: List[Tuple[str, str, bool]]) -> Dict[str, Any]:
+        """Measure false hits on (prompt, other prompt, is_duplicate) pairs at the current threshold.
+        
+        The false-hit rate is the share of pairs scoring above the threshold
+        that are not duplicates; recall is the share of duplicates caught.
+        """
+        
+        predicted_hits = false_hits = duplicates = caught = 0
+        for first, second, is_duplicate in labeled_pairs:
+            hit = self.similarity(first, second) >= self.threshold
+            predicted_hits += hit
+            false_hits += hit and not is_duplicate
+            duplicates += is_duplicate
+            caught += hit and is_duplicate
+        
+        self.last_evaluation = {
+            "pairs": len(labeled_pairs),
+            "threshold": self.threshold,
+            "false_hit_rate": round(false_hits / predicted_hits, 3) if predicted_hits else 0,
+            "recall": round(caught / duplicates, 3) if duplicates else 0
+        }
+        return self.last_evaluation
+    
+    def clear(self):
+        """Remove every entry and reset the IDF statistics."""
+        
+        with self._lock:
+            self._size = 0
+            self._namespace_index.clear()
+            self._prompts.clear()
+            self._answers.clear()
+            self.vectorizer = HashedTfidfVectorizer(self.vectorizer.dim)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counts, lookup latency and index memory."""
+        
+        with self._lock:
+            stats = dict(self.stats)
+            entries = self._size
+            index_bytes = self._matrix.nbytes + self._last_used.nbytes + self._namespace_ids.nbytes
+        
+        lookups = stats["lookups"]
+        return {
+            "entries": entries,
+            "threshold": self.threshold,
+            "index_bytes": index_bytes,
+            "lookups": lookups,
+            "hits": stats["hits"],
+            "misses": stats["misses"],
+            "hit_rate": round(stats["hits"] / lookups * 100, 2) if lookups else 0,
+            "evictions": stats["evictions"],
+            "average_lookup_ms": round(stats["total_lookup_time"] / lookups * 1000, 3) if lookups else 0,
+            "max_lookup_ms": round(stats["max_lookup_time"] * 1000, 3),
+            "last_evaluation": self.last_evaluation
+        }
@@ -0,0 +1,204 @@
+"""
+Token counting and prompt budgeting.
+Counts tokens with the model's BPE encoding and fits prompt sections to a
+per-call token budget instead of slicing them by characters.
+"""
+
+import json
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Tuple, Sequence
+
+try:
+    import tiktoken
+except ImportError:  # Optional: fall back to the local approximation
+    tiktoken = None
+
+DEFAULT_ENCODING = "cl100k_base"
+TRUNCATION_MARKER = " [...]"
+
+# Chat formatting overhead per message and for priming the reply (OpenAI cookbook)
+TOKENS_PER_MESSAGE = 4
+TOKENS_PER_REPLY = 3
+
+# Same split as the cl100k pre-tokenizer, written for the stdlib `re` module
+_PRETOKEN_RE = re.compile(
+    r"'(?:[sdmt]|ll|ve|re)| ?[^\W\d_]+| ?\d{1,3}| ?[^\s\w]+[\r\n]*|\s*[\r\n]+|\s+(?!\S)|\s+",
+    re.IGNORECASE
+)
+
+class RegexEncoding:
+    """Local stand-in for a BPE encoding when tiktoken or its data files are unavailable.
+    
+    Splits text with the cl100k pre-tokenizer pattern and cuts each piece
+    into chunks of ``chars_per_token`` characters, which tracks BPE counts
+    for English prose closely enough for budgeting. Tokens are the text
+    chunks themselves, so decoding is a join.
+    """
+    
+    name = "regex-approx"
+    chars_per_token = 4
+    
+    def encode(self, text: str, disallowed_special=()) -> List[str]:
+        size = self.chars_per_token
+        tokens = []
+        for match in _PRETOKEN_RE.finditer(text):
+            piece = match.group()
+            tokens.extend(piece[i:i + size] for i in range(0, len(piece), size))
+        return tokens
+    
+    def decode(self, tokens: Sequence[str]) -> str:
+        return "".join(tokens)
+
+def load_encoding(model: str):
+    """BPE encoding for `model`: tiktoken's when available, else the local approximation."""
+    
+    if tiktoken is not None:
+        try:
+            try:
+                return tiktoken.encoding_for_model(model)
+            except KeyError:
+                return tiktoken.get_encoding(DEFAULT_ENCODING)
+        except Exception:
+            # Encoding files are downloaded on first use; offline hosts fall through
+            pass
+    return RegexEncoding()
+
+class TokenCounter:
+    """Token counts for prompt text, with an LRU cache of encodings.
+    
+    Agents re-send the same system prompts and instructions on every call,
+    so encodings are cached by text. The cache is shared by all agents in
+    the process and guarded by a thread lock.
+    """
+    
+    def __init__(self, encoding, cache_size: int = 4096):
+        self.encoding = encoding
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        
+        self.stats = {
+            "hits": 0,
+            "misses": 0
+        }
+    
+    @property
+    def encoding_name(self) -> str:
+        """Name of the encoding in use."""
+        return self.encoding.name
+    
+    def encode(self, text: str) -> Tuple:
+        """Tokens of `text`, from the cache when it has been encoded before."""
+        
+        with self._lock:
+            tokens = self._cache.get(text)
+            if tokens is not None:
+                self._cache.move_to_end(text)
+                self.stats["hits"] += 1
+                return tokens
+            self.stats["misses"] += 1
+        
+        tokens = tuple(self.encoding.encode(text, disallowed_special=()))
+        if self.cache_size > 0:
+            with self._lock:
+                self._cache[text] = tokens
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return tokens
+    
+    def count(self, text: str) -> int:
+        """Number of tokens in `text`."""
+        return len(self.encode(text)) if text else 0
+    
+    def count_messages(self, messages: List[Dict[str, str]]) -> int:
+        """Prompt tokens of a chat request, including per-message formatting overhead."""
+        
+        return sum(
+            TOKENS_PER_MESSAGE + self.count(message.get("content") or "") for message in messages
+        ) + TOKENS_PER_REPLY
+    
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cut `text` to at most `max_tokens` tokens, on a token boundary."""
+        
+        tokens = self.encode(text)
+        if len(tokens) <= max_tokens:
+            return text
+        return self.encoding.decode(list(tokens[:max(0, max_tokens)]))
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the encoding name and encoding cache hit rate."""
+        
+        with self._lock:
+            stats = dict(self.stats)
+            entries = len(self._cache)
+        
+        lookups = stats["hits"] + stats["misses"]
+        return {
+            "encoding": self.encoding_name,
+            "cache_entries": entries,
+            "cache_size": self.cache_size,
+            "hit_rate": round(stats["hits"] / lookups * 100, 2) if lookups else 0,
+            **stats
+        }
+
+def fit_sections(counter: TokenCounter, sections: Dict[str, str], budget: int) -> Tuple[Dict[str, str], Dict[str, Any]]:
+    """Fit prompt sections into `budget` tokens and report what was cut.
+    
+    Sections that fit in an equal share of the budget are kept whole and
+    their unused share goes to the others, so only the largest sections are
+    truncated. Truncated sections end with TRUNCATION_MARKER so the model
+    knows the text is incomplete.
+    """
+    
+    counts = {name: counter.count(text) for name, text in sections.items()}
+    fitted = dict(sections)
+    truncated = []
+    remaining = max(0, budget)
+    
+    ordered = sorted(sections, key=lambda name: counts[name])
+    for position, name in enumerate(ordered):
+        share = remaining // (len(ordered) - position)
+        if counts[name] <= share:
+            remaining -= counts[name]
+            continue
+        
+        marker_tokens = counter.count(TRUNCATION_MARKER)
+        fitted[name] = counter.truncate(sections[name], max(0, share - marker_tokens)) + TRUNCATION_MARKER
+        remaining -= share
+        truncated.append(name)
+    
+    original_tokens = sum(counts.values())
+    fitted_tokens = sum(counter.count(text) for text in fitted.values())
+    return fitted, {
+        "budget": budget,
+        "original_tokens": original_tokens,
+        "fitted_tokens": fitted_tokens,
+        "tokens_saved": max(0, original_tokens - fitted_tokens),
+        "truncated_sections": truncated
+    }
+
+def render_context(context: Dict[str, Any]) -> str:
+    """Compact JSON rendering of a context dict for prompts (no repr quoting or padding)."""
+    
+    return json.dumps(
+        {key: value for key, value in context.items() if value not in (None, "", [], {})},
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str
+    )
+
+_counters: Dict[Tuple, TokenCounter] = {}
+_counters_lock = threading.Lock()
+
+def get_token_counter(config) -> TokenCounter:
+    """Get the process-wide token counter for the model in `config`."""
+    
+    key = (config.openai_model, config.token_cache_size)
+    with _counters_lock:
+        counter = _counters.get(key)
+        if counter is None:
+            counter = TokenCounter(load_encoding(config.openai_model), cache_size=config.token_cache_size)
+            _counters[key] = counter
+        return counter
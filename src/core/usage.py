@@ -0,0 +1,130 @@
+"""
+Token usage and cost accounting for LLM calls.
+Agents record each call's prompt, cached and completion tokens; usage
+scopes collect the calls made inside them, e.g. one content type or one
+coordinator workflow, even when workflows run concurrently.
+"""
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, Optional, Tuple, Iterator
+
+# USD per million tokens: input, cached input and output (list prices; override with Config.model_prices)
+DEFAULT_MODEL_PRICES = {
+    "gpt-4o-mini": {"input": 0.15, "cached_input": 0.075, "output": 0.60},
+    "gpt-4o": {"input": 2.50, "cached_input": 1.25, "output": 10.00},
+    "gpt-4-turbo": {"input": 10.00, "cached_input": 10.00, "output": 30.00},
+    "gpt-4": {"input": 30.00, "cached_input": 30.00, "output": 60.00},
+    "gpt-3.5-turbo": {"input": 0.50, "cached_input": 0.50, "output": 1.50}
+}
+
+def model_prices(config) -> Dict[str, Dict[str, float]]:
+    """Price table: the defaults updated with `config.model_prices`."""
+    return {**DEFAULT_MODEL_PRICES, **config.model_prices}
+
+def estimate_cost(prices: Dict[str, Dict[str, float]], model: str, prompt_tokens: int, cached_tokens: int, completion_tokens: int) -> Optional[float]:
+    """Estimated USD cost of one call, or None for models without a price.
+    
+    Dated model names (e.g. "gpt-4o-2024-08-06") use the price of the longest
+    listed name they start with.
+    """
+    
+    matches = [name for name in prices if model == name or model.startswith(f"{name}-")]
+    if not matches:
+        return None
+    
+    price = prices[max(matches, key=len)]
+    uncached_tokens = prompt_tokens - cached_tokens
+    return (
+        uncached_tokens * price["input"]
+        + cached_tokens * price.get("cached_input", price["input"])
+        + completion_tokens * price["output"]
+    ) / 1_000_000
+
+class UsageMeter:
+    """Running totals of LLM calls, tokens, call time and estimated cost."""
+    
+    fields = ("calls", "prompt_tokens", "cached_tokens", "completion_tokens", "time", "cost", "unpriced_calls")
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.totals = dict.fromkeys(self.fields, 0)
+        self.by_model: Dict[str, Dict[str, float]] = {}
+    
+    def add(self, model: str, prompt_tokens: int, cached_tokens: int, completion_tokens: int, latency: float, cost: Optional[float]):
+        """Add one call."""
+        
+        with self._lock:
+            for totals in (self.totals, self.by_model.setdefault(model, dict.fromkeys(self.fields, 0))):
+                totals["calls"] += 1
+                totals["prompt_tokens"] += prompt_tokens
+                totals["cached_tokens"] += cached_tokens
+                totals["completion_tokens"] += completion_tokens
+                totals["time"] += latency
+                if cost is None:
+                    totals["unpriced_calls"] += 1
+                else:
+                    totals["cost"] += cost
+    
+    def merge(self, other: "UsageMeter"):
+        """Add another meter's totals to this one."""
+        
+        with other._lock:
+            by_model = {model: dict(totals) for model, totals in other.by_model.items()}
+        
+        with self._lock:
+            for model, totals in by_model.items():
+                for target in (self.totals, self.by_model.setdefault(model, dict.fromkeys(self.fields, 0))):
+                    for field in self.fields:
+                        target[field] += totals[field]
+    
+    @staticmethod
+    def summarize(totals: Dict[str, float]) -> Dict[str, Any]:
+        """Report one set of totals with tokens per second and averages."""
+        
+        calls = totals["calls"]
+        return {
+            "calls": calls,
+            "prompt_tokens": totals["prompt_tokens"],
+            "cached_tokens": totals["cached_tokens"],
+            "completion_tokens": totals["completion_tokens"],
+            "total_tokens": totals["prompt_tokens"] + totals["completion_tokens"],
+            "time": round(totals["time"], 3),
+            "tokens_per_second": round(totals["completion_tokens"] / totals["time"], 2) if totals["time"] > 0 else 0,
+            "cost": round(totals["cost"], 6),
+            "average_cost": round(totals["cost"] / calls, 6) if calls else 0,
+            "unpriced_calls": totals["unpriced_calls"]
+        }
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the totals and the per-model breakdown."""
+        
+        with self._lock:
+            totals = dict(self.totals)
+            by_model = {model: dict(model_totals) for model, model_totals in self.by_model.items()}
+        
+        return {
+            **self.summarize(totals),
+            "by_model": {model: self.summarize(model_totals) for model, model_totals in by_model.items()}
+        }
+
+# Meters of the usage scopes the current task runs in, innermost last
+_active_meters: ContextVar[Tuple[UsageMeter, ...]] = ContextVar("usage_meters", default=())
+
+@contextmanager
+def usage_scope(meter: Optional[UsageMeter] = None) -> Iterator[UsageMeter]:
+    """Collect the usage of every LLM call made inside the block, including in tasks it starts."""
+    
+    meter = meter if meter is not None else UsageMeter()
+    token = _active_meters.set(_active_meters.get() + (meter,))
+    try:
+        yield meter
+    finally:
+        _active_meters.reset(token)
+
+def record_usage(model: str, prompt_tokens: int, cached_tokens: int, completion_tokens: int, latency: float, cost: Optional[float]):
+    """Add one call to every usage scope the current task runs in."""
+    
+    for meter in _active_meters.get():
+        meter.add(model, prompt_tokens, cached_tokens, completion_tokens, latency, cost)
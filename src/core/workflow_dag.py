@@ -0,0 +1,128 @@
+"""
+Dependency-graph execution of workflow steps.
+A plan's steps are compiled into a DAG: a step runs as soon as the steps it
+depends on have finished, concurrently with its independent siblings and
+up to a bound on parallel steps. Per-step timings give the critical path.
+"""
+
+import asyncio
+import time
+from typing import Dict, Any, List, Tuple, Callable, Awaitable
+
+class WorkflowDAG:
+    """Steps of a workflow plan and their dependencies.
+    
+    A step's id is its ``id`` if set, else its agent name (``Agent-2`` etc.
+    for repeated agents). A step depends on the ids in its ``depends_on``
+    list, or, without one, on every step of a lower priority, so steps with
+    the same priority run in parallel. Dependencies may only point at
+    earlier steps, which keeps the graph acyclic.
+    """
+    
+    def __init__(self, steps: List[Dict[str, Any]]):
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        self.dependencies: Dict[str, List[str]] = {}
+        
+        for step in steps:
+            base_id = step.get("id") or step.get("agent")
+            step_id, count = base_id, 1
+            while step_id in self.steps:
+                count += 1
+                step_id = f"{base_id}-{count}"
+            
+            if "depends_on" in step:
+                dependencies = [dep for dep in step["depends_on"] if dep in self.steps]
+            else:
+                dependencies = [
+                    earlier_id for earlier_id, earlier in self.steps.items()
+                    if earlier.get("priority", 1) < step.get("priority", 1)
+                ]
+            
+            self.steps[step_id] = step
+            self.dependencies[step_id] = dependencies
+    
+    async def run(self, run_step: Callable[[Dict[str, Any]], Awaitable[Any]], max_parallel: int) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Run every step once its dependencies are done; return results by step id and the timing report."""
+        
+        semaphore = asyncio.Semaphore(max_parallel)
+        started = time.monotonic()
+        tasks: Dict[str, asyncio.Task] = {}
+        timings: Dict[str, Dict[str, float]] = {}
+        
+        async def run_node(step_id: str) -> Any:
+            if self.dependencies[step_id]:
+                await asyncio.wait([tasks[dep] for dep in self.dependencies[step_id]])
+            ready = time.monotonic()
+            
+            async with semaphore:
+                step_start = time.monotonic()
+                try:
+                    return await run_step(self.steps[step_id])
+                finally:
+                    step_end = time.monotonic()
+                    timings[step_id] = {
+                        "start": step_start - started,
+                        "end": step_end - started,
+                        "duration": step_end - step_start,
+                        "queued": step_start - ready
+                    }
+        
+        # Dependencies always come first, so each task can refer to the tasks it waits on
+        if hasattr(asyncio, "TaskGroup"):
+            async with asyncio.TaskGroup() as group:
+                for step_id in self.steps:
+                    tasks[step_id] = group.create_task(run_node(step_id))
+        else:  # Python < 3.11
+            for step_id in self.steps:
+                tasks[step_id] = asyncio.ensure_future(run_node(step_id))
+            try:
+                await asyncio.gather(*tasks.values())
+            except BaseException:
+                for task in tasks.values():
+                    task.cancel()
+                raise
+        
+        results = {step_id: task.result() for step_id, task in tasks.items()}
+        return results, self.timing_report(timings, time.monotonic() - started)
+    
+    def critical_path(self, durations: Dict[str, float]) -> Tuple[List[str], float]:
+        """Longest chain of dependent steps by duration, and its total time."""
+        
+        finish: Dict[str, float] = {}
+        previous: Dict[str, str] = {}
+        for step_id, dependencies in self.dependencies.items():
+            longest = max(dependencies, key=lambda dep: finish[dep], default=None)
+            finish[step_id] = durations.get(step_id, 0.0) + (finish[longest] if longest else 0.0)
+            if longest:
+                previous[step_id] = longest
+        
+        if not finish:
+            return [], 0.0
+        
+        step_id = max(finish, key=finish.get)
+        path = [step_id]
+        while path[-1] in previous:
+            path.append(previous[path[-1]])
+        return path[::-1], finish[step_id]
+    
+    def timing_report(self, timings: Dict[str, Dict[str, float]], wall_time: float) -> Dict[str, Any]:
+        """Summarize step timings: wall time, summed step time, parallelism and the critical path."""
+        
+        step_time = sum(timing["duration"] for timing in timings.values())
+        path, path_time = self.critical_path({step_id: timing["duration"] for step_id, timing in timings.items()})
+        
+        return {
+            "wall_time": round(wall_time, 3),
+            "step_time": round(step_time, 3),
+            "parallelism": round(step_time / wall_time, 2) if wall_time > 0 else 0,
+            "critical_path": path,
+            "critical_path_time": round(path_time, 3),
+            "steps": {
+                step_id: {
+                    "agent": self.steps[step_id].get("agent"),
+                    "depends_on": self.dependencies[step_id],
+                    **{name: round(value, 3) for name, value in timings.get(step_id, {}).items()}
+                }
+                for step_id in self.steps
+            }
+        }
@@ -0,0 +1,44 @@
+"""
+Shared pytest fixtures.
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from src.core import (
+    circuit_breaker, concurrency, llm_backend, llm_client, prompts, rate_limiter, response_cache, retry, tokens
+)
+
+# Process-wide registries shared by every agent built from the same settings
+_REGISTRIES = [
+    circuit_breaker._breakers,
+    rate_limiter._limiters,
+    concurrency._limiters,
+    retry._budgets,
+    retry._engines,
+    llm_backend._backends,
+    llm_client._pools,
+    response_cache._caches,
+    tokens._counters
+]
+
+def _reset_registries():
+    for registry in _REGISTRIES:
+        registry.clear()
+    prompts._registry = prompts.PromptRegistry()
+
+@pytest.fixture(autouse=True)
+def reset_process_registries():
+    """Give every test fresh process-wide limiters, breakers, backends and caches.
+    
+    Agents share these per endpoint or per setting, so state left by one
+    test (an open circuit, a reduced concurrency limit, a spent retry budget,
+    cached responses) would otherwise change the results of later tests.
+    """
+    _reset_registries()
+    yield
+    _reset_registries()
@@ -17,6 +17,7 @@ from src.agents.research_agent import ResearchAgent
 from src.agents.content_agent import ContentAgent
 from src.agents.validation_agent import ValidationAgent
 from src.core.config import Config
+from src.core.circuit_breaker import CircuitBreaker
 
 class TestAgentCoordination:
     """Test cases for agent coordination and communication."""
@@ -107,6 +108,28 @@ class TestAgentCoordination:
             assert result["success"] is True
             assert "workflow_results" in result["result"]
     
+    @pytest.mark.asyncio
+    async def test_open_circuit_skips_agent_steps(self, coordinator):
+        """Test that steps are skipped immediately while the LLM circuit is open."""
+        
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=60)
+        breaker.record_failure()
+        for agent in [coordinator] + list(coordinator.agents.values()):
+            agent.circuit_breaker = breaker
+        
+        with patch.object(coordinator.research_agent, 'process') as mock_research:
+            result = await coordinator.process({"task": "Test task"})
+            
+            assert result["success"] is True
+            assert result["workflow_plan"]["fallback"] is True
+            step_results = result["result"]["workflow_results"].values()
+            assert all(step["skipped"] for step in step_results)
+            mock_research.assert_not_called()
+        
+        health = await coordinator.health_check_all_agents()
+        assert health["system_healthy"] is False
+        assert health["circuit_breaker"]["state"] == "open"
+    
     @pytest.mark.asyncio
     async def test_research_to_content_flow(self, coordinator):
         """Test data flow from research agent to content agent."""
@@ -160,6 +183,20 @@ class TestAgentCoordination:
             mock_content.assert_called_once()
             mock_validation.assert_called_once()
     
+    @pytest.mark.asyncio
+    async def test_stream_response_forwards_content_stream(self, coordinator):
+        """Test that the coordinator forwards the ContentAgent's token stream."""
+        
+        async def fake_stream(messages, **kwargs):
+            for delta in ["Machine ", "learning ", "basics"]:
+                yield delta
+        
+        with patch.object(coordinator.content_agent, '_stream_llm_request', side_effect=fake_stream) as mock_stream:
+            deltas = [delta async for delta in coordinator.stream_response({"task": "Explain machine learning basics"})]
+            
+            assert deltas == ["Machine ", "learning ", "basics"]
+            mock_stream.assert_called_once()
+    
     def test_get_all_agent_metrics(self, coordinator):
         """Test getting metrics from all agents."""
         metrics = coordinator.get_all_agent_metrics()
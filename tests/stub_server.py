@@ -0,0 +1,210 @@
+"""
+Stand-in OpenAI-compatible HTTP server for tests and benchmarks.
+Answers /chat/completions on localhost with a fixed latency, so the real
+client, connection pool and endpoint balancing can be exercised offline.
+"""
+
+import asyncio
+import json
+import time
+from typing import Dict, Any, Optional, Tuple
+
+# HTTP/2 (h2c with prior knowledge) is served when h2 is installed
+try:
+    import h2.config
+    import h2.connection
+    import h2.events
+    import h2.exceptions
+except ImportError:
+    h2 = None
+
+HTTP2_PREFACE = b"PRI * HTTP/2.0\r\n"
+
+class StubLLMServer:
+    """Minimal HTTP/1.1 and h2c server speaking the chat completions API.
+    
+    Every request waits ``latency`` seconds and is answered with
+    ``status`` (200 by default). Set ``status`` to e.g. 503 to make the
+    server fail. Streamed requests get the whole SSE body in one response.
+    Each new connection first waits ``handshake_latency`` seconds, standing
+    in for the TCP and TLS round trips of a remote endpoint.
+    """
+    
+    def __init__(self, latency: float = 0.0, status: int = 200, name: str = "stub", handshake_latency: float = 0.0):
+        self.latency = latency
+        self.status = status
+        self.name = name
+        self.handshake_latency = handshake_latency
+        self._server: Optional[asyncio.AbstractServer] = None
+        # Open connections: handler task -> writer
+        self._connections: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+        
+        self.stats = {
+            "requests": 0,
+            "connections": 0,
+            "in_flight": 0,
+            "peak_in_flight": 0
+        }
+    
+    @property
+    def base_url(self) -> str:
+        """Base URL for OpenAI clients (``http://127.0.0.1:<port>/v1``)."""
+        
+        port = self._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/v1"
+    
+    async def start(self) -> "StubLLMServer":
+        """Listen on a free localhost port."""
+        
+        self._server = await asyncio.start_server(self._handle_connection, "127.0.0.1", 0)
+        return self
+    
+    async def stop(self):
+        """Stop listening and close open connections."""
+        
+        if self._server is not None:
+            self._server.close()
+            for writer in self._connections.values():
+                writer.close()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+    
+    async def __aenter__(self) -> "StubLLMServer":
+        return await self.start()
+    
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+    
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve requests on one connection until the client closes it."""
+        
+        self.stats["connections"] += 1
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            await asyncio.sleep(self.handshake_latency)
+            request_line = await reader.readline()
+            if request_line == HTTP2_PREFACE and h2 is not None:
+                await self._serve_http2(request_line, reader, writer)
+            else:
+                await self._serve_http1(request_line, reader, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.pop(task, None)
+            writer.close()
+    
+    async def _serve_http1(self, request_line: bytes, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve keep-alive HTTP/1.1 requests."""
+        
+        while request_line:
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+            path = request_line.decode("latin-1").split(" ")[1]
+            status, content_type, payload = await self._respond(path, body)
+            
+            writer.write(
+                f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: keep-alive\r\n\r\n".encode("latin-1") + payload
+            )
+            await writer.drain()
+            request_line = await reader.readline()
+    
+    async def _serve_http2(self, preface: bytes, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve multiplexed HTTP/2 streams, answering each as soon as its request is complete."""
+        
+        conn = h2.connection.H2Connection(config=h2.config.H2Configuration(client_side=False, header_encoding="utf-8"))
+        conn.initiate_connection()
+        conn.receive_data(preface)
+        writer.write(conn.data_to_send())
+        
+        requests: Dict[int, Tuple[Dict[str, str], bytearray]] = {}
+        responses = set()
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                for event in conn.receive_data(data):
+                    if isinstance(event, h2.events.RequestReceived):
+                        requests[event.stream_id] = (dict(event.headers), bytearray())
+                    elif isinstance(event, h2.events.DataReceived):
+                        requests[event.stream_id][1].extend(event.data)
+                        conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                    elif isinstance(event, h2.events.StreamEnded):
+                        headers, body = requests.pop(event.stream_id)
+                        task = asyncio.ensure_future(self._respond_http2(conn, writer, event.stream_id, headers[":path"], bytes(body)))
+                        responses.add(task)
+                        task.add_done_callback(responses.discard)
+                    elif isinstance(event, h2.events.ConnectionTerminated):
+                        return
+                writer.write(conn.data_to_send())
+        finally:
+            for task in responses:
+                task.cancel()
+    
+    async def _respond_http2(self, conn, writer: asyncio.StreamWriter, stream_id: int, path: str, body: bytes):
+        """Answer one HTTP/2 stream."""
+        
+        status, content_type, payload = await self._respond(path, body)
+        try:
+            conn.send_headers(stream_id, [
+                (":status", str(status)),
+                ("content-type", content_type),
+                ("content-length", str(len(payload)))
+            ])
+            conn.send_data(stream_id, payload, end_stream=True)
+            writer.write(conn.data_to_send())
+        except h2.exceptions.ProtocolError:
+            # The client reset the stream or closed the connection
+            pass
+    
+    async def _respond(self, path: str, body: bytes):
+        """Build the status, content type and payload for one request."""
+        
+        # Model listing (used to prewarm connections) answers at once
+        if path.endswith("/models"):
+            models = {"object": "list", "data": [{"id": "stub", "object": "model", "created": 0, "owned_by": self.name}]}
+            return 200, "application/json", json.dumps(models).encode("utf-8")
+        
+        self.stats["requests"] += 1
+        self.stats["in_flight"] += 1
+        self.stats["peak_in_flight"] = max(self.stats["peak_in_flight"], self.stats["in_flight"])
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.stats["in_flight"] -= 1
+        
+        if self.status != 200:
+            error = {"error": {"message": f"{self.name} unavailable", "type": "server_error", "code": None}}
+            return self.status, "application/json", json.dumps(error).encode("utf-8")
+        
+        request = json.loads(body or b"{}")
+        content = f"{self.name} answer"
+        if request.get("stream"):
+            chunk = self._completion(request, {"delta": {"role": "assistant", "content": content}}, "chat.completion.chunk")
+            payload = f"data: {json.dumps(chunk)}\n\ndata: [DONE]\n\n"
+            return 200, "text/event-stream", payload.encode("utf-8")
+        
+        completion = self._completion(request, {"message": {"role": "assistant", "content": content}}, "chat.completion")
+        completion["usage"] = {"prompt_tokens": 10, "completion_tokens": 2, "total_tokens": 12}
+        return 200, "application/json", json.dumps(completion).encode("utf-8")
+    
+    def _completion(self, request: Dict[str, Any], choice: Dict[str, Any], kind: str) -> Dict[str, Any]:
+        return {
+            "id": f"{self.name}-{self.stats['requests']}",
+            "object": kind,
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [{"index": 0, "finish_reason": "stop", **choice}]
+        }
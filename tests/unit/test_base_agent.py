@@ -14,6 +14,7 @@ sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
 
 from src.agents.base_agent import BaseAgent
 from src.core.config import Config
+from src.core.circuit_breaker import CircuitBreaker, CircuitOpenError
 
 class TestableAgent(BaseAgent):
     """Testable implementation of BaseAgent for testing."""
@@ -106,7 +107,7 @@ class TestBaseAgent:
     @pytest.mark.asyncio
     async def test_make_llm_request_success(self, agent):
         """Test successful LLM request."""
-        with patch.object(agent.client.chat.completions, 'create') as mock_create:
+        with patch.object(agent.client.chat.completions, 'create', new_callable=AsyncMock) as mock_create:
             # Mock response
             mock_response = Mock()
             mock_response.choices = [Mock()]
@@ -121,10 +122,143 @@ class TestBaseAgent:
             assert agent.metrics["successes"] == 1
             assert agent.metrics["failures"] == 0
     
+    @pytest.mark.asyncio
+    async def test_make_llm_request_does_not_block_event_loop(self, agent):
+        """Test that concurrent LLM requests overlap instead of queuing."""
+        mock_response = Mock()
+        mock_response.choices = [Mock()]
+        mock_response.choices[0].message.content = "test response"
+        
+        async def slow_create(**kwargs):
+            await asyncio.sleep(0.2)
+            return mock_response
+        
+        with patch.object(agent.client.chat.completions, 'create', side_effect=slow_create):
+            start = asyncio.get_running_loop().time()
+            results = await asyncio.gather(*[
+                agent._make_llm_request([{"role": "user", "content": f"test {i}"}]) for i in range(5)
+            ])
+            elapsed = asyncio.get_running_loop().time() - start
+            
+            assert results == ["test response"] * 5
+            assert elapsed < 0.6  # Serialized calls would take 1.0s
+    
+    @pytest.mark.asyncio
+    async def test_identical_concurrent_requests_are_coalesced(self, agent):
+        """Test that identical in-flight requests share a single provider call."""
+        mock_response = Mock()
+        mock_response.choices = [Mock()]
+        mock_response.choices[0].message.content = "test response"
+        
+        async def slow_create(**kwargs):
+            await asyncio.sleep(0.1)
+            return mock_response
+        
+        with patch.object(agent.client.chat.completions, 'create', side_effect=slow_create) as mock_create:
+            messages = [{"role": "user", "content": "popular task"}]
+            results = await asyncio.gather(*[agent._make_llm_request(messages, max_tokens=10) for _ in range(4)])
+            
+            assert results == ["test response"] * 4
+            assert mock_create.call_count == 1
+            assert agent.get_metrics()["coalesced"] == 3
+            assert agent._inflight_requests == {}
+    
+    @pytest.mark.asyncio
+    async def test_different_requests_are_not_coalesced(self, agent):
+        """Test that requests differing in kwargs are sent separately."""
+        mock_response = Mock()
+        mock_response.choices = [Mock()]
+        mock_response.choices[0].message.content = "test response"
+        
+        with patch.object(agent.client.chat.completions, 'create', new_callable=AsyncMock) as mock_create:
+            mock_create.return_value = mock_response
+            messages = [{"role": "user", "content": "popular task"}]
+            await asyncio.gather(
+                agent._make_llm_request(messages, max_tokens=10),
+                agent._make_llm_request(messages, max_tokens=20)
+            )
+            
+            assert mock_create.call_count == 2
+            assert agent.metrics["coalesced"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_agents_share_pooled_client(self, agent, config, logger):
+        """Test that agents with the same settings share one pooled client."""
+        other_agent = TestableAgent("OtherAgent", config, logger)
+        
+        assert other_agent.client_pool is agent.client_pool
+        assert other_agent.client is agent.client
+    
+    @pytest.mark.asyncio
+    async def test_make_llm_request_tracks_pool_utilization(self, agent):
+        """Test that LLM requests are counted against the shared pool."""
+        mock_response = Mock()
+        mock_response.choices = [Mock()]
+        mock_response.choices[0].message.content = "test response"
+        
+        requests_before = agent.client_pool.stats["requests"]
+        
+        with patch.object(agent.client.chat.completions, 'create', new_callable=AsyncMock) as mock_create:
+            mock_create.return_value = mock_response
+            await agent._make_llm_request([{"role": "user", "content": "test"}])
+        
+        pool_stats = agent.get_metrics()["connection_pool"]
+        assert pool_stats["requests"] == requests_before + 1
+        assert pool_stats["in_flight"] == 0
+        assert pool_stats["peak_in_flight"] >= 1
+        assert pool_stats["max_connections"] == agent.config.http_max_connections
+    
+    @staticmethod
+    def _stream_of(deltas):
+        """Build a create() stand-in that streams the given deltas."""
+        
+        async def chunks():
+            for delta in deltas:
+                chunk = Mock()
+                chunk.choices = [Mock()]
+                chunk.choices[0].delta.content = delta
+                yield chunk
+        
+        async def create(**kwargs):
+            assert kwargs["stream"] is True
+            return chunks()
+        
+        return create
+    
+    @pytest.mark.asyncio
+    async def test_stream_llm_request_yields_deltas(self, agent):
+        """Test that streaming yields the completion incrementally and records metrics."""
+        agent.config.enable_output_filtering = True
+        deltas = ["Hello", " there", ", this", " is", " streamed", " text", " output."]
+        
+        with patch.object(agent.client.chat.completions, 'create', side_effect=self._stream_of(deltas)):
+            received = [delta async for delta in agent._stream_llm_request([{"role": "user", "content": "test"}])]
+        
+        assert "".join(received) == "".join(deltas)
+        assert len(received) > 1
+        
+        streaming = agent.get_metrics()["streaming"]
+        assert streaming["streams"] == 1
+        assert streaming["tokens"] == len(deltas)
+        assert agent.metrics["successes"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_stream_llm_request_filters_across_chunks(self, agent):
+        """Test that sensitive patterns split across deltas are still filtered."""
+        agent.config.enable_output_filtering = True
+        deltas = ["Your ap", "i_", "key is hidden"]
+        
+        with patch.object(agent.client.chat.completions, 'create', side_effect=self._stream_of(deltas)):
+            received = [delta async for delta in agent._stream_llm_request([{"role": "user", "content": "test"}])]
+        
+        streamed = "".join(received)
+        assert streamed == agent.filter_output("".join(deltas))
+        assert "api_key" not in streamed
+    
     @pytest.mark.asyncio
     async def test_make_llm_request_failure(self, agent):
         """Test failed LLM request."""
-        with patch.object(agent.client.chat.completions, 'create') as mock_create:
+        with patch.object(agent.client.chat.completions, 'create', new_callable=AsyncMock) as mock_create:
             mock_create.side_effect = Exception("API Error")
             
             messages = [{"role": "user", "content": "test"}]
@@ -134,6 +268,91 @@ class TestBaseAgent:
             
             assert agent.metrics["failures"] > 0
     
+    @pytest.fixture
+    def hedging_agent(self, logger):
+        """Create an agent with request hedging enabled and a 50ms p95."""
+        config = Config(
+            openai_api_key="test_key",
+            enable_request_hedging=True,
+            hedge_agents="TestAgent",
+            hedge_max_rate=0.5
+        )
+        agent = TestableAgent("TestAgent", config, logger)
+        agent._latencies.extend([0.05] * agent.hedge_min_samples)
+        return agent
+    
+    @pytest.mark.asyncio
+    async def test_slow_request_is_hedged(self, hedging_agent):
+        """Test that a request slower than p95 is duplicated and the fast copy wins."""
+        calls = []
+        
+        async def create(**kwargs):
+            calls.append(kwargs)
+            response = Mock()
+            response.choices = [Mock()]
+            response.choices[0].message.content = f"response {len(calls)}"
+            await asyncio.sleep(1.0 if len(calls) == 1 else 0.01)
+            return response
+        
+        with patch.object(hedging_agent.client.chat.completions, 'create', side_effect=create):
+            start = asyncio.get_running_loop().time()
+            result = await hedging_agent._make_llm_request([{"role": "user", "content": "test"}])
+            elapsed = asyncio.get_running_loop().time() - start
+        
+        assert result == "response 2"
+        assert elapsed < 0.5
+        hedging = hedging_agent.get_metrics()["hedging"]
+        assert hedging["hedges"] == 1
+        assert hedging["wins"] == 1
+        # The losing request was cancelled and gave its slot back
+        await asyncio.sleep(0.01)
+        assert hedging_agent.concurrency_limiter.get_stats()["in_flight"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_hedge_rate_is_capped(self, hedging_agent):
+        """Test that hedges stop once the hedge-rate cap is reached."""
+        hedging_agent.metrics["hedges"] = 10
+        hedging_agent.metrics["requests"] = 10
+        
+        async def create(**kwargs):
+            await asyncio.sleep(0.1)
+            response = Mock()
+            response.choices = [Mock()]
+            response.choices[0].message.content = "slow response"
+            return response
+        
+        with patch.object(hedging_agent.client.chat.completions, 'create', side_effect=create) as mock_create:
+            result = await hedging_agent._make_llm_request([{"role": "user", "content": "test"}])
+        
+        assert result == "slow response"
+        assert mock_create.call_count == 1
+        assert hedging_agent.get_metrics()["hedging"]["rate_capped"] == 1
+    
+    def test_hedging_is_opt_in(self, agent):
+        """Test that hedging is disabled by default."""
+        assert agent.hedging_enabled is False
+        assert agent.get_metrics()["hedging"]["hedges"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_open_circuit_stops_retries_and_fails_fast(self, agent):
+        """Test that an open circuit cuts the retry schedule short and rejects new calls."""
+        agent.circuit_breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=60)
+        
+        with patch.object(agent.client.chat.completions, 'create', new_callable=AsyncMock) as mock_create:
+            mock_create.side_effect = asyncio.TimeoutError()
+            
+            with pytest.raises(CircuitOpenError):
+                await agent._make_llm_request([{"role": "user", "content": "test"}])
+            with pytest.raises(CircuitOpenError):
+                await agent._make_llm_request([{"role": "user", "content": "other"}])
+            
+            assert mock_create.call_count == 1
+        
+        health = await agent.health_check()
+        assert health["healthy"] is False
+        assert health["circuit_state"] == "open"
+        assert agent.get_metrics()["circuit_breaker"]["rejected"] == 3
+    
     @pytest.mark.asyncio
     async def test_health_check_success(self, agent):
         """Test successful health check."""
@@ -0,0 +1,129 @@
+"""
+Unit tests for offline batch mode.
+"""
+
+import pytest
+import json
+import logging
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
+
+from src.agents.content_agent import ContentAgent
+from src.core.batch import BatchRunner, LocalBatchBackend, create_batch_runner
+from src.core.config import Config
+from src.core.usage import usage_scope
+
+class TestBatchRunner:
+    """Test cases for BatchRunner with the local file-based backend."""
+    
+    @pytest.fixture
+    def config(self, tmp_path):
+        """Create test configuration using the local batch backend."""
+        return Config(openai_api_key="test_key", batch_backend="local", batch_work_dir=str(tmp_path))
+    
+    @pytest.fixture
+    def logger(self):
+        """Create test logger."""
+        return logging.getLogger("test")
+    
+    @pytest.mark.asyncio
+    async def test_content_jobs_run_as_one_batch(self, config, logger, tmp_path):
+        """Test that jobs' LLM requests are written as one Batch JSONL file and results flow back."""
+        agent = ContentAgent(config, logger)
+        backend = LocalBatchBackend(tmp_path, responder=lambda body: f"Generated for {len(body['messages'])} messages")
+        runner = BatchRunner(backend, tmp_path, poll_interval=0.01)
+        
+        with patch.object(agent.client.chat.completions, 'create', new_callable=AsyncMock) as mock_create:
+            results = await runner.run([
+                (agent, {"content_request": f"Explain topic {i}", "content_type": "explanation"}) for i in range(5)
+            ])
+            mock_create.assert_not_called()
+        
+        assert [result["success"] for result in results] == [True] * 5
+        assert results[0]["content"] == "Generated for 3 messages"
+        assert results[0]["content_type"] == "explanation"
+        
+        assert len(backend.submitted) == 1
+        lines = [json.loads(line) for line in backend.submitted[0].read_text().splitlines()]
+        assert len(lines) == 5
+        assert lines[0]["method"] == "POST"
+        assert lines[0]["url"] == "/v1/chat/completions"
+        assert lines[0]["body"]["model"] == config.openai_model
+        assert "Explain topic 0" in lines[0]["body"]["messages"][-1]["content"]
+        
+        assert runner.get_stats()["rounds"] == 1
+        assert agent.get_metrics()["batched"] == 5
+    
+    @pytest.mark.asyncio
+    async def test_identical_requests_share_one_batch_line(self, config, logger, tmp_path):
+        """Test that identical requests from several jobs are submitted once."""
+        agent = ContentAgent(config, logger)
+        backend = LocalBatchBackend(tmp_path)
+        runner = BatchRunner(backend, tmp_path, poll_interval=0.01)
+        
+        job = {"content_request": "Explain batching", "content_type": "summary"}
+        results = await runner.run([(agent, job), (agent, dict(job))])
+        
+        assert results[0]["content"] == results[1]["content"]
+        assert runner.get_stats()["requests"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_batch_usage_is_recorded(self, config, logger, tmp_path):
+        """Test that batch completions count towards agent and scope usage, once per batch line."""
+        agent = ContentAgent(config, logger)
+        backend = LocalBatchBackend(tmp_path, responder=lambda body: "three word answer")
+        runner = BatchRunner(backend, tmp_path, poll_interval=0.01)
+        
+        job = {"content_request": "Explain batching", "content_type": "summary"}
+        with usage_scope() as meter:
+            await runner.run([(agent, job), (agent, dict(job)), (agent, {"content_request": "Explain polling"})])
+        
+        usage = agent.get_metrics()["usage"]
+        assert usage["calls"] == 2
+        assert usage["completion_tokens"] == 6
+        assert usage["prompt_tokens"] > 0
+        assert config.openai_model in usage["by_model"]
+        assert meter.to_dict()["calls"] == 2
+        assert meter.to_dict()["completion_tokens"] == 6
+    
+    @pytest.mark.asyncio
+    async def test_failed_batch_lines_become_agent_failures(self, config, logger, tmp_path):
+        """Test that a failed request in the batch surfaces through the agent's error handling."""
+        agent = ContentAgent(config, logger)
+        backend = LocalBatchBackend(tmp_path)
+        runner = BatchRunner(backend, tmp_path, poll_interval=0.01)
+        
+        async def failing_submit(input_path):
+            batch_id = await LocalBatchBackend.submit(backend, input_path)
+            output_path = tmp_path / f"{batch_id}_output.jsonl"
+            records = [json.loads(line) for line in output_path.read_text().splitlines()]
+            for record in records:
+                record["response"] = {"status_code": 500, "body": {"error": "server error"}}
+            output_path.write_text("".join(json.dumps(record) + "\n" for record in records))
+            return batch_id
+        
+        with patch.object(backend, 'submit', side_effect=failing_submit):
+            results = await runner.run([(agent, {"content_request": "Explain batching"})])
+        
+        assert results[0]["success"] is False
+        assert "500" in results[0]["error"]
+        assert runner.get_stats()["failed_requests"] == 1
+    
+    def test_create_batch_runner_uses_configured_backend(self, config):
+        """Test that the local backend is selected from config."""
+        runner = create_batch_runner(config)
+        
+        assert isinstance(runner.backend, LocalBatchBackend)
+        assert runner.poll_interval == config.batch_poll_interval
+    
+    def test_invalid_batch_backend_rejected(self):
+        """Test that unknown batch backends fail validation."""
+        with pytest.raises(ValueError):
+            Config(openai_api_key="test_key", batch_backend="carrier-pigeon")
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,134 @@
+"""
+Unit tests for the LLM endpoint circuit breaker.
+"""
+
+import pytest
+import time
+import sys
+from pathlib import Path
+from unittest.mock import Mock
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
+
+from src.core.circuit_breaker import CircuitBreaker, CircuitOpenError, get_circuit_breaker
+from src.core.config import Config
+
+def status_error(status_code):
+    """Build an error shaped like an openai.APIStatusError."""
+    error = Exception(f"HTTP {status_code}")
+    error.status_code = status_code
+    error.response = Mock(headers={})
+    return error
+
+class TestCircuitBreaker:
+    """Test cases for CircuitBreaker."""
+    
+    @pytest.fixture
+    def breaker(self):
+        """Create a breaker that opens after three failures."""
+        return CircuitBreaker(failure_threshold=3, recovery_timeout=0.05)
+    
+    @staticmethod
+    def fail(breaker, error):
+        """Run one guarded call that raises `error`."""
+        with pytest.raises(type(error)):
+            with breaker.call():
+                raise error
+    
+    def test_opens_after_consecutive_transient_failures(self, breaker):
+        """Test that the circuit opens at the failure threshold."""
+        for _ in range(3):
+            self.fail(breaker, status_error(503))
+        
+        assert breaker.state == "open"
+        assert breaker.is_open is True
+        
+        with pytest.raises(CircuitOpenError) as exc_info:
+            breaker.before_call()
+        assert exc_info.value.retry_in > 0
+        assert breaker.get_stats()["rejected"] == 1
+    
+    def test_success_resets_failure_count(self, breaker):
+        """Test that only consecutive failures count."""
+        for _ in range(2):
+            self.fail(breaker, status_error(503))
+        with breaker.call():
+            pass
+        for _ in range(2):
+            self.fail(breaker, status_error(503))
+        
+        assert breaker.state == "closed"
+    
+    def test_non_transient_errors_are_ignored(self, breaker):
+        """Test that request errors such as a 400 do not open the circuit."""
+        for _ in range(5):
+            self.fail(breaker, status_error(400))
+        
+        assert breaker.state == "closed"
+    
+    def test_open_circuit_fails_fast(self):
+        """Test that rejecting a call costs microseconds, not a network round trip."""
+        # Recovery must not begin while the loop runs, however slow the host
+        breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=30.0)
+        for _ in range(3):
+            self.fail(breaker, status_error(503))
+        
+        start = time.perf_counter()
+        for _ in range(1000):
+            with pytest.raises(CircuitOpenError):
+                breaker.before_call()
+        
+        assert (time.perf_counter() - start) / 1000 < 0.001
+    
+    def test_successful_probe_closes_circuit(self, breaker):
+        """Test that the circuit half-opens after the timeout and a probe closes it."""
+        for _ in range(3):
+            self.fail(breaker, status_error(503))
+        time.sleep(0.06)
+        
+        assert breaker.state == "half_open"
+        assert breaker.before_call() is True
+        # Only one probe at a time
+        assert breaker.is_open is True
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        
+        breaker.record_success(probe=True)
+        
+        assert breaker.state == "closed"
+        assert breaker.get_stats()["closed"] == 1
+    
+    def test_failed_probe_reopens_circuit(self, breaker):
+        """Test that a failed probe opens the circuit again."""
+        for _ in range(3):
+            self.fail(breaker, status_error(503))
+        time.sleep(0.06)
+        
+        self.fail(breaker, status_error(502))
+        
+        assert breaker.state == "open"
+        assert breaker.get_stats()["opened"] == 2
+    
+    def test_abandoned_probe_frees_its_slot(self, breaker):
+        """Test that a cancelled probe lets the next call probe."""
+        for _ in range(3):
+            self.fail(breaker, status_error(503))
+        time.sleep(0.06)
+        
+        probe = breaker.before_call()
+        breaker.release(probe)
+        
+        assert breaker.before_call() is True
+    
+    def test_shared_breaker_per_endpoint(self):
+        """Test that agents on the same endpoint share one breaker."""
+        config = Config(openai_api_key="test_key")
+        
+        assert get_circuit_breaker(config) is get_circuit_breaker(Config(openai_api_key="test_key"))
+        assert get_circuit_breaker(config) is not get_circuit_breaker(
+            Config(openai_api_key="test_key", openai_base_url="http://localhost:8000/v1")
+        )
+
+if __name__ == "__main__":
+    pytest.main([__file__])
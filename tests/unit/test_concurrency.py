@@ -0,0 +1,119 @@
+"""
+Unit tests for the adaptive concurrency limiter.
+"""
+
+import pytest
+import asyncio
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
+
+from src.core.concurrency import AdaptiveConcurrencyLimiter, ConcurrencyLimitExceeded, is_overload_error
+
+class TestAdaptiveConcurrencyLimiter:
+    """Test cases for AdaptiveConcurrencyLimiter."""
+    
+    @pytest.mark.asyncio
+    async def test_limits_in_flight_requests(self):
+        """Test that no more than the current limit run at once."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=2)
+        peak = 0
+        running = 0
+        
+        async def request():
+            nonlocal peak, running
+            await limiter.acquire()
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+            limiter.release(latency=0.02)
+        
+        await asyncio.gather(*[request() for _ in range(6)])
+        
+        assert peak == 2
+        assert limiter.get_stats()["in_flight"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_overload_cuts_limit_multiplicatively(self):
+        """Test that a 429 or timeout halves the limit."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+        
+        await limiter.acquire()
+        limiter.release(overloaded=True)
+        
+        stats = limiter.get_stats()
+        assert stats["current_limit"] == 4
+        assert stats["decreases"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_overload_burst_cuts_limit_once_per_round_trip(self):
+        """Test that 429s from requests already in flight at the last cut do not cut it again."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=16)
+        
+        for _ in range(8):
+            await limiter.acquire()
+        for _ in range(8):
+            limiter.release(latency=0.5, overloaded=True)
+        
+        stats = limiter.get_stats()
+        assert stats["current_limit"] == 8
+        assert stats["decreases"] == 1
+        assert stats["overload_signals"] == 8
+        
+        # A request sent after the cut may cut the limit again
+        await limiter.acquire()
+        await asyncio.sleep(0.05)
+        limiter.release(latency=0.01, overloaded=True)
+        assert limiter.get_stats()["current_limit"] == 4
+    
+    @pytest.mark.asyncio
+    async def test_flat_latency_grows_limit(self):
+        """Test that the limit grows additively while latency stays flat and the limit is used."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=10)
+        
+        for _ in range(20):
+            await limiter.acquire()
+            await limiter.acquire()
+            limiter.release(latency=0.1)
+            limiter.release(latency=0.1)
+        
+        assert limiter.get_stats()["current_limit"] > 2
+    
+    @pytest.mark.asyncio
+    async def test_latency_inflation_cuts_limit(self):
+        """Test that latency well above baseline shrinks the limit."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8, latency_tolerance=2.0)
+        
+        for _ in range(5):
+            await limiter.acquire()
+            limiter.release(latency=0.1)
+        await limiter.acquire()
+        limiter.release(latency=1.0)
+        
+        stats = limiter.get_stats()
+        assert stats["latency_inflation_signals"] == 1
+        assert stats["current_limit"] == 4
+    
+    @pytest.mark.asyncio
+    async def test_waiter_rejected_after_timeout(self):
+        """Test that a request waiting too long for a slot is rejected and counted."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=1)
+        await limiter.acquire()
+        
+        with pytest.raises(ConcurrencyLimitExceeded):
+            await limiter.acquire(timeout=0.05)
+        
+        stats = limiter.get_stats()
+        assert stats["rejections"] == 1
+        assert stats["queued"] == 0
+    
+    def test_is_overload_error(self):
+        """Test classification of overload signals."""
+        assert is_overload_error(asyncio.TimeoutError()) is True
+        assert is_overload_error(ValueError("bad input")) is False
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,121 @@
+"""
+Unit tests for CoordinatorAgent workflow planning.
+"""
+
+import pytest
+import json
+import logging
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
+
+from src.agents.coordinator_agent import CoordinatorAgent
+from src.core.config import Config
+
+class TestWorkflowPlanning:
+    """Test cases for parsing and executing the LLM workflow plan."""
+    
+    @pytest.fixture
+    def config(self):
+        """Create test configuration that always plans with the LLM."""
+        return Config(openai_api_key="test_key", openai_model="gpt-4o", planner_rules_min_confidence=1.1)
+    
+    @pytest.fixture
+    def coordinator(self, config):
+        """Create coordinator agent instance."""
+        return CoordinatorAgent(config, logging.getLogger("test"))
+    
+    def mock_agents(self, coordinator):
+        """Replace each specialized agent's process with an AsyncMock."""
+        
+        mocks = {}
+        for agent_name, agent in coordinator.agents.items():
+            mocks[agent_name] = AsyncMock(return_value={"success": True, "content": f"{agent_name} output"})
+            agent.process = mocks[agent_name]
+        return mocks
+    
+    @pytest.mark.asyncio
+    async def test_only_planned_steps_run(self, coordinator):
+        """Test that a simple task runs only the steps in the plan, requested in JSON mode."""
+        plan = {"steps": [{"agent": "ContentAgent", "action": "Answer directly", "priority": 1}], "complexity": "low"}
+        mocks = self.mock_agents(coordinator)
+        
+        with patch.object(coordinator, "_make_llm_request", new_callable=AsyncMock, return_value=json.dumps(plan)) as mock_request:
+            result = await coordinator.process({"task": "What is 2 + 2?"})
+        
+        assert mock_request.call_args.kwargs["response_format"] == {"type": "json_object"}
+        assert result["success"] is True
+        assert [step["agent"] for step in result["workflow_plan"]["steps"]] == ["ContentAgent"]
+        assert list(result["result"]["workflow_results"]) == ["ContentAgent"]
+        mocks["ResearchAgent"].assert_not_called()
+        mocks["ValidationAgent"].assert_not_called()
+        
+        planning = coordinator.get_all_agent_metrics()["coordinator"]["planning"]
+        assert planning["parsed"] == 1
+        assert planning["steps_skipped"] == 2
+        assert planning["skip_rate_by_agent"]["ResearchAgent"] == 100.0
+    
+    def test_plan_is_validated(self, coordinator):
+        """Test that prose around the JSON, unknown agents and duplicate actions are handled."""
+        response = """Here is the plan:
+        {"steps": [
+            {"agent": "ValidationAgent", "action": "Check", "priority": 3},
+            {"agent": "WebSearchAgent", "action": "Search", "priority": 1},
+            {"agent": "ResearchAgent", "priority": 7},
+            {"agent": "ResearchAgent", "action": "Again", "priority": 1},
+            {"agent": "ResearchAgent", "action": "Again", "priority": 2}
+        ], "complexity": "extreme"}"""
+        
+        plan = coordinator._parse_workflow_plan(response)
+        
+        assert plan["steps"] == [
+            {"agent": "ResearchAgent", "action": "Again", "priority": 1},
+            {"agent": "ValidationAgent", "action": "Check", "priority": 3},
+            {"agent": "ResearchAgent", "action": "Process task", "priority": 3}
+        ]
+        assert plan["complexity"] == "medium"
+        assert coordinator.planning_metrics["invalid_steps"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_unparseable_plan_falls_back_to_default_steps(self, coordinator):
+        """Test that an answer without a valid plan runs the default workflow."""
+        mocks = self.mock_agents(coordinator)
+        
+        with patch.object(coordinator, "_make_llm_request", new_callable=AsyncMock, return_value="Research, then write."):
+            result = await coordinator.process({"task": "Explain solar panels"})
+        
+        assert result["workflow_plan"]["fallback_reason"] == "invalid_plan"
+        assert list(result["result"]["workflow_results"]) == ["ResearchAgent", "ContentAgent", "ValidationAgent"]
+        assert all(mock.called for mock in mocks.values())
+        assert coordinator.get_planning_metrics()["planning"]["invalid"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_json_mode_can_be_disabled(self, config):
+        """Test that models without JSON mode get no response_format."""
+        coordinator = CoordinatorAgent(config.model_copy(update={"planner_json_mode": False}), logging.getLogger("test"))
+        
+        with patch.object(coordinator, "_make_llm_request", new_callable=AsyncMock, return_value="{}") as mock_request:
+            await coordinator._create_workflow_plan("Explain solar panels", {})
+        
+        assert "response_format" not in mock_request.call_args.kwargs
+    
+    @pytest.mark.asyncio
+    async def test_json_mode_is_skipped_for_models_without_it(self, config):
+        """Test that the default gpt-4 model is not sent response_format, which it rejects."""
+        coordinator = CoordinatorAgent(config.model_copy(update={"openai_model": "gpt-4"}), logging.getLogger("test"))
+        
+        with patch.object(coordinator, "_make_llm_request", new_callable=AsyncMock, return_value="{}") as mock_request:
+            await coordinator._create_workflow_plan("Explain solar panels", {})
+        
+        assert "response_format" not in mock_request.call_args.kwargs
+    
+    def test_style_and_length_reach_content_agent(self, coordinator):
+        """Test that the caller's style and length are passed to ContentAgent, for planned and streamed answers."""
+        input_data = {"task": "Explain solar panels", "style": "casual", "length": "short"}
+        
+        agent_input = coordinator._prepare_agent_input("ContentAgent", "Generate response", input_data)
+        
+        assert (agent_input["style"], agent_input["length"]) == ("casual", "short")
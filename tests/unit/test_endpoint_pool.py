@@ -0,0 +1,160 @@
+"""
+Unit tests for the multi-endpoint LLM pool, against local stand-in servers.
+"""
+
+import pytest
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
+
+from src.agents.content_agent import ContentAgent
+from src.core.circuit_breaker import CircuitOpenError
+from src.core.config import Config
+from src.core.endpoint_pool import build_endpoint_pool
+from tests.stub_server import StubLLMServer
+from pydantic import ValidationError
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+def pool_config(servers, **overrides):
+    """Create a pool configuration with one endpoint per stand-in server."""
+    
+    endpoints = [
+        {"name": server.name, "base_url": server.base_url, "api_key": "test_key", **overrides.pop(server.name, {})}
+        for server in servers
+    ]
+    overrides.setdefault("rate_limit_requests", 1000)
+    return Config(llm_backend="pool", llm_endpoints=endpoints, enable_file_logging=False, **overrides)
+
+class TestEndpointPool:
+    """Test cases for balancing, ejection and per-member rate limits."""
+    
+    @pytest.mark.asyncio
+    async def test_latency_balancing_prefers_fast_member(self):
+        """Test that the slower endpoint gets less of the traffic."""
+        async with StubLLMServer(latency=0.005, name="fast") as fast, StubLLMServer(latency=0.05, name="slow") as slow:
+            pool = build_endpoint_pool(pool_config([fast, slow]))
+            
+            for _ in range(4):
+                await asyncio.gather(*(pool.complete("gpt-4", MESSAGES, timeout=5) for _ in range(5)))
+            
+            stats = {member["name"]: member for member in pool.get_stats()["members"]}
+            assert fast.stats["requests"] > slow.stats["requests"]
+            assert stats["fast"]["latency"] < stats["slow"]["latency"]
+            assert stats["fast"]["successes"] + stats["slow"]["successes"] == 20
+    
+    @pytest.mark.asyncio
+    async def test_least_outstanding_spreads_concurrent_requests(self):
+        """Test that concurrent requests are spread evenly over equal endpoints."""
+        async with StubLLMServer(latency=0.02, name="a") as a, StubLLMServer(latency=0.02, name="b") as b:
+            pool = build_endpoint_pool(pool_config([a, b], endpoint_balancing="least_outstanding"))
+            
+            results = await asyncio.gather(*(pool.complete("gpt-4", MESSAGES, timeout=5) for _ in range(10)))
+            
+            assert a.stats["peak_in_flight"] == 5
+            assert b.stats["peak_in_flight"] == 5
+            assert {result["endpoint"] for result in results} == {"a", "b"}
+            assert results[0]["total_tokens"] == 12
+    
+    @pytest.mark.asyncio
+    async def test_failing_member_is_ejected(self):
+        """Test that a member returning 5xx is taken out of rotation."""
+        async with StubLLMServer(name="healthy") as healthy, StubLLMServer(status=503, name="broken") as broken:
+            pool = build_endpoint_pool(pool_config([healthy, broken], circuit_breaker_failure_threshold=2))
+            
+            failures = 0
+            for _ in range(10):
+                try:
+                    await pool.complete("gpt-4", MESSAGES, timeout=5)
+                except Exception:
+                    failures += 1
+            
+            stats = pool.get_stats()
+            assert failures == 2
+            assert broken.stats["requests"] == 2
+            assert stats["healthy_members"] == 1
+            
+            healthy.status = 503
+            with pytest.raises(Exception):
+                await pool.complete("gpt-4", MESSAGES, timeout=5)
+            with pytest.raises(Exception):
+                await pool.complete("gpt-4", MESSAGES, timeout=5)
+            with pytest.raises(CircuitOpenError):
+                await pool.complete("gpt-4", MESSAGES, timeout=5)
+    
+    @pytest.mark.asyncio
+    async def test_throttled_member_is_skipped(self):
+        """Test that a member out of its own rate limit is passed over."""
+        async with StubLLMServer(name="small") as small, StubLLMServer(name="large") as large:
+            config = pool_config([small, large], small={"rate_limit_requests": 1})
+            pool = build_endpoint_pool(config)
+            
+            endpoints = [(await pool.complete("gpt-4", MESSAGES, timeout=5))["endpoint"] for _ in range(6)]
+            
+            assert endpoints.count("small") == 1
+            assert pool.get_stats()["all_throttled"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_agent_requests_go_through_pool(self):
+        """Test that an agent on the pool backend reaches the stand-in servers."""
+        async with StubLLMServer(name="gateway") as gateway:
+            agent = ContentAgent(pool_config([gateway]), logging.getLogger("test"))
+            
+            result = await agent.process({"content_request": "Explain solar panels"})
+            
+            assert result["success"] is True
+            assert result["content"] == "gateway answer"
+            assert agent.get_metrics()["backend"]["members"][0]["successes"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_pool_throughput_is_not_capped_by_one_account(self):
+        """Test that agents on a pool skip the account-wide limiter and use each member's own."""
+        async with StubLLMServer(name="a") as a, StubLLMServer(name="b") as b:
+            member_limit = {"rate_limit_requests": 2, "rate_limit_window": 60}
+            config = pool_config([a, b], a=member_limit, b=member_limit, rate_limit_requests=2, rate_limit_window=60)
+            agent = ContentAgent(config, logging.getLogger("test"))
+            
+            results = await asyncio.wait_for(asyncio.gather(*[
+                agent.process({"content_request": f"Explain topic {i}"}) for i in range(4)
+            ]), timeout=5)
+            
+            assert all(result["success"] for result in results)
+            assert agent.rate_limiter is None and agent.circuit_breaker is None
+            assert [member["successes"] for member in agent.get_metrics()["backend"]["members"]] == [2, 2]
+    
+    @pytest.mark.asyncio
+    async def test_slow_member_only_shrinks_its_own_concurrency_limit(self):
+        """Test that one member's latency inflation does not cut another member's in-flight limit."""
+        async with StubLLMServer(latency=0.05, name="steady") as steady, StubLLMServer(latency=0.05, name="degraded") as degraded:
+            pool = build_endpoint_pool(pool_config([steady, degraded], endpoint_balancing="least_outstanding"))
+            
+            # Concurrent pairs put one request on each member
+            for _ in range(6):
+                await asyncio.gather(*(pool.complete("gpt-4", MESSAGES, timeout=5) for _ in range(2)))
+            degraded.latency = 0.3
+            for _ in range(2):
+                await asyncio.gather(*(pool.complete("gpt-4", MESSAGES, timeout=5) for _ in range(2)))
+            
+            limits = {member["name"]: member["concurrency"] for member in pool.get_stats()["members"]}
+            assert limits["degraded"]["current_limit"] < 8
+            assert limits["degraded"]["latency_inflation_signals"] >= 1
+            assert limits["steady"]["current_limit"] == 8
+            assert limits["steady"]["decreases"] == 0
+            
+            agent = ContentAgent(pool_config([steady, degraded]), logging.getLogger("test"))
+            assert agent.concurrency_limiter is None
+            assert agent.get_metrics()["concurrency"] is None
+    
+    def test_pool_config_validation(self):
+        """Test that endpoints can come from JSON and a pool needs at least one."""
+        config = Config(llm_backend="pool", llm_endpoints='[{"base_url": "http://localhost:8000/v1", "api_key_env": "GATEWAY_KEY"}]')
+        assert config.llm_endpoints[0]["api_key_env"] == "GATEWAY_KEY"
+        
+        with pytest.raises(ValidationError):
+            Config(llm_backend="pool", llm_endpoints=[])
+        with pytest.raises(ValidationError):
+            Config(llm_backend="pool", llm_endpoints=[{"url": "http://localhost:8000/v1"}])
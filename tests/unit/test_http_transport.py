@@ -0,0 +1,85 @@
+"""
+Unit tests for the HTTP transport settings of the shared client pool.
+"""
+
+import pytest
+import asyncio
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
+
+from src.core.config import Config
+from src.core.llm_client import SharedClientPool, get_client_pool, http_timeout, transport_options, HTTP2_AVAILABLE
+from tests.stub_server import StubLLMServer
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+class TestHttpTransport:
+    """Test cases for phase timeouts, HTTP/2 and connection pre-warming."""
+    
+    def make_pool(self, server, **settings):
+        """Create a client pool for the stand-in server."""
+        config = Config(openai_api_key="test_key", openai_base_url=server.base_url, **settings)
+        return SharedClientPool("test_key", server.base_url, **transport_options(config))
+    
+    def test_phase_timeouts(self):
+        """Test that each phase has its own timeout and reads default to timeout_seconds."""
+        config = Config(openai_api_key="test_key", timeout_seconds=45, http_connect_timeout=2)
+        timeout = http_timeout(config)
+        
+        assert (timeout.connect, timeout.read, timeout.write, timeout.pool) == (2, 45, 10, 5)
+        assert http_timeout(config.model_copy(update={"http_read_timeout": 20})).read == 20
+        assert get_client_pool(config).get_client().timeout == timeout
+        assert get_client_pool(config) is not get_client_pool(config.model_copy(update={"http2": True}))
+    
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(not HTTP2_AVAILABLE, reason="h2 is not installed")
+    async def test_http2_multiplexes_one_connection(self):
+        """Test that concurrent requests share one HTTP/2 connection."""
+        async with StubLLMServer(latency=0.02) as server:
+            pool = self.make_pool(server, http2=True)
+            
+            responses = await asyncio.gather(*(
+                pool.get_client().chat.completions.create(model="stub", messages=MESSAGES) for _ in range(10)
+            ))
+            
+            assert all(response.choices[0].message.content == "stub answer" for response in responses)
+            assert server.stats["connections"] == 1
+            assert server.stats["peak_in_flight"] == 10
+            assert pool.get_stats()["http2"] is True
+            await pool.get_client().close()
+    
+    @pytest.mark.asyncio
+    async def test_prewarm_opens_connections_before_traffic(self):
+        """Test that prewarmed connections serve the first requests without new handshakes."""
+        async with StubLLMServer(latency=0.02) as server:
+            pool = self.make_pool(server)
+            
+            assert await pool.prewarm(3) == 3
+            assert server.stats["connections"] == 3
+            
+            await asyncio.gather(*(
+                pool.get_client().chat.completions.create(model="stub", messages=MESSAGES) for _ in range(3)
+            ))
+            assert server.stats["connections"] == 3
+            assert pool.get_stats()["prewarmed_connections"] == 3
+            await pool.get_client().close()
+    
+    @pytest.mark.asyncio
+    async def test_background_prewarm_repeats_until_stopped(self):
+        """Test that the keep-warm task starts with the loop's client and re-warms on its interval."""
+        async with StubLLMServer() as server:
+            pool = self.make_pool(server, http_prewarm_connections=2, http_prewarm_interval=0.02)
+            
+            pool.get_client()
+            await asyncio.sleep(0.1)
+            pool.stop_prewarming()
+            prewarms = pool.get_stats()["prewarms"]
+            await asyncio.sleep(0.05)
+            
+            assert prewarms >= 2
+            assert pool.get_stats()["prewarms"] == prewarms
+            assert pool.get_stats()["prewarm_failures"] == 0
+            await pool.get_client().close()
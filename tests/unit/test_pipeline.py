@@ -0,0 +1,101 @@
+"""
+Unit tests for streaming research sections into content drafting.
+"""
+
+import pytest
+import logging
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
+
+from src.agents.coordinator_agent import CoordinatorAgent
+from src.core.config import Config
+from src.core.pipeline import SectionSplitter
+
+class TestPipelinedWorkflow:
+    """Test cases for section splitting and the pipelined coordinator mode."""
+    
+    @pytest.fixture
+    def coordinator(self):
+        """Create a coordinator on the local backend."""
+        config = Config(llm_backend="local", local_backend_latency=0.02, local_backend_tokens_per_second=2000,
+                        rate_limit_requests=1000, pipeline_section_max_chars=200, enable_file_logging=False)
+        return CoordinatorAgent(config, logging.getLogger("test"))
+    
+    def test_sections_split_at_paragraphs_and_items(self):
+        """Test that sections end at blank lines and list items, whatever the delta boundaries."""
+        text = "Key findings:\n1. Solar is cheap.\n2. Storage is improving.\n\nContext follows here."
+        splitter = SectionSplitter(max_chars=500)
+        
+        sections = [section for char in text for section in splitter.feed(char)] + splitter.flush()
+        
+        assert sections == ["Key findings:", "1. Solar is cheap.", "2. Storage is improving.", "Context follows here."]
+    
+    def test_long_text_is_cut_after_a_sentence(self):
+        """Test that text without boundaries is cut at sentence ends, else at whitespace."""
+        splitter = SectionSplitter(max_chars=30)
+        
+        assert splitter.feed("First sentence. Second sentence runs on") == ["First sentence."]
+        assert splitter.feed(" and on without any stop") == ["Second sentence runs on and"]
+        assert splitter.flush() == ["on without any stop"]
+    
+    @pytest.mark.asyncio
+    async def test_pipelined_output_starts_before_research_ends(self, coordinator):
+        """Test that the first draft is ready before research finishes, unlike the sequential baseline."""
+        pipelined = await coordinator.process({"task": "Explain solar panels", "mode": "pipelined"})
+        sequential = await coordinator.process({"task": "Explain wind turbines", "mode": "sequential"})
+        
+        timing = pipelined["result"]["timing"]
+        results = pipelined["result"]["workflow_results"]
+        assert pipelined["success"] is True
+        assert timing["sections"] > 1
+        assert timing["drafts"] == timing["sections"]
+        assert timing["time_to_first_output"] < timing["research_time"]
+        assert results["ContentAgent"]["success"] is True
+        assert pipelined["result"]["final_output"] == results["ContentAgent"]["output"]
+        
+        baseline = sequential["result"]["timing"]
+        assert baseline["drafts"] == 1
+        assert baseline["time_to_first_output"] >= baseline["research_time"]
+        
+        by_mode = coordinator.get_all_agent_metrics()["coordinator"]["execution"]["by_mode"]
+        assert by_mode["pipelined"]["workflows"] == by_mode["sequential"]["workflows"] == 1
+        assert by_mode["planned"]["workflows"] == 0
+        assert coordinator.content_agent.get_content_type_usage()["usage_by_content_type"]["section"]["calls"] == timing["drafts"] + 1
+    
+    @pytest.mark.asyncio
+    async def test_pipelined_drafts_use_style_and_length(self, coordinator):
+        """Test that section drafts get the caller's style and a completion limit scaled by length."""
+        input_data = {"task": "Explain solar panels", "style": "casual", "length": "short", "mode": "pipelined"}
+        
+        with patch.object(coordinator.content_agent, "draft_section", wraps=coordinator.content_agent.draft_section) as mock_draft:
+            await coordinator.process(input_data)
+        
+        assert mock_draft.call_args_list
+        assert all(call.args[2] == "casual" for call in mock_draft.call_args_list)
+        assert all(call.kwargs["max_tokens"] == coordinator.content_agent.section_max_tokens_for("short") for call in mock_draft.call_args_list)
+        assert coordinator.content_agent.section_max_tokens_for("short") < coordinator.content_agent.section_max_tokens
+    
+    @pytest.mark.asyncio
+    async def test_sequential_draft_limit_is_capped_by_length(self, coordinator):
+        """Test that many research sections do not push the sequential draft past the length's completion limit."""
+        content_agent = coordinator.content_agent
+        input_data = {"task": "Explain solar panels in depth", "length": "short", "mode": "sequential"}
+        
+        with patch.object(content_agent, "draft_section", wraps=content_agent.draft_section) as mock_draft:
+            result = await coordinator.process(input_data)
+        
+        sections = result["result"]["timing"]["sections"]
+        assert sections * content_agent.section_max_tokens_for("short") > content_agent._get_max_tokens("short")
+        assert mock_draft.call_count == 1
+        assert mock_draft.call_args.kwargs["max_tokens"] == content_agent._get_max_tokens("short")
+    
+    @pytest.mark.asyncio
+    async def test_unknown_mode_is_rejected(self, coordinator):
+        """Test that an unknown workflow mode is invalid input."""
+        result = await coordinator.process({"task": "Explain solar panels", "mode": "parallel"})
+        
+        assert result["success"] is False
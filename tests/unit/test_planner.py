@@ -0,0 +1,111 @@
+"""
+Unit tests for rule-based planning and the workflow plan cache.
+"""
+
+import pytest
+import json
+import logging
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
+
+from src.agents.coordinator_agent import CoordinatorAgent
+from src.core.config import Config
+from src.core.planner import RulePlanner, PlanCache
+
+class TestFastPlanning:
+    """Test cases for the task classifier, the plan cache and the coordinator's planner sources."""
+    
+    @pytest.fixture
+    def coordinator(self):
+        """Create a coordinator whose specialized agents succeed immediately."""
+        coordinator = CoordinatorAgent(Config(openai_api_key="test_key"), logging.getLogger("test"))
+        for agent_name, agent in coordinator.agents.items():
+            agent.process = AsyncMock(return_value={"success": True, "content": f"{agent_name} output"})
+        return coordinator
+    
+    def test_tasks_are_classified_by_keywords(self):
+        """Test that questions and keyword-rich tasks are confident and unknown tasks are not."""
+        planner = RulePlanner()
+        
+        question = planner.classify("What is the capital of France?")
+        research = planner.classify("Research the latest market trends and verify the statistics")
+        unknown = planner.classify("Explain solar panels")
+        
+        assert question["confidence"] >= 0.8
+        assert [step["agent"] for step in question["plan"]["steps"]] == ["ContentAgent"]
+        assert research["confidence"] >= 0.8
+        assert [step["agent"] for step in research["plan"]["steps"]] == ["ResearchAgent", "ContentAgent", "ValidationAgent"]
+        assert unknown["confidence"] < 0.8
+        assert planner.classify("Explain wind turbines")["shape"] == unknown["shape"]
+    
+    def test_cache_evicts_least_recently_used_and_expired_plans(self):
+        """Test the cache's LRU limit, time to live and copies."""
+        cache = PlanCache(max_entries=2, ttl_seconds=3600)
+        plan = {"steps": [{"agent": "ContentAgent", "action": "Generate response", "priority": 1}]}
+        cache.put("a", plan)
+        cache.put("b", plan)
+        cache.get("a")["steps"].append(99)
+        cache.put("c", plan)
+        
+        assert cache.get("a") == plan
+        assert cache.get("b") is None
+        
+        cache.ttl_seconds = 0
+        assert cache.get("c") is None
+        stats = cache.get_stats()
+        assert stats["evictions"] == 1
+        assert stats["expired"] == 1
+        assert stats["size"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_llm_planner_runs_only_on_a_miss(self, coordinator):
+        """Test that confident tasks and repeated shapes skip the LLM planning call."""
+        plan = {"steps": [{"agent": "ContentAgent", "action": "Explain", "priority": 1}], "complexity": "low"}
+        
+        with patch.object(coordinator, "_make_llm_request", new_callable=AsyncMock, return_value=json.dumps(plan)) as mock_request:
+            first = await coordinator.process({"task": "Explain solar panels"})
+            second = await coordinator.process({"task": "Explain wind turbines"})
+            question = await coordinator.process({"task": "What is 2 + 2?"})
+        
+        assert mock_request.call_count == 1
+        assert [result["workflow_plan"]["planner"] for result in (first, second, question)] == ["llm", "cache", "rules"]
+        assert [step["agent"] for step in second["workflow_plan"]["steps"]] == ["ContentAgent"]
+        assert second["workflow_plan"]["steps"][0]["action"] == "Generate response"
+        assert list(question["result"]["workflow_results"]) == ["ContentAgent"]
+        
+        planning = coordinator.get_all_agent_metrics()["coordinator"]["planning"]
+        assert planning["by_source"] == {"rules": 1, "cache": 1, "llm": 1}
+        assert planning["planner_hit_rate"] == pytest.approx(66.67)
+        assert planning["parse_rate"] == 100.0
+        assert planning["estimated_time_saved"] == pytest.approx(2 * planning["average_llm_plan_time"], abs=0.002)
+        assert planning["plan_cache"]["hits"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_cached_plan_does_not_carry_another_tasks_actions(self, coordinator):
+        """Test that two unrelated tasks of the same shape share a plan's structure but not its action text."""
+        plan = {
+            "steps": [
+                {"id": "r1", "agent": "ResearchAgent", "action": "Find solar panel efficiency figures", "priority": 1},
+                {"id": "c1", "agent": "ContentAgent", "action": "Explain how solar panels work", "priority": 2, "depends_on": ["r1"]}
+            ],
+            "complexity": "medium"
+        }
+        
+        with patch.object(coordinator, "_make_llm_request", new_callable=AsyncMock, return_value=json.dumps(plan)):
+            await coordinator.process({"task": "Explain solar panels"})
+            second = await coordinator.process({"task": "Explain wind turbines"})
+        
+        assert second["workflow_plan"]["planner"] == "cache"
+        steps = second["workflow_plan"]["steps"]
+        assert [(step["agent"], step["priority"], step.get("depends_on")) for step in steps] == [
+            ("ResearchAgent", 1, None), ("ContentAgent", 2, ["r1"])
+        ]
+        assert not any("solar" in step["action"].lower() for step in steps)
+        
+        research_query = coordinator.agents["ResearchAgent"].process.call_args.args[0]["query"]
+        assert "solar" not in research_query.lower()
+        assert research_query.startswith("Explain wind turbines")
@@ -0,0 +1,108 @@
+"""
+Unit tests for CoordinatorAgent.process_many bulk runs.
+"""
+
+import pytest
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
+
+from src.agents.coordinator_agent import CoordinatorAgent
+from src.core.config import Config
+
+class TestProcessMany:
+    """Test cases for bounded concurrency, result order and failure isolation."""
+    
+    @pytest.fixture
+    def coordinator(self):
+        """Create a coordinator whose process() sleeps for the task's "delay" and tracks concurrency."""
+        coordinator = CoordinatorAgent(Config(openai_api_key="test_key"), logging.getLogger("test"))
+        coordinator.in_flight = coordinator.peak_in_flight = 0
+        
+        async def process(input_data):
+            coordinator.in_flight += 1
+            coordinator.peak_in_flight = max(coordinator.peak_in_flight, coordinator.in_flight)
+            try:
+                await asyncio.sleep(input_data.get("delay", 0.01))
+                if input_data.get("fail"):
+                    raise RuntimeError("workflow crashed")
+                return {"success": True, "result": input_data["task"], "agent": "CoordinatorAgent"}
+            finally:
+                coordinator.in_flight -= 1
+        
+        coordinator.process = process
+        return coordinator
+    
+    @pytest.mark.asyncio
+    async def test_results_as_completed_under_concurrency_limit(self, coordinator):
+        """Test that at most `concurrency` workflows run and results arrive as they complete."""
+        tasks = [{"task": f"task {i}", "delay": 0.05 if i % 2 == 0 else 0.01} for i in range(8)]
+        
+        results = [result async for result in coordinator.process_many(tasks, concurrency=4)]
+        
+        assert coordinator.peak_in_flight == 4
+        assert sorted(result["index"] for result in results) == list(range(8))
+        assert [result["index"] for result in results][:2] == [1, 3]
+        assert all(result["success"] for result in results)
+        
+        bulk = coordinator.get_bulk_metrics()["bulk"]
+        assert bulk["tasks"] == bulk["succeeded"] == 8
+        assert bulk["last_run"]["throughput"] > 0
+        assert bulk["latency"]["p50"] <= bulk["latency"]["p99"] <= bulk["latency"]["max"]
+    
+    @pytest.mark.asyncio
+    async def test_ordered_results(self, coordinator):
+        """Test that ordered runs yield results in input order, and plain strings are tasks."""
+        tasks = ["slow task", "fast task", "other task"]
+        coordinator_process = coordinator.process
+        coordinator.process = lambda input_data: coordinator_process({**input_data, "delay": 0.05 if input_data["task"] == "slow task" else 0.01})
+        
+        results = [result async for result in coordinator.process_many(tasks, concurrency=3, ordered=True)]
+        
+        assert [result["result"] for result in results] == tasks
+    
+    @pytest.mark.asyncio
+    async def test_ordered_buffer_is_bounded_behind_a_slow_task(self, coordinator):
+        """Test that an ordered run stops starting tasks while `concurrency` results wait on a slow one."""
+        tasks = ["slow task"] + [f"task {i}" for i in range(20)]
+        started = []
+        coordinator_process = coordinator.process
+        
+        async def process(input_data):
+            started.append(input_data["task"])
+            result = await coordinator_process({**input_data, "delay": 0.2 if input_data["task"] == "slow task" else 0.01})
+            if input_data["task"] == "slow task":
+                coordinator.started_behind_slow = len(started)
+            return result
+        
+        coordinator.process = process
+        
+        results = [result async for result in coordinator.process_many(tasks, concurrency=3, ordered=True)]
+        
+        assert [result["result"] for result in results] == tasks
+        # The slow task, plus `concurrency` buffered results and the two still running
+        assert coordinator.started_behind_slow <= 1 + 3 + 2
+    
+    @pytest.mark.asyncio
+    async def test_failures_and_timeouts_are_isolated(self, coordinator):
+        """Test that a crashing task and a slow task yield errors while the others succeed."""
+        tasks = [
+            {"task": "ok"},
+            {"task": "crash", "fail": True},
+            {"task": "stuck", "delay": 5},
+            {"task": "ok again"}
+        ]
+        
+        results = {result["index"]: result async for result in coordinator.process_many(tasks, per_task_timeout=0.1)}
+        
+        assert results[0]["success"] and results[3]["success"]
+        assert results[1] == {"error": "workflow crashed", "success": False, "agent": "CoordinatorAgent", "index": 1, "latency": results[1]["latency"]}
+        assert results[2]["timed_out"] is True
+        assert results[2]["latency"] < 1
+        
+        bulk = coordinator.get_bulk_metrics()["bulk"]
+        assert (bulk["succeeded"], bulk["failed"], bulk["timed_out"]) == (2, 2, 1)
@@ -0,0 +1,124 @@
+"""
+Unit tests for precompiled prompt templates and prefix-cache metrics.
+"""
+
+import pytest
+import logging
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
+
+from src.agents.content_agent import ContentAgent
+from src.agents.research_agent import ResearchAgent
+from src.core.config import Config
+from src.core.llm_backend import LocalBackend
+from src.core.prompts import PromptRegistry
+from src.core.tokens import RegexEncoding, TokenCounter
+
+class TestPromptTemplates:
+    """Test cases for the prompt registry and the agents' message layout."""
+    
+    @pytest.fixture
+    def config(self):
+        """Create test configuration."""
+        return Config(openai_api_key="test_key")
+    
+    @pytest.fixture
+    def logger(self):
+        """Create test logger."""
+        return logging.getLogger("test")
+    
+    def test_templates_compile_once(self):
+        """Test that compiling a key again returns the registered template."""
+        registry = PromptRegistry()
+        
+        first = registry.compile(("Agent", "summary"), """
+            Summarize carefully.
+            """, "Summarize: {request}")
+        second = registry.compile(("Agent", "summary"), "Different text", "{request}")
+        
+        assert first is second
+        assert first.prefix == (("system", "Summarize carefully."),)
+        
+        with pytest.raises(KeyError):
+            registry.render(("Agent", "unknown"), request="x")
+        assert registry.get_stats()["misses"] == 1
+    
+    def test_content_prefix_is_byte_identical(self, config, logger):
+        """Test that requests with the same settings share every message but the last."""
+        agent = ContentAgent(config, logger)
+        
+        first = agent._build_messages("summary", "solar power", "casual", "short")
+        second = agent._build_messages("summary", "wind power", "casual", "short")
+        
+        assert first[:-1] == second[:-1]
+        assert first[-1]["content"] == "Please summarize: solar power"
+        assert first[1]["content"].startswith("Style: Use conversational")
+        assert "    " not in first[0]["content"]
+    
+    def test_instructions_shared_across_settings(self, config, logger):
+        """Test that the instructions message does not depend on style or length."""
+        agent = ContentAgent(config, logger)
+        
+        casual = agent._build_messages("analysis", "markets", "casual", "short")
+        academic = agent._build_messages("analysis", "markets", "academic", "extended")
+        fallback = agent._build_messages("unknown", "markets", "unknown", "unknown")
+        
+        assert casual[0] == academic[0]
+        assert casual[1] != academic[1]
+        assert fallback == agent._build_messages("explanation", "markets", "professional", "medium")
+    
+    def test_research_messages_from_templates(self, config, logger):
+        """Test that research prompts render the query into the user message only."""
+        agent = ResearchAgent(config, logger)
+        messages = agent._build_messages("factual", "boiling point of water")
+        
+        assert [message["role"] for message in messages] == ["system", "user"]
+        assert "boiling point of water" in messages[-1]["content"]
+        assert ("ResearchAgent", "factual") in agent.prompt_registry
+
+class TestPromptCacheMetrics:
+    """Test cases for cached-prefix token accounting."""
+    
+    @pytest.mark.asyncio
+    async def test_local_backend_reports_cached_prefix(self):
+        """Test that a repeated leading message is reported as cached tokens."""
+        backend = LocalBackend(latency=0.0, tokens_per_second=100000, token_counter=TokenCounter(RegexEncoding()))
+        prefix = [{"role": "system", "content": "Shared instructions for every call."}]
+        
+        first = await backend.complete("gpt-4", prefix + [{"role": "user", "content": "one"}], timeout=5, max_tokens=5)
+        second = await backend.complete("gpt-4", prefix + [{"role": "user", "content": "two"}], timeout=5, max_tokens=5)
+        
+        assert first["cached_tokens"] == 0
+        assert 0 < second["cached_tokens"] < second["prompt_tokens"]
+        assert backend.get_stats()["cached_tokens"] == second["cached_tokens"]
+    
+    @pytest.mark.asyncio
+    async def test_agent_records_provider_cached_tokens(self):
+        """Test that usage.prompt_tokens_details.cached_tokens feeds the agent's prompt_cache metrics."""
+        agent = ContentAgent(Config(openai_api_key="test_key", enable_response_cache=False), logging.getLogger("test"))
+        
+        def response(cached_tokens):
+            mock_response = MagicMock()
+            mock_response.choices = [MagicMock()]
+            mock_response.choices[0].message.content = "Generated"
+            mock_response.usage.prompt_tokens = 1200
+            mock_response.usage.completion_tokens = 10
+            mock_response.usage.total_tokens = 1210
+            mock_response.usage.prompt_tokens_details.cached_tokens = cached_tokens
+            return mock_response
+        
+        with patch.object(agent.client.chat.completions, 'create', new_callable=AsyncMock) as mock_create:
+            mock_create.side_effect = [response(0), response(1024)]
+            await agent._generate_summary("solar power", "casual", "short")
+            await agent._generate_summary("wind power", "casual", "short")
+        
+        metrics = agent.get_metrics()["prompt_cache"]
+        assert metrics["prompt_tokens"] == 2400
+        assert metrics["cached_tokens"] == 1024
+        assert metrics["hits"] == 1
+        assert metrics["misses"] == 1
+        assert metrics["latency_gain"] is not None
@@ -0,0 +1,94 @@
+"""
+Unit tests for the shared rate limiter.
+"""
+
+import pytest
+import asyncio
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
+
+from src.core.rate_limiter import RateLimiter, get_rate_limiter
+from src.core.config import Config
+
+class TestRateLimiter:
+    """Test cases for RateLimiter."""
+    
+    @pytest.mark.asyncio
+    async def test_burst_within_limit_is_not_throttled(self):
+        """Test that a burst up to the request limit passes immediately."""
+        limiter = RateLimiter(requests=5, window=1)
+        
+        waits = [await limiter.acquire() for _ in range(5)]
+        
+        assert waits == [0.0] * 5
+        assert limiter.get_stats()["throttled"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_requests_over_limit_are_spaced(self):
+        """Test that requests beyond the burst wait for the refill interval."""
+        limiter = RateLimiter(requests=5, window=1)
+        
+        for _ in range(5):
+            await limiter.acquire()
+        wait = await limiter.acquire()
+        
+        assert wait == pytest.approx(0.2, abs=0.05)
+        stats = limiter.get_stats()
+        assert stats["throttled"] == 1
+        assert stats["max_wait_time"] > 0
+    
+    @pytest.mark.asyncio
+    async def test_waiters_are_served_in_arrival_order(self):
+        """Test that queued callers acquire in FIFO order."""
+        limiter = RateLimiter(requests=1, window=0.05)
+        order = []
+        
+        async def caller(index):
+            await limiter.acquire()
+            order.append(index)
+        
+        await asyncio.gather(*[caller(i) for i in range(5)])
+        
+        assert order == [0, 1, 2, 3, 4]
+    
+    @pytest.mark.asyncio
+    async def test_token_budget_throttles_large_requests(self):
+        """Test that the tokens-per-minute budget delays requests that exceed it."""
+        limiter = RateLimiter(requests=100, window=1, tokens_per_minute=6000)
+        
+        first_wait = await limiter.acquire(estimated_tokens=6000)
+        second_wait = await limiter.acquire(estimated_tokens=10)
+        
+        assert first_wait == 0.0
+        assert second_wait > 0
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_refunds_its_reservation(self):
+        """Test that a waiter cancelled while queued gives its slot and tokens back."""
+        limiter = RateLimiter(requests=5, window=1, tokens_per_minute=60000)
+        
+        for _ in range(5):
+            await limiter.acquire()
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(limiter.acquire(estimated_tokens=500), timeout=0.05)
+        
+        stats = limiter.get_stats()
+        assert stats["cancelled"] == 1
+        assert stats["acquired"] == 5
+        assert stats["reserved_tokens"] == 0
+        assert stats["waiting"] == 0
+        assert limiter.next_available() == pytest.approx(0.15, abs=0.05)
+    
+    def test_shared_limiter_per_account(self):
+        """Test that agents with the same account settings share one limiter."""
+        config = Config(openai_api_key="test_key")
+        other_config = Config(openai_api_key="other_key")
+        
+        assert get_rate_limiter(config) is get_rate_limiter(Config(openai_api_key="test_key"))
+        assert get_rate_limiter(config) is not get_rate_limiter(other_config)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,120 @@
+"""
+Unit tests for the persistent LLM response cache.
+"""
+
+import pytest
+import asyncio
+import logging
+import time
+import sys
+from pathlib import Path
+from unittest.mock import Mock, AsyncMock, patch
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
+
+from src.agents.base_agent import BaseAgent
+from src.core.config import Config
+from src.core.response_cache import ResponseCache
+
+class TestableAgent(BaseAgent):
+    """Testable implementation of BaseAgent for testing."""
+    
+    async def process(self, input_data):
+        return {"success": True, "result": "test_result"}
+
+class TestResponseCache:
+    """Test cases for ResponseCache."""
+    
+    @pytest.fixture
+    def cache_path(self, tmp_path):
+        """Path of a fresh cache database."""
+        return str(tmp_path / "responses.db")
+    
+    @pytest.mark.asyncio
+    async def test_hit_and_miss(self, cache_path):
+        """Test that stored responses are returned and unknown keys miss."""
+        cache = ResponseCache(cache_path, max_bytes=1024 * 1024, ttl_seconds=60)
+        
+        assert await cache.get("key") is None
+        await cache.set("key", "cached response")
+        assert await cache.get("key") == "cached response"
+        
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["entries"] == 1
+        assert stats["bytes"] == len("cached response")
+        assert stats["hit_bytes"] == len("cached response")
+    
+    @pytest.mark.asyncio
+    async def test_entries_expire_after_ttl(self, cache_path):
+        """Test that entries older than the TTL are not returned."""
+        cache = ResponseCache(cache_path, max_bytes=1024 * 1024, ttl_seconds=0.05)
+        
+        await cache.set("key", "cached response")
+        await asyncio.sleep(0.1)
+        
+        assert await cache.get("key") is None
+    
+    @pytest.mark.asyncio
+    async def test_lru_eviction_by_size(self, cache_path):
+        """Test that least recently used entries are evicted beyond max_bytes."""
+        cache = ResponseCache(cache_path, max_bytes=250, ttl_seconds=60)
+        
+        await cache.set("a", "x" * 100)
+        await cache.set("b", "y" * 100)
+        time.sleep(0.01)
+        await cache.get("a")  # "b" is now least recently used
+        await cache.set("c", "z" * 100)
+        
+        assert await cache.get("a") == "x" * 100
+        assert await cache.get("b") is None
+        assert await cache.get("c") == "z" * 100
+        stats = cache.get_stats()
+        assert stats["evictions"] == 1
+        assert stats["bytes"] == 200
+    
+    @pytest.mark.asyncio
+    async def test_cache_survives_restart_and_is_shared(self, cache_path):
+        """Test that a second cache instance on the same file sees stored responses."""
+        writer = ResponseCache(cache_path, max_bytes=1024 * 1024, ttl_seconds=60)
+        await writer.set("key", "cached response")
+        
+        reader = ResponseCache(cache_path, max_bytes=1024 * 1024, ttl_seconds=60)
+        assert await reader.get("key") == "cached response"
+    
+    @pytest.mark.asyncio
+    async def test_agent_reuses_cached_responses(self, cache_path):
+        """Test that identical deterministic requests are answered from the cache."""
+        config = Config(openai_api_key="test_key", enable_response_cache=True, response_cache_path=cache_path)
+        agent = TestableAgent("TestAgent", config, logging.getLogger("test"))
+        
+        mock_response = Mock()
+        mock_response.choices = [Mock()]
+        mock_response.choices[0].message.content = "test response"
+        messages = [{"role": "user", "content": "test"}]
+        
+        with patch.object(agent.client.chat.completions, 'create', new_callable=AsyncMock) as mock_create:
+            mock_create.return_value = mock_response
+            
+            first = await agent._make_llm_request(messages, max_tokens=10, temperature=0)
+            second = await agent._make_llm_request(messages, max_tokens=10, temperature=0)
+            await agent._make_llm_request(messages, max_tokens=10, temperature=0.7)
+            await agent._make_llm_request(messages, max_tokens=10)
+            await agent._make_llm_request(messages, use_cache=False, max_tokens=10, temperature=0)
+        
+        assert first == second == "test response"
+        assert mock_create.call_count == 4
+        assert agent.get_metrics()["cache_hits"] == 1
+        assert agent.get_metrics()["response_cache"]["stores"] == 1
+    
+    def test_cache_disabled_by_default(self):
+        """Test that agents do not cache unless enabled."""
+        agent = TestableAgent("TestAgent", Config(openai_api_key="test_key"), logging.getLogger("test"))
+        
+        assert agent.response_cache is None
+        assert agent.get_metrics()["response_cache"] is None
+
+if __name__ == "__main__":
+    pytest.main([__file__])
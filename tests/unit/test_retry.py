@@ -0,0 +1,133 @@
+"""
+Unit tests for the retry engine and retry budget.
+"""
+
+import pytest
+import asyncio
+import sys
+from pathlib import Path
+from unittest.mock import Mock
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
+
+from src.core.retry import RetryEngine, RetryBudget, is_transient_error, retry_after_seconds
+
+def status_error(status_code, headers=None):
+    """Build an error shaped like an openai.APIStatusError."""
+    error = Exception(f"HTTP {status_code}")
+    error.status_code = status_code
+    error.response = Mock(headers=headers or {})
+    return error
+
+class TestRetryEngine:
+    """Test cases for RetryEngine."""
+    
+    @pytest.fixture
+    def engine(self):
+        """Create an engine with near-zero backoff."""
+        return RetryEngine(
+            max_retries=3,
+            base_delay=0.001,
+            max_delay=0.01,
+            max_retry_after=1.0,
+            budget=RetryBudget(ratio=0.1, min_retries=10)
+        )
+    
+    @staticmethod
+    def failing(errors, result="ok"):
+        """Operation that raises the given errors in turn, then succeeds."""
+        calls = {"count": 0}
+        
+        async def operation():
+            calls["count"] += 1
+            if errors:
+                raise errors.pop(0)
+            return result
+        
+        return operation, calls
+    
+    @pytest.mark.asyncio
+    async def test_transient_errors_are_retried(self, engine):
+        """Test that 429/5xx/timeouts are retried until success."""
+        operation, calls = self.failing([status_error(429), status_error(503), asyncio.TimeoutError()])
+        
+        assert await engine.run(operation) == "ok"
+        assert calls["count"] == 4
+        assert engine.get_stats()["retries"] == 3
+    
+    @pytest.mark.asyncio
+    async def test_non_transient_errors_are_not_retried(self, engine):
+        """Test that validation-style errors fail on the first attempt."""
+        operation, calls = self.failing([status_error(400)])
+        
+        with pytest.raises(Exception):
+            await engine.run(operation)
+        
+        assert calls["count"] == 1
+        assert engine.get_stats()["gave_up_non_transient"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_retries(self, engine):
+        """Test that retries stop at max_retries."""
+        operation, calls = self.failing([status_error(500) for _ in range(10)])
+        
+        with pytest.raises(Exception):
+            await engine.run(operation)
+        
+        assert calls["count"] == 4
+        assert engine.get_stats()["gave_up_attempts"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_retry_after_is_honoured(self, engine):
+        """Test that the server-requested delay is waited out."""
+        operation, _ = self.failing([status_error(429, {"retry-after-ms": "150"})])
+        delays = []
+        
+        start = asyncio.get_running_loop().time()
+        await engine.run(operation, on_retry=lambda error, attempt, delay: delays.append(delay))
+        elapsed = asyncio.get_running_loop().time() - start
+        
+        assert delays == [0.15]
+        assert elapsed >= 0.14
+    
+    @pytest.mark.asyncio
+    async def test_long_retry_after_fails_fast(self, engine):
+        """Test that a Retry-After beyond the request timeout is not waited for."""
+        operation, calls = self.failing([status_error(429, {"retry-after": "30"})])
+        
+        with pytest.raises(Exception):
+            await engine.run(operation)
+        
+        assert calls["count"] == 1
+        assert engine.get_stats()["gave_up_retry_after"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_budget_limits_retries(self):
+        """Test that an exhausted retry budget stops retries."""
+        engine = RetryEngine(3, 0.001, 0.01, 1.0, RetryBudget(ratio=0.1, min_retries=1))
+        
+        first, first_calls = self.failing([status_error(503), status_error(503)])
+        with pytest.raises(Exception):
+            await engine.run(first)
+        
+        assert first_calls["count"] == 2  # One retry, then the budget ran out
+        assert engine.get_stats()["budget"]["exhausted"] == 1
+    
+    def test_full_jitter_backoff_bounds(self, engine):
+        """Test that backoff stays within [0, min(max_delay, base * 2^attempt)]."""
+        for attempt in range(6):
+            delay = engine.backoff(attempt)
+            assert 0 <= delay <= min(engine.max_delay, engine.base_delay * 2 ** attempt)
+    
+    def test_error_classification(self):
+        """Test transient error classification and Retry-After parsing."""
+        assert is_transient_error(status_error(429)) is True
+        assert is_transient_error(status_error(502)) is True
+        assert is_transient_error(status_error(401)) is False
+        assert is_transient_error(ValueError("bad")) is False
+        assert retry_after_seconds(status_error(429, {"retry-after": "2"})) == 2.0
+        assert retry_after_seconds(status_error(429)) is None
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,130 @@
+"""
+Unit tests for the semantic near-duplicate cache.
+"""
+
+import pytest
+import logging
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
+
+from src.agents.research_agent import ResearchAgent
+from src.core.config import Config
+from src.core.semantic_cache import SemanticCache
+
+class TestSemanticCache:
+    """Test cases for SemanticCache."""
+    
+    @pytest.fixture
+    def cache(self):
+        """Create a cache with a few research answers."""
+        cache = SemanticCache(threshold=0.9)
+        cache.add("What are the benefits of renewable energy?", "renewables answer", namespace="general")
+        cache.add("History of the Roman Empire", "rome answer", namespace="general")
+        cache.add("How does machine learning work?", "ml answer", namespace="general")
+        return cache
+    
+    def test_rephrased_question_hits(self, cache):
+        """Test that a near-duplicate question returns the cached answer."""
+        match = cache.lookup("The history of the Roman Empire", namespace="general")
+        
+        assert match is not None
+        answer, similarity, cached_prompt = match
+        assert answer == "rome answer"
+        assert similarity >= 0.9
+        assert cached_prompt == "History of the Roman Empire"
+    
+    def test_different_question_misses(self, cache):
+        """Test that a related but different question is not served from the cache."""
+        assert cache.lookup("History of the Ottoman Empire", namespace="general") is None
+        assert cache.lookup("What are the drawbacks of renewable energy?", namespace="general") is None
+    
+    def test_namespaces_are_isolated(self, cache):
+        """Test that entries only match within their namespace."""
+        assert cache.lookup("History of the Roman Empire", namespace="factual") is None
+        assert cache.lookup("History of the Roman Empire", namespace="general") is not None
+    
+    def test_least_recently_used_entry_is_replaced(self):
+        """Test that the index stays within max_entries."""
+        cache = SemanticCache(max_entries=2)
+        cache.add("first question about volcanoes", "a")
+        cache.add("second question about glaciers", "b")
+        cache.lookup("first question about volcanoes")
+        cache.add("third question about deserts", "c")
+        
+        assert cache.get_stats()["entries"] == 2
+        assert cache.get_stats()["evictions"] == 1
+        assert cache.lookup("second question about glaciers") is None
+        assert cache.lookup("first question about volcanoes") is not None
+    
+    def test_index_grows_contiguously(self):
+        """Test that the index keeps every vector in one float32 matrix."""
+        cache = SemanticCache(max_entries=200)
+        for i in range(100):
+            cache.add(f"question number {i} about topic {i * 7}", i)
+        
+        assert cache._matrix.dtype.name == "float32"
+        assert cache._matrix.flags["C_CONTIGUOUS"]
+        assert cache._matrix.shape[0] >= 100
+        assert cache.lookup("question number 42 about topic 294")[0] == 42
+    
+    def test_stats_report_memory_latency_and_false_hits(self, cache):
+        """Test that stats include index memory, lookup latency and the latest evaluation."""
+        cache.lookup("How does machine learning work")
+        result = cache.evaluate([
+            ("History of the Roman Empire", "The history of the Roman Empire", True),
+            ("History of the Roman Empire", "History of the Ottoman Empire", False)
+        ])
+        
+        assert result["false_hit_rate"] == 0
+        assert result["recall"] == 1.0
+        stats = cache.get_stats()
+        assert stats["index_bytes"] > 0
+        assert stats["average_lookup_ms"] > 0
+        assert stats["last_evaluation"] == result
+
+class TestResearchAgentSemanticCache:
+    """Test cases for the ResearchAgent semantic cache tier."""
+    
+    @pytest.fixture
+    def agent(self):
+        """Create a research agent with the semantic cache enabled."""
+        return ResearchAgent(Config(openai_api_key="test_key", enable_semantic_cache=True), logging.getLogger("test"))
+    
+    @pytest.mark.asyncio
+    async def test_rephrased_query_reuses_result(self, agent):
+        """Test that a rephrased research question is answered from the semantic cache."""
+        with patch.object(agent, '_general_research', new_callable=AsyncMock) as mock_research:
+            mock_research.return_value = {"success": True, "findings": "Roman history", "agent": "ResearchAgent"}
+            
+            first = await agent.process({"query": "History of the Roman Empire"})
+            second = await agent.process({"query": "The history of the Roman Empire"})
+            
+            assert mock_research.call_count == 1
+        
+        assert second["findings"] == first["findings"]
+        assert second["semantic_cache"]["cached_query"] == "History of the Roman Empire"
+        assert agent.get_cache_stats()["semantic_cache"]["hits"] == 1
+    
+    def test_semantic_tier_is_opt_in(self):
+        """Test that the semantic tier is off by default."""
+        agent = ResearchAgent(Config(openai_api_key="test_key"), logging.getLogger("test"))
+        
+        assert agent.semantic_cache is None
+    
+    @pytest.mark.asyncio
+    async def test_failed_results_are_not_cached_semantically(self, agent):
+        """Test that failures are not reused for rephrased questions."""
+        with patch.object(agent, '_general_research', new_callable=AsyncMock) as mock_research:
+            mock_research.return_value = {"success": False, "error": "provider down"}
+            
+            await agent.process({"query": "History of the Roman Empire"})
+            await agent.process({"query": "The history of the Roman Empire"})
+            
+            assert mock_research.call_count == 2
+
+if __name__ == "__main__":
+    pytest.main([__file__])
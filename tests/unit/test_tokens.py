@@ -0,0 +1,118 @@
+"""
+Unit tests for token counting and prompt budgeting.
+"""
+
+import pytest
+import logging
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
+
+from src.agents.validation_agent import ValidationAgent
+from src.core.config import Config
+from src.core.tokens import RegexEncoding, TokenCounter, fit_sections, render_context, TRUNCATION_MARKER
+
+class TestTokenCounter:
+    """Test cases for TokenCounter and fit_sections."""
+    
+    @pytest.fixture
+    def counter(self):
+        """Create a counter on the local encoding."""
+        return TokenCounter(RegexEncoding(), cache_size=2)
+    
+    def test_encode_round_trips(self, counter):
+        """Test that the local encoding decodes back to the original text."""
+        text = "Renewable energy's benefits include 1234 jobs, lower emissions!\n\nAnd more."
+        assert counter.encoding.decode(counter.encode(text)) == text
+        assert 0 < counter.count(text) < len(text)
+    
+    def test_encodings_are_cached(self, counter):
+        """Test that repeated texts are served from the LRU cache."""
+        counter.count("system prompt")
+        counter.count("system prompt")
+        counter.count("first")
+        counter.count("second")
+        
+        stats = counter.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 3
+        assert stats["cache_entries"] == 2
+    
+    def test_truncate_respects_budget(self, counter):
+        """Test that truncation cuts on a token boundary within the budget."""
+        text = "word " * 200
+        truncated = counter.truncate(text, 50)
+        
+        assert text.startswith(truncated)
+        assert counter.count(truncated) <= 50
+    
+    def test_fit_sections_keeps_small_sections_whole(self, counter):
+        """Test that only the large section is cut and its unused share is redistributed."""
+        sections = {"task": "Summarize the findings", "context": "detail " * 500}
+        fitted, report = fit_sections(counter, sections, 100)
+        
+        assert fitted["task"] == sections["task"]
+        assert fitted["context"].endswith(TRUNCATION_MARKER)
+        assert report["truncated_sections"] == ["context"]
+        assert report["fitted_tokens"] <= 101
+        assert report["tokens_saved"] == report["original_tokens"] - report["fitted_tokens"]
+    
+    def test_render_context_is_compact(self, counter):
+        """Test that context is rendered as compact JSON without empty values."""
+        context = {"audience": "engineers", "notes": "", "tags": ["a", "b"]}
+        rendered = render_context(context)
+        
+        assert rendered == '{"audience":"engineers","tags":["a","b"]}'
+        assert counter.count(rendered) < counter.count(str(context))
+
+class TestPromptBudgeting:
+    """Test cases for agents fitting prompts to the token budget."""
+    
+    @pytest.fixture
+    def config(self):
+        """Create a configuration with a small prompt budget."""
+        return Config(openai_api_key="test_key", prompt_token_budget=300)
+    
+    @pytest.fixture
+    def agent(self, config):
+        """Create a validation agent."""
+        return ValidationAgent(config, logging.getLogger("test"))
+    
+    @pytest.mark.asyncio
+    async def test_llm_check_content_fits_budget(self, agent, config):
+        """Test that long content is cut by tokens and the saving is reported."""
+        content = "This sentence is part of a long document. " * 400
+        
+        with patch.object(agent, "_make_llm_request", new_callable=AsyncMock, return_value="fine") as mock_request:
+            await agent._llm_quality_check(content)
+        
+        messages = mock_request.call_args[0][0]
+        assert agent.token_counter.count_messages(messages) <= config.prompt_token_budget + 20
+        assert messages[1]["content"].endswith(TRUNCATION_MARKER)
+        
+        metrics = agent.get_metrics()["prompt_budget"]
+        assert metrics["prompts_truncated"] == 1
+        assert metrics["tokens_saved"] > 0
+        assert metrics["last_call"]["truncated_sections"] == ["content"]
+    
+    @pytest.mark.asyncio
+    async def test_short_content_is_sent_whole(self, agent):
+        """Test that content within the budget is not truncated."""
+        content = "A short paragraph to validate."
+        
+        with patch.object(agent, "_make_llm_request", new_callable=AsyncMock, return_value="fine") as mock_request:
+            await agent._llm_technical_check(content)
+        
+        messages = mock_request.call_args[0][0]
+        assert messages[1]["content"].endswith(content)
+        assert agent.metrics["prompt_tokens_saved"] == 0
+    
+    def test_validate_input_limits_tokens(self, config):
+        """Test that input text over the token limit is rejected."""
+        agent = ValidationAgent(config.model_copy(update={"max_input_tokens": 20}), logging.getLogger("test"))
+        
+        assert agent.validate_input({"text": "short text", "content": "x"}) is True
+        assert agent.validate_input({"text": "many words here " * 20, "content": "x"}) is False
@@ -0,0 +1,85 @@
+"""
+Unit tests for token usage and cost accounting.
+"""
+
+import pytest
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
+
+from src.agents.coordinator_agent import CoordinatorAgent
+from src.core.config import Config
+from src.core.usage import UsageMeter, DEFAULT_MODEL_PRICES, estimate_cost, usage_scope, record_usage
+from pydantic import ValidationError
+
+class TestUsageAccounting:
+    """Test cases for cost estimates, usage scopes and the per-agent summary."""
+    
+    @pytest.fixture
+    def config(self):
+        """Create a local-backend configuration."""
+        return Config(llm_backend="local", local_backend_latency=0.001, local_backend_tokens_per_second=10000,
+                      rate_limit_requests=1000, enable_file_logging=False)
+    
+    def test_estimate_cost(self):
+        """Test that cached tokens are billed at the cached price and dated models use their family's price."""
+        cost = estimate_cost(DEFAULT_MODEL_PRICES, "gpt-4o-2024-08-06", 1_000_000, 400_000, 100_000)
+        
+        assert cost == pytest.approx(0.6 * 2.5 + 0.4 * 1.25 + 0.1 * 10)
+        assert estimate_cost(DEFAULT_MODEL_PRICES, "gpt-4o-mini", 1_000_000, 0, 0) == pytest.approx(0.15)
+        assert estimate_cost(DEFAULT_MODEL_PRICES, "unknown-model", 10, 0, 10) is None
+    
+    @pytest.mark.asyncio
+    async def test_scopes_are_isolated_between_tasks(self):
+        """Test that nested scopes both see a call and concurrent tasks keep their own scopes."""
+        
+        async def workflow(calls: int) -> UsageMeter:
+            with usage_scope() as meter:
+                for _ in range(calls):
+                    await asyncio.sleep(0)
+                    record_usage("gpt-4", 10, 0, 5, 0.1, 0.001)
+            return meter
+        
+        with usage_scope() as outer:
+            first, second = await asyncio.gather(workflow(1), workflow(3))
+        
+        assert first.to_dict()["calls"] == 1
+        assert second.to_dict()["calls"] == 3
+        assert outer.to_dict()["total_tokens"] == 60
+        assert outer.to_dict()["tokens_per_second"] == 50.0
+    
+    @pytest.mark.asyncio
+    async def test_workflow_usage_by_agent_and_content_type(self, config):
+        """Test that a workflow's calls are metered per workflow, per agent and per content type."""
+        coordinator = CoordinatorAgent(config, logging.getLogger("test"))
+        
+        result = await coordinator.process({"task": "Explain solar panels"})
+        metrics = coordinator.get_all_agent_metrics()
+        usage = metrics["coordinator"]["usage_summary"]
+        
+        assert result["success"] is True
+        assert result["usage"]["calls"] == usage["total"]["calls"] > 1
+        assert result["usage"]["cost"] == pytest.approx(usage["total"]["cost"])
+        assert usage["total"]["unpriced_calls"] == 0
+        assert coordinator.get_workflow_history()[0]["usage"] == result["usage"]
+        
+        by_agent = usage["by_agent"]
+        costs = [agent_usage["cost"] for agent_usage in by_agent.values()]
+        assert costs == sorted(costs, reverse=True)
+        assert sum(agent_usage["cost_share"] for agent_usage in by_agent.values()) == pytest.approx(100, abs=0.1)
+        assert by_agent["ContentAgent"]["calls"] == metrics["contentagent"]["usage"]["calls"]
+        assert metrics["contentagent"]["usage_by_content_type"]["explanation"]["calls"] == by_agent["ContentAgent"]["calls"]
+        assert usage["workflows"]["count"] == 1
+        assert usage["workflows"]["average_cost"] == pytest.approx(result["usage"]["cost"], abs=1e-6)
+    
+    def test_model_prices_config(self):
+        """Test that prices can come from JSON and must name input and output prices."""
+        config = Config(openai_api_key="test_key", model_prices='{"my-model": {"input": 1, "output": 2}}')
+        assert config.model_prices["my-model"]["output"] == 2
+        
+        with pytest.raises(ValidationError):
+            Config(openai_api_key="test_key", model_prices={"my-model": {"input": 1}})
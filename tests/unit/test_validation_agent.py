@@ -233,5 +233,108 @@ class TestValidationAgent:
             assert isinstance(pattern_list, list)
             assert len(pattern_list) > 0
 
+class TestValidationCascade:
+    """Test cases for the small-model cascade of ValidationAgent LLM checks."""
+    
+    @pytest.fixture
+    def agent(self):
+        """Create validation agent instance with the cascade enabled."""
+        config = Config(openai_api_key="test_key", openai_model="gpt-4", enable_validation_cascade=True,
+                        validation_cascade_model="small-model")
+        return ValidationAgent(config, logging.getLogger("test"))
+    
+    @staticmethod
+    def _responder(small_answer, large_answer="Large model review"):
+        """Fake _make_llm_request answering by model."""
+        async def respond(messages, **kwargs):
+            return small_answer if kwargs.get("model") == "small-model" else large_answer
+        return respond
+    
+    @pytest.mark.asyncio
+    async def test_confident_clean_answer_is_not_escalated(self, agent):
+        """Test that a confident small-model verdict without issues is used as is."""
+        answer = 'Reads well.\n{"issues_found": false, "confident": true}'
+        with patch.object(agent, '_make_llm_request', side_effect=self._responder(answer)) as mock_request:
+            result = await agent._llm_technical_check("Python 3.12 adds better error messages.")
+        
+        assert mock_request.call_count == 1
+        assert mock_request.call_args.kwargs["model"] == "small-model"
+        assert result == {"issues": [], "llm_response": "Reads well."}
+        assert agent.cascade_metrics["small_model_answers"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_uncertain_or_flagged_answers_escalate(self, agent):
+        """Test that uncertain, unparseable and flagged verdicts are re-checked by the large model."""
+        with patch.object(agent, '_make_llm_request', side_effect=self._responder('Probably fine.\n{"issues_found": false, "confident": false}')):
+            result = await agent._llm_quality_check("Some content")
+        assert result["llm_response"] == "Large model review"
+        
+        with patch.object(agent, '_make_llm_request', side_effect=self._responder("Probably fine, no verdict")):
+            await agent._llm_quality_check("Some content")
+        
+        with patch.object(agent, '_make_llm_request', side_effect=self._responder('{"safe": false}\n{"issues_found": true, "confident": true}')):
+            await agent._llm_safety_check("Some content")
+        
+        with patch.object(agent, '_make_llm_request', side_effect=[Exception("model not found"), "Large model review"]):
+            await agent._llm_quality_check("Some content")
+        
+        metrics = agent.get_validation_metrics()["cascade"]
+        assert metrics["checks"] == 4
+        assert metrics["escalations"] == 4
+        assert metrics["escalated_uncertain"] == 2
+        assert metrics["escalated_flagged"] == 1
+        assert metrics["escalated_error"] == 1
+        assert metrics["escalation_rate"] == 100.0
+        assert metrics["latency_change"] is not None
+    
+    @pytest.mark.asyncio
+    async def test_review_wording_does_not_escalate(self, agent):
+        """Test that words like "improve" in a confident, clean verdict do not escalate."""
+        answer = 'Could improve one heading; no error found.\n{"issues_found": false, "confident": true}'
+        with patch.object(agent, '_make_llm_request', side_effect=self._responder(answer)) as mock_request:
+            await agent._llm_quality_check("Some content")
+        
+        assert mock_request.call_count == 1
+        assert agent.cascade_metrics["escalations"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_total_time_is_recorded_when_large_model_fails(self, agent):
+        """Test that a failing escalated check still counts towards the cascade latency."""
+        with patch.object(agent, '_make_llm_request', side_effect=[Exception("model not found"), Exception("timeout")]):
+            result = await agent._llm_quality_check("Some content")
+        
+        assert result == {"issues": []}
+        assert agent.cascade_metrics["escalated_error"] == 1
+        assert agent.cascade_metrics["total_time"] > 0
+        assert agent.cascade_metrics["large_model_time"] > 0
+    
+    @pytest.mark.asyncio
+    async def test_missing_small_model_turns_cascade_off(self, agent):
+        """Test that a model-not-found error stops later checks from trying the small model."""
+        not_found = Exception("The model `small-model` does not exist")
+        not_found.status_code = 404
+        
+        with patch.object(agent, '_make_llm_request', side_effect=[not_found, "Large model review", "Large model review"]) as mock_request:
+            await agent._llm_quality_check("Some content")
+            await agent._llm_quality_check("Other content")
+        
+        assert mock_request.call_count == 3
+        assert "model" not in mock_request.call_args.kwargs
+        metrics = agent.get_validation_metrics()["cascade"]
+        assert metrics["enabled"] is False
+        assert metrics["checks"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_cascade_is_opt_in(self):
+        """Test that by default checks go straight to the configured model."""
+        config = Config(openai_api_key="test_key")
+        agent = ValidationAgent(config, logging.getLogger("test"))
+        
+        with patch.object(agent, '_make_llm_request', new_callable=AsyncMock, return_value="Fine") as mock_request:
+            await agent._llm_quality_check("Some content")
+        
+        assert "model" not in mock_request.call_args.kwargs
+        assert agent.get_validation_metrics()["cascade"]["checks"] == 0
+
 if __name__ == "__main__":
     pytest.main([__file__])
\ No newline at end of file
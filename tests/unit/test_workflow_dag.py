@@ -0,0 +1,103 @@
+"""
+Unit tests for the dependency-graph workflow executor.
+"""
+
+import pytest
+import asyncio
+import json
+import logging
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
+
+from src.agents.coordinator_agent import CoordinatorAgent
+from src.core.config import Config
+from src.core.workflow_dag import WorkflowDAG
+
+STEP_TIME = 0.1
+
+class TestWorkflowDAG:
+    """Test cases for step dependencies, parallel execution and the critical path."""
+    
+    @pytest.fixture
+    def coordinator(self):
+        """Create a coordinator whose specialized agents each take STEP_TIME seconds."""
+        coordinator = CoordinatorAgent(Config(openai_api_key="test_key"), logging.getLogger("test"))
+        
+        for agent_name, agent in coordinator.agents.items():
+            async def process(input_data, agent_name=agent_name):
+                await asyncio.sleep(STEP_TIME)
+                return {"success": True, "content": f"{agent_name}: {input_data['action']}"}
+            agent.process = process
+        return coordinator
+    
+    def test_dependencies_follow_priority_unless_listed(self):
+        """Test that steps depend on lower priorities by default and on earlier steps only."""
+        dag = WorkflowDAG([
+            {"agent": "ResearchAgent", "priority": 1},
+            {"agent": "ResearchAgent", "priority": 1},
+            {"agent": "ContentAgent", "priority": 2},
+            {"id": "review", "agent": "ValidationAgent", "priority": 3, "depends_on": ["ContentAgent", "later"]}
+        ])
+        
+        assert dag.dependencies == {
+            "ResearchAgent": [],
+            "ResearchAgent-2": [],
+            "ContentAgent": ["ResearchAgent", "ResearchAgent-2"],
+            "review": ["ContentAgent"]
+        }
+        assert dag.critical_path({"ResearchAgent": 1.0, "ResearchAgent-2": 3.0, "ContentAgent": 2.0, "review": 1.0}) == (
+            ["ResearchAgent-2", "ContentAgent", "review"], 6.0
+        )
+    
+    @pytest.mark.asyncio
+    async def test_parallel_research_takes_longest_branch(self, coordinator):
+        """Test that independent research steps overlap and the workflow reports its critical path."""
+        plan = {"steps": [
+            {"agent": "ResearchAgent", "action": "Market size", "priority": 1},
+            {"agent": "ResearchAgent", "action": "Competitors", "priority": 1},
+            {"agent": "ResearchAgent", "action": "Regulation", "priority": 1},
+            {"agent": "ContentAgent", "action": "Write report", "priority": 2}
+        ]}
+        
+        with patch.object(coordinator, "_make_llm_request", new_callable=AsyncMock, return_value=json.dumps(plan)):
+            result = await coordinator.process({"task": "Write a market report"})
+        
+        timing = result["result"]["timing"]
+        assert list(result["result"]["workflow_results"]) == ["ResearchAgent", "ResearchAgent-2", "ResearchAgent-3", "ContentAgent"]
+        assert timing["wall_time"] < 3 * STEP_TIME
+        assert timing["parallelism"] > 1.5
+        assert timing["critical_path"][-1] == "ContentAgent"
+        assert len(timing["critical_path"]) == 2
+        assert timing["steps"]["ContentAgent"]["start"] >= STEP_TIME * 0.9
+        
+        execution = coordinator.get_all_agent_metrics()["coordinator"]["execution"]
+        assert execution["workflows"] == 1
+        assert execution["critical_path_by_agent"] == {"ResearchAgent": 1, "ContentAgent": 1}
+    
+    def test_parallel_research_steps_send_their_own_query(self, coordinator):
+        """Test that each research step's action focuses its query, so parallel branches differ."""
+        queries = [
+            coordinator._prepare_agent_input("ResearchAgent", action, {"task": "Write a market report"})["query"]
+            for action in ("Market size", "Competitors")
+        ]
+        
+        assert queries == ["Write a market report\nFocus: Market size", "Write a market report\nFocus: Competitors"]
+    
+    @pytest.mark.asyncio
+    async def test_parallel_steps_are_bounded(self, coordinator):
+        """Test that no more than workflow_max_parallel_steps steps run at once."""
+        coordinator.config = coordinator.config.model_copy(update={"workflow_max_parallel_steps": 2})
+        plan = {"steps": [
+            {"agent": "ValidationAgent", "action": f"Check {aspect}", "priority": 1}
+            for aspect in ("facts", "tone", "safety", "style")
+        ]}
+        
+        result = await coordinator._execute_workflow(coordinator._parse_workflow_plan(json.dumps(plan)), {"task": "Review"})
+        
+        timing = result["timing"]
+        assert 2 * STEP_TIME * 0.9 <= timing["wall_time"] < 3 * STEP_TIME
+        assert sum(1 for step in timing["steps"].values() if step["queued"] >= STEP_TIME * 0.9) == 2
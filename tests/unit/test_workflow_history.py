@@ -0,0 +1,115 @@
+"""
+Unit tests for the bounded workflow history.
+"""
+
+import pytest
+import gc
+import logging
+import sys
+import tracemalloc
+from pathlib import Path
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent.parent / "src"))
+
+from src.agents.coordinator_agent import CoordinatorAgent
+from src.core.config import Config
+from src.core.history import WorkflowHistory
+
+def workflow_payload(i):
+    """A plan and a result with large per-step details, like a real workflow's."""
+    plan = {"steps": [{"agent": "ResearchAgent", "action": "Research", "priority": 1},
+                      {"agent": "ContentAgent", "action": "Write", "priority": 2}], "planner": "llm"}
+    result = {
+        "workflow_results": {
+            "ResearchAgent": {"success": True, "details": {"findings": f"finding {i} " * 500}},
+            "ContentAgent": {"success": True, "details": {"draft": f"draft {i} " * 500}}
+        },
+        "final_output": f"output {i} " * 100,
+        "timing": {"wall_time": 1.5, "time_to_first_output": 1.5}
+    }
+    return plan, result
+
+class TestWorkflowHistory:
+    """Test cases for the ring buffer of compact workflow records."""
+    
+    def test_records_are_compact_and_bounded(self):
+        """Test that only the last capacity records are kept, without the full payloads."""
+        history = WorkflowHistory(capacity=3)
+        
+        for i in range(5):
+            history.record(f"Task {i}", *workflow_payload(i))
+        
+        records = history.recent(10)
+        assert [record["task"] for record in records] == ["Task 2", "Task 3", "Task 4"]
+        assert records[-1]["steps"] == ("ResearchAgent", "ContentAgent")
+        assert records[-1]["success"] is True
+        assert records[-1]["output_chars"] == len(workflow_payload(4)[1]["final_output"])
+        assert "result" not in records[-1]
+        assert history.get_stats()["dropped"] == 2
+    
+    def test_payloads_spill_to_disk(self, tmp_path):
+        """Test that full payloads are written in the background and can be read back."""
+        history = WorkflowHistory(capacity=2, spill_path=tmp_path / "workflows.jsonl")
+        
+        for i in range(3):
+            history.record(f"Task {i}", *workflow_payload(i))
+        history.flush()
+        
+        payload = history.load_payload(history.recent(1)[0])
+        assert payload["task"] == "Task 2"
+        assert payload["result"]["workflow_results"]["ContentAgent"]["details"]["draft"].startswith("draft 2")
+        assert history.get_stats()["spilled"] == 3
+        assert history.get_stats()["spill_pending"] == 0
+    
+    def test_spill_file_is_rotated(self, tmp_path):
+        """Test that the spill file is capped: it rotates to one previous file and older payloads are gone."""
+        spill_path = tmp_path / "workflows.jsonl"
+        history = WorkflowHistory(capacity=10, spill_path=spill_path, spill_max_bytes=25000)
+        
+        records = [history.record(f"Task {i}", *workflow_payload(i)) for i in range(6)]
+        history.flush()
+        
+        assert sorted(path.name for path in tmp_path.iterdir()) == ["workflows.jsonl", "workflows.jsonl.1"]
+        assert all(path.stat().st_size <= 25000 for path in tmp_path.iterdir())
+        assert history.get_stats()["rotations"] == 2
+        assert history.load_payload(records[0]) is None
+        assert history.load_payload(records[3])["task"] == "Task 3"
+        assert history.load_payload(records[5])["task"] == "Task 5"
+    
+    def test_memory_is_flat_under_soak(self):
+        """Test that memory stops growing once the buffer is full."""
+        history = WorkflowHistory(capacity=50)
+        
+        tracemalloc.start()
+        try:
+            for i in range(200):
+                history.record(f"Task {i}", *workflow_payload(i))
+            gc.collect()
+            warm, _ = tracemalloc.get_traced_memory()
+            for i in range(200, 2000):
+                history.record(f"Task {i}", *workflow_payload(i))
+            gc.collect()
+            soaked, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        
+        # Keeping every payload would grow by about 20 MB
+        assert len(history) == 50
+        assert soaked - warm < 1024 * 1024
+    
+    @pytest.mark.asyncio
+    async def test_coordinator_records_workflows(self):
+        """Test that process() adds a compact record and reports the history stats."""
+        config = Config(llm_backend="local", local_backend_latency=0.0, local_backend_tokens_per_second=100000,
+                        rate_limit_requests=1000, workflow_history_size=2, enable_file_logging=False)
+        coordinator = CoordinatorAgent(config, logging.getLogger("test"))
+        
+        for i in range(3):
+            result = await coordinator.process({"task": f"Explain topic {i}"})
+        
+        history = coordinator.get_workflow_history()
+        assert [record["task"] for record in history] == ["Explain topic 1", "Explain topic 2"]
+        assert history[-1]["usage"] == result["usage"]
+        assert history[-1]["wall_time"] == result["result"]["timing"]["wall_time"]
+        assert coordinator.get_all_agent_metrics()["coordinator"]["history"]["dropped"] == 1
@@ -21,7 +21,7 @@ def check_dependencies():
         ('openai', 'openai'), 
         ('pydantic', 'pydantic'), 
         ('python-dotenv', 'dotenv'),
-        ('tenacity', 'tenacity'), 
+        ('httpx', 'httpx'), 
         ('loguru', 'loguru'), 
         ('psutil', 'psutil'), 
         ('pandas', 'pandas'), 